@@ -0,0 +1,70 @@
+-- Parquet varijante enriched tabela (enrich_tourist_partitioned.py --format parquet).
+-- Isti date= layout kao CSV, ali Athena čita samo kolone koje query koristi
+-- (npr. _input_file se ne skenira ako nije u SELECT-u).
+--
+-- Imena su *_enriched_parquet: CSV tabele tara_pollution_enriched i
+-- tara_weather_enriched već postoje, pa bi IF NOT EXISTS sa istim imenom
+-- bio tihi no-op i tabela bi ostala CSV.
+-- Obe varijante gledaju istu lokaciju, a u njoj sme da bude samo jedan format.
+-- Prelazak na parquet:
+--   1. enrich sa --format parquet, pa brisanje starih .csv fajlova iz prefiksa
+--      (od tada CSV tabele više ne važe)
+--   2. ovaj DDL; upiti idu nad *_enriched_parquet tabelama
+--   3. (opciono) DROP TABLE tara_pollution_enriched; DROP TABLE tara_weather_enriched;
+--      (EXTERNAL tabele, podaci ostaju), pa ovaj DDL sa starim imenima, da
+--      athena_queries/*.sql rade bez izmena
+CREATE EXTERNAL TABLE IF NOT EXISTS tara_pollution_enriched_parquet (
+  name                  string,
+  time_nano             bigint,
+  time_date             string,
+  location_latitude     double,
+  location_longitude    double,
+  location_name         string,
+  measurement_pm10Atmo  double,
+  measurement_pm25Atmo  double,
+  measurement_pm100Atmo double,
+  _input_file           string,
+  tourist_estimate      bigint
+)
+PARTITIONED BY (`date` string)
+STORED AS PARQUET
+LOCATION 's3://bucket-tara-weather-dest-v1/pollution_partitioned_enriched/'
+TBLPROPERTIES (
+  'parquet.compression'          = 'SNAPPY',
+  'projection.enabled'           = 'true',
+  'projection.date.type'         = 'date',
+  'projection.date.format'       = 'yyyy-MM-dd',
+  'projection.date.range'        = '2022-01-01,NOW',
+  'storage.location.template'    = 's3://bucket-tara-weather-dest-v1/pollution_partitioned_enriched/date=${date}/'
+);
+
+CREATE EXTERNAL TABLE IF NOT EXISTS tara_weather_enriched_parquet (
+  name                string,
+  time_nano           bigint,
+  time_date           string,
+  location_latitude   double,
+  location_longitude  double,
+  location_name       string,
+  weather_temperature double,
+  weather_feelsLike   double,
+  weather_pressure    bigint,
+  weather_humidity    bigint,
+  weather_dewPoint    double,
+  weather_clouds      bigint,
+  weather_windSpeed   double,
+  weather_windDeg     bigint,
+  weather_windGust    double,
+  _input_file         string,
+  tourist_estimate    bigint
+)
+PARTITIONED BY (`date` string)
+STORED AS PARQUET
+LOCATION 's3://bucket-tara-weather-dest-v1/weather_partitioned_enriched/'
+TBLPROPERTIES (
+  'parquet.compression'          = 'SNAPPY',
+  'projection.enabled'           = 'true',
+  'projection.date.type'         = 'date',
+  'projection.date.format'       = 'yyyy-MM-dd',
+  'projection.date.range'        = '2022-01-01,NOW',
+  'storage.location.template'    = 's3://bucket-tara-weather-dest-v1/weather_partitioned_enriched/date=${date}/'
+);
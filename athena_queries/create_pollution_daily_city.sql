@@ -0,0 +1,20 @@
+-- Dnevni rollup po gradu (scripts/rollup_pollution_daily_city.py).
+-- Jedan mali fajl po danu; dan je particija `date`.
+CREATE EXTERNAL TABLE IF NOT EXISTS tara_pollution_daily_city (
+  city                          string,
+  pollution_total_visitor_pm10  double,
+  pollution_total_visitor_pm25  double,
+  pollution_total_visitor_pm100 double,
+  row_count                     bigint
+)
+PARTITIONED BY (`date` string)
+ROW FORMAT SERDE 'org.apache.hadoop.hive.serde2.OpenCSVSerde'
+LOCATION 's3://bucket-tara-weather-dest-v1/pollution_daily_city/'
+TBLPROPERTIES (
+  'skip.header.line.count'    = '1',
+  'projection.enabled'        = 'true',
+  'projection.date.type'      = 'date',
+  'projection.date.format'    = 'yyyy-MM-dd',
+  'projection.date.range'     = '2022-01-01,NOW',
+  'storage.location.template' = 's3://bucket-tara-weather-dest-v1/pollution_daily_city/date=${date}/'
+);
@@ -1,34 +1,25 @@
 -- Korelacija: da li vetar/kiša utiču na izloženost turista PM2.5?
-WITH base_pollution AS (
-  SELECT DISTINCT
-    date(substr(time_date, 1, 10)) AS day,
-    location_name                  AS city,
-    measurement_pm25Atmo,
-    tourist_estimate
-  FROM tara_pollution_enriched
-),
-per_day_pollution AS (
+-- PM2.5 izloženost po danu dolazi iz dnevnog rollup-a (tara_pollution_daily_city).
+WITH per_day_pollution AS (
   SELECT
-    day,
+    date("date") AS day,
     city,
-    SUM(COALESCE(measurement_pm25Atmo, 0) * tourist_estimate) AS pollution_total_visitor_pm25
-  FROM base_pollution
-  GROUP BY
-    day,
-    city
+    pollution_total_visitor_pm25
+  FROM tara_pollution_daily_city
 ),
+-- dan je particija date=, sat je celobrojno deljenje time_nano (bez parsiranja time_date)
 hourly_weather AS (
   SELECT
-    date(substr(time_date, 1, 10)) AS day,        
+    date("date")                   AS day,
     location_name                  AS city,
-    substr(time_date, 12, 8)       AS hh_mm_ss,     
+    time_nano / 3600000000000      AS hour_bucket,
     AVG(weather_wind_speed)        AS weather_wind_speed_hourly,
     AVG(weather_precipitation)     AS weather_precipitation_hourly
   FROM tara_weather_enriched
   GROUP BY
-    date(substr(time_date, 1, 10)),
+    date("date"),
     location_name,
-    substr(time_date, 12, 8)
+    time_nano / 3600000000000
 ),
 per_day_weather AS (
   SELECT
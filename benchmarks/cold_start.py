@@ -0,0 +1,157 @@
+"""
+Cold start benchmark za Lambda handler-e iz repoa.
+
+Svako merenje je novi Python proces (kao cold start): meri se import modula,
+prvi poziv handler-a i drugi (warm) poziv, sa event-om koji ne ide na mrežu
+(preskočen prefix, 400 odgovor...). Scenario "client" meri prvo pravljenje
+lazy boto3 client-a u tom modulu.
+
+    python benchmarks/cold_start.py --repeat 10 --json cold_start.json
+
+Za handler-e koji importuju boto3 potreban je instaliran boto3; region se
+postavlja na AWS_DEFAULT_REGION ili eu-central-1, kredencijali nisu potrebni.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SQS_IGNORED_EVENT = {
+    "Records": [{
+        "body": json.dumps({"Records": [{
+            "s3": {"bucket": {"name": "bench-bucket"}, "object": {"key": "other/file.csv"}},
+        }]}),
+    }]
+}
+
+# name -> putanje (relativno od root-a), modul, env i scenariji (funkcija, argumenti)
+HANDLERS = {
+    "sqs_to_dynamo": {
+        "paths": ["scripts/lambda_functions"],
+        "module": "sqs_to_dynamo",
+        "env": {"DDB_TABLE_NAME": "cold-start-bench"},
+        "scenarios": {
+            "ignored_prefix": ("lambda_handler", [SQS_IGNORED_EVENT, None]),
+            "client": ("get_dynamodb_client", []),
+        },
+    },
+    "csv_copy_image": {
+        "paths": ["lambda_image_task/lambda_image"],
+        "module": "app",
+        "env": {"SOURCE_BUCKET": "", "SOURCE_KEY": "", "DEST_BUCKET": "", "DEST_KEY": ""},
+        "scenarios": {
+            "missing_source_400": ("lambda_handler", [{}, None]),
+            "client": ("get_s3_client", []),
+        },
+    },
+    "transfer_to_s3": {
+        "paths": ["scripts/lambda_functions"],
+        "module": "transfer_to_s3",
+        "env": {},
+        # handler odmah lista S3, pa se meri samo import
+        "scenarios": {"import_only": (None, [])},
+    },
+    "layer_demo": {
+        "paths": ["lambda_image_task/lambda_with_layer", "lambda_image_task/layer_src/python"],
+        "module": "app",
+        "env": {},
+        "scenarios": {"hello": ("handler", [{"name": "bench"}, None])},
+    },
+}
+
+CHILD_CODE = """
+import importlib, json, sys, time
+spec = json.loads(sys.argv[1])
+sys.path[:0] = spec["paths"]
+start = time.perf_counter()
+module = importlib.import_module(spec["module"])
+result = {"import_ms": (time.perf_counter() - start) * 1000}
+if spec["call"]:
+    fn = getattr(module, spec["call"])
+    for label in ("first_call_ms", "second_call_ms"):
+        start = time.perf_counter()
+        fn(*spec["args"])
+        result[label] = (time.perf_counter() - start) * 1000
+print(json.dumps(result))
+"""
+
+METRICS = ("import_ms", "first_call_ms", "second_call_ms")
+
+
+def run_once(handler: Dict, call, call_args) -> Dict:
+    env = dict(os.environ)
+    env.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+    env.update(handler["env"])
+    spec = {
+        "paths": [str(REPO_ROOT / p) for p in handler["paths"]],
+        "module": handler["module"],
+        "call": call,
+        "args": call_args,
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE, json.dumps(spec)],
+        capture_output=True, text=True, env=env, cwd=str(REPO_ROOT),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def benchmark(names: List[str], repeat: int) -> List[Dict]:
+    results = []
+    for name in names:
+        handler = HANDLERS[name]
+        for scenario, (call, call_args) in handler["scenarios"].items():
+            record = {"handler": name, "scenario": scenario, "repeat": repeat}
+            try:
+                runs = [run_once(handler, call, call_args) for _ in range(repeat)]
+            except RuntimeError as exc:
+                record["error"] = str(exc)
+                results.append(record)
+                continue
+            for metric in METRICS:
+                values = [r[metric] for r in runs if metric in r]
+                if values:
+                    record[f"{metric}_median"] = round(statistics.median(values), 3)
+                    record[f"{metric}_min"] = round(min(values), 3)
+            results.append(record)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure import + first invocation time of each Lambda handler in fresh processes."
+    )
+    parser.add_argument("--handler", action="append", choices=sorted(HANDLERS), help="Repeatable; default: all")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per scenario (default: 5)")
+    parser.add_argument("--json", default=None, help="Append results as JSON lines to this file")
+    args = parser.parse_args()
+
+    results = benchmark(args.handler or sorted(HANDLERS), args.repeat)
+
+    print(f"{'handler':16} {'scenario':20} {'import ms':>10} {'1st call ms':>12} {'2nd call ms':>12}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['handler']:16} {r['scenario']:20} ERROR {r['error']}")
+            continue
+        print(
+            f"{r['handler']:16} {r['scenario']:20} {r['import_ms_median']:>10} "
+            f"{r.get('first_call_ms_median', '-'):>12} {r.get('second_call_ms_median', '-'):>12}"
+        )
+
+    if args.json:
+        meta = {"python": platform.python_version(), "machine": platform.machine()}
+        with open(args.json, "a", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps({**meta, **r}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
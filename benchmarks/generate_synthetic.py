@@ -0,0 +1,303 @@
+"""
+Generator sintetičkih weather/pollution/sensor podataka u skali, za benchmark-e.
+
+Kopira ono što vidimo u pravim podacima (data/*.csv):
+- šema i redosled kolona kao u sirovim firehose CSV-ovima, name je
+  "<id> - <location_name>", time_date je time_nano + 2h
+- firehose duplikati: svako očitavanje stiže u više fajlova (pollution 2x sa
+  istim vrednostima, weather 4x sa izmenjenim clouds/windSpeed/windDeg)
+- "None" za measurement_pm10Atmo (u pravim podacima uvek) i prazan
+  weather_windGust (~95% redova)
+
+Layout-i (--layout):
+  firehose     <dataset>/<name>/<dd-mm-yyyy>/levi9-hack9-<dataset>-firehose-2-<ts>-<uuid>
+               jedan fajl po senzoru po isporuci (--delivery-minutes, default 30)
+  partitioned  <dataset>_partitioned/date=YYYY-MM-DD/part-NNNNN.csv sa _input_file,
+               kao izlaz partition_by_date_job (duplikati ostaju, dedup je posao job-a)
+
+Sensor šema nije u repou; ovde je to pollution šema sa očitavanjem na 5 minuta.
+
+    python benchmarks/generate_synthetic.py --out /tmp/synth --rows 1000000 --layout partitioned
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+UTC_OFFSET_HOURS = 2
+NANOS_PER_SECOND = 1_000_000_000
+BUCKET = "bucket-tara-weather-dest-v1"
+
+BASE_COLUMNS = [
+    "name", "time_nano", "time_date", "location_latitude", "location_longitude", "location_name",
+]
+DATASETS = {
+    "weather": {
+        "columns": BASE_COLUMNS + [
+            "weather_temperature", "weather_feelsLike", "weather_pressure", "weather_humidity",
+            "weather_dewPoint", "weather_clouds", "weather_windSpeed", "weather_windDeg",
+            "weather_windGust",
+        ],
+        "interval_minutes": 60,
+        "copies": 4,
+    },
+    "pollution": {
+        "columns": BASE_COLUMNS + [
+            "measurement_pm10Atmo", "measurement_pm25Atmo", "measurement_pm100Atmo",
+        ],
+        "interval_minutes": 60,
+        "copies": 2,
+    },
+    "sensor": {
+        "columns": BASE_COLUMNS + [
+            "measurement_pm10Atmo", "measurement_pm25Atmo", "measurement_pm100Atmo",
+        ],
+        "interval_minutes": 5,
+        "copies": 2,
+    },
+}
+
+REAL_SENSOR = (1248, "Tătărași Sud, Iași, Romania", 47.154, 27.614)
+CITIES = [
+    ("Iași", 47.16, 27.59), ("Cluj-Napoca", 46.77, 23.59), ("Timișoara", 45.75, 21.23),
+    ("București", 44.43, 26.10), ("Brașov", 45.65, 25.61), ("Constanța", 44.18, 28.63),
+    ("Suceava", 47.65, 26.26), ("Sibiu", 45.79, 24.15),
+]
+DISTRICTS = ["Centru", "Nord", "Sud", "Mănăștur", "Copou", "Tătărași Nord", "Pacurari", "Gară"]
+
+
+def make_sensors(count: int, rng: np.random.Generator) -> pd.DataFrame:
+    rows = [REAL_SENSOR]
+    for i in range(1, count):
+        city, lat, lon = CITIES[i % len(CITIES)]
+        district = DISTRICTS[(i // len(CITIES)) % len(DISTRICTS)]
+        rows.append((
+            REAL_SENSOR[0] + i,
+            f"{district} {i // (len(CITIES) * len(DISTRICTS)) or ''}".strip() + f", {city}, Romania",
+            round(lat + rng.normal(0, 0.02), 3),
+            round(lon + rng.normal(0, 0.02), 3),
+        ))
+    sensors = pd.DataFrame(rows, columns=["id", "location_name", "location_latitude", "location_longitude"])
+    sensors["name"] = sensors["id"].astype(str) + " - " + sensors["location_name"]
+    return sensors
+
+
+def _fmt(values: np.ndarray, decimals: int) -> np.ndarray:
+    return np.round(values, decimals)
+
+
+def generate_day(
+    dataset: str,
+    day: date,
+    sensors: pd.DataFrame,
+    rng: np.random.Generator,
+    pm10_none_rate: float = 1.0,
+    wind_gust_empty_rate: float = 0.95,
+) -> pd.DataFrame:
+    """
+    Sva očitavanja jednog dana za sve senzore, svako u `copies` primeraka.
+    Kolona _copy (0..copies-1) kaže koja je isporuka u pitanju.
+    """
+    spec = DATASETS[dataset]
+    per_day = 24 * 60 // spec["interval_minutes"]
+    n_sensors = len(sensors)
+    copies = spec["copies"]
+
+    # lokalna ponoć tog dana u UTC nanosekundama
+    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) - timedelta(hours=UTC_OFFSET_HOURS)
+    start_nano = int(midnight.timestamp()) * NANOS_PER_SECOND
+    step = spec["interval_minutes"] * 60 * NANOS_PER_SECOND
+
+    sensor_idx = np.repeat(np.arange(n_sensors), per_day)
+    slot = np.tile(np.arange(per_day), n_sensors)
+    time_nano = start_nano + slot.astype("int64") * step
+    local_seconds = time_nano // NANOS_PER_SECOND + UTC_OFFSET_HOURS * 3600
+    hour_of_day = (local_seconds // 3600) % 24
+    n = len(slot)
+
+    df = pd.DataFrame({
+        "name": sensors["name"].to_numpy()[sensor_idx],
+        "time_nano": time_nano,
+        "time_date": local_seconds.astype("datetime64[s]").astype(str),
+        "location_latitude": sensors["location_latitude"].to_numpy()[sensor_idx],
+        "location_longitude": sensors["location_longitude"].to_numpy()[sensor_idx],
+        "location_name": sensors["location_name"].to_numpy()[sensor_idx],
+    })
+    df["time_date"] = df["time_date"].str.replace("T", " ", regex=False)
+
+    daily_cycle = np.sin((hour_of_day - 9) / 24 * 2 * np.pi)
+    if dataset == "weather":
+        temperature = 12 + 7 * daily_cycle + rng.normal(0, 1.5, n)
+        humidity = np.clip(70 - 20 * daily_cycle + rng.normal(0, 8, n), 15, 100)
+        df["weather_temperature"] = _fmt(temperature, 2)
+        df["weather_feelsLike"] = _fmt(temperature - rng.uniform(0, 2, n), 2)
+        df["weather_pressure"] = rng.integers(995, 1030, n)
+        df["weather_humidity"] = humidity.astype("int64")
+        df["weather_dewPoint"] = _fmt(temperature - (100 - humidity) / 5, 2)
+        df["weather_clouds"] = rng.choice([0, 20, 40, 75, 90, 100], n)
+        df["weather_windSpeed"] = _fmt(rng.gamma(2.0, 1.6, n), 2)
+        df["weather_windDeg"] = rng.integers(0, 36, n) * 10
+        gust = _fmt(df["weather_windSpeed"].to_numpy() * rng.uniform(1.2, 2.0, n), 2)
+        df["weather_windGust"] = np.where(rng.random(n) < wind_gust_empty_rate, np.nan, gust)
+    else:
+        pm25 = _fmt(rng.lognormal(2.0, 0.6, n), 2)
+        df["measurement_pm10Atmo"] = np.where(
+            rng.random(n) < pm10_none_rate, "None", _fmt(pm25 * rng.uniform(0.6, 0.9, n), 2).astype(str)
+        )
+        df["measurement_pm25Atmo"] = pm25
+        df["measurement_pm100Atmo"] = _fmt(pm25 * rng.uniform(1.0, 1.3, n), 2)
+
+    out = pd.concat([df] * copies, ignore_index=True)
+    out["_copy"] = np.repeat(np.arange(copies), n)
+
+    if dataset == "weather" and copies > 1:
+        # kasnije isporuke istog sata imaju osvežene vrednosti, kao u pravim podacima
+        later = out["_copy"].to_numpy() > 0
+        m = int(later.sum())
+        out.loc[later, "weather_clouds"] = rng.choice([0, 20, 40, 75, 90, 100], m)
+        out.loc[later, "weather_windSpeed"] = _fmt(
+            np.clip(out.loc[later, "weather_windSpeed"].to_numpy() + rng.normal(0, 0.5, m), 0, None), 2
+        )
+        out.loc[later, "weather_windDeg"] = rng.integers(0, 36, m) * 10
+
+    return out[spec["columns"] + ["_copy"]]
+
+
+def delivery_times(df: pd.DataFrame, delivery_minutes: int) -> pd.Series:
+    """
+    Vreme isporuke (UTC) svakog reda: prvi prozor posle očitavanja + _copy prozora.
+    """
+    window = delivery_minutes * 60 * NANOS_PER_SECOND
+    first = (df["time_nano"] // window + 1) * window
+    return first + df["_copy"].astype("int64") * window
+
+
+def firehose_key(dataset: str, name: str, delivered_nano: int) -> str:
+    delivered = datetime.fromtimestamp(delivered_nano / NANOS_PER_SECOND, tz=timezone.utc)
+    # firehose dodaje par desetina sekundi posle prozora
+    stamp = (delivered + timedelta(minutes=20, seconds=42)).strftime("%Y-%m-%d-%H-%M-%S")
+    folder = delivered.strftime("%d-%m-%Y")
+    # deterministički uuid, da isti seed da iste ključeve
+    suffix = str(uuid.UUID(hashlib.md5(f"{name}|{delivered_nano}".encode("utf-8")).hexdigest()))
+    return f"{dataset}/{name}/{folder}/levi9-hack9-{dataset}-firehose-2-{stamp}-{suffix}"
+
+
+def write_day(
+    out_dir: str,
+    dataset: str,
+    day: date,
+    df: pd.DataFrame,
+    layout: str,
+    delivery_minutes: int,
+    part_files_per_day: int,
+) -> Dict[str, int]:
+    columns = DATASETS[dataset]["columns"]
+    delivered = delivery_times(df, delivery_minutes)
+    stats = {"rows": len(df), "files": 0, "bytes": 0}
+
+    # firehose ključ treba i partitioned layout-u, za _input_file
+    group_keys = pd.Series(list(zip(df["name"], delivered)), index=df.index)
+    key_of = {g: firehose_key(dataset, g[0], g[1]) for g in dict.fromkeys(group_keys)}
+    keys = group_keys.map(key_of)
+
+    if layout in ("firehose", "both"):
+        for key, group in df.groupby(keys, sort=False):
+            path = os.path.join(out_dir, key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            group[columns].to_csv(path, index=False, na_rep="")
+            stats["files"] += 1
+            stats["bytes"] += os.path.getsize(path)
+
+    if layout in ("partitioned", "both"):
+        part = df[columns].copy()
+        part["_input_file"] = f"s3://{BUCKET}/" + keys
+        part_dir = os.path.join(out_dir, f"{dataset}_partitioned", f"date={day.isoformat()}")
+        os.makedirs(part_dir, exist_ok=True)
+        shuffled = part.sample(frac=1.0, random_state=day.toordinal())
+        bounds = np.linspace(0, len(shuffled), part_files_per_day + 1).astype(int)
+        for i in range(part_files_per_day):
+            chunk = shuffled.iloc[bounds[i]:bounds[i + 1]]
+            path = os.path.join(part_dir, f"part-{i:05d}.csv")
+            chunk.to_csv(path, index=False, na_rep="")
+            stats["files"] += 1
+            stats["bytes"] += os.path.getsize(path)
+
+    return stats
+
+
+def generate(
+    out_dir: str,
+    datasets: List[str],
+    rows: int,
+    sensors: int = 10,
+    start: date = date(2022, 4, 1),
+    layout: str = "partitioned",
+    delivery_minutes: int = 30,
+    part_files_per_day: int = 1,
+    pm10_none_rate: float = 1.0,
+    seed: int = 0,
+) -> Dict:
+    """
+    Generiše ~rows redova (sa duplikatima) po dataset-u, dan po dan, pa memorija
+    zavisi od broja redova u danu, ne od ukupne veličine.
+    """
+    rng = np.random.default_rng(seed)
+    sensor_frame = make_sensors(sensors, rng)
+    summary: Dict = {"out_dir": out_dir, "layout": layout, "sensors": sensors, "datasets": {}}
+
+    for dataset in datasets:
+        spec = DATASETS[dataset]
+        rows_per_day = sensors * (24 * 60 // spec["interval_minutes"]) * spec["copies"]
+        days = max(1, math.ceil(rows / rows_per_day))
+        totals = {"rows": 0, "files": 0, "bytes": 0, "days": days}
+        t0 = time.perf_counter()
+        for d in range(days):
+            day = start + timedelta(days=d)
+            df = generate_day(dataset, day, sensor_frame, rng, pm10_none_rate=pm10_none_rate)
+            stats = write_day(out_dir, dataset, day, df, layout, delivery_minutes, part_files_per_day)
+            for k in ("rows", "files", "bytes"):
+                totals[k] += stats[k]
+        totals["seconds"] = round(time.perf_counter() - t0, 3)
+        summary["datasets"][dataset] = totals
+        print(f"[GEN] {dataset}: {totals}")
+
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic weather/pollution/sensor data trees.")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--rows", type=int, default=100_000, help="Approximate rows per dataset, duplicates included")
+    parser.add_argument("--datasets", default="weather,pollution", help="Comma list of weather,pollution,sensor")
+    parser.add_argument("--sensors", type=int, default=10, help="Number of sensors/locations (default: 10)")
+    parser.add_argument("--start-date", default="2022-04-01")
+    parser.add_argument("--layout", choices=("firehose", "partitioned", "both"), default="partitioned")
+    parser.add_argument("--delivery-minutes", type=int, default=30, help="Firehose delivery window (default: 30)")
+    parser.add_argument("--part-files-per-day", type=int, default=1)
+    parser.add_argument("--pm10-none-rate", type=float, default=1.0, help="Share of 'None' pm10 values (real data: 1.0)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    datasets = [d.strip() for d in args.datasets.split(",") if d.strip()]
+    unknown = set(datasets) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown datasets {sorted(unknown)}")
+
+    summary = generate(
+        args.out, datasets, args.rows, args.sensors, date.fromisoformat(args.start_date),
+        args.layout, args.delivery_minutes, args.part_files_per_day, args.pm10_none_rate, args.seed,
+    )
+    with open(os.path.join(args.out, "_generated.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Handler-i nad fake AWS backend-om (unit_testing_example/fake_aws.py) sa zadatim
+kašnjenjem po API pozivu: koliko poziva handler pravi i koliko traje kad svaki
+poziv košta npr. 50 ms. Bez mreže i kredencijala, ali moduli handler-a
+importuju boto3, pa on mora biti instaliran.
+
+    python benchmarks/handler_latency.py --latency-ms 50 --objects 500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [
+    str(REPO_ROOT / "scripts"),
+    str(REPO_ROOT / "unit_testing_example"),
+    str(REPO_ROOT / "lambda_image_task" / "lambda_image"),
+]
+os.environ.setdefault("DDB_TABLE_NAME", "handler-latency-bench")
+
+from fake_aws import FakeAWS, sqs_event  # noqa: E402
+
+CSV_BODY = (
+    "name,time_nano,time_date,location_name,measurement_pm25Atmo\n"
+    + '"1248 - Tătărași Sud, Iași, Romania",1652158800000000000,2022-05-10 07:00:00,'
+    '"Tătărași Sud, Iași, Romania",6.69\n' * 100
+)
+
+
+def bench_transfer_to_s3(fake: FakeAWS, objects: int) -> None:
+    from lambda_functions import transfer_to_s3
+
+    for i in range(objects):
+        fake.s3.add_object("src", f"pollution/{i:06d}.csv", CSV_BODY)
+    env = {"SOURCE_BUCKET": "src", "DEST_BUCKET": "dst", "SOURCE_PREFIX": "pollution/", "DEST_PREFIX": "copy/"}
+    with patch.dict(os.environ, env), patch.object(transfer_to_s3.boto3, "client", side_effect=fake.client):
+        fake.reset_calls()
+        transfer_to_s3.lambda_handler({}, None)
+
+
+def bench_csv_copy_image(fake: FakeAWS, objects: int) -> None:
+    import app
+
+    for i in range(objects):
+        fake.s3.add_object("src", f"in/{i:06d}.csv", CSV_BODY)
+    with patch.object(app, "get_s3_client", return_value=fake.s3):
+        fake.reset_calls()
+        app.lambda_handler({"source_bucket": "src", "dest_bucket": "dst", "source_prefix": "in/"}, None)
+
+
+def bench_sqs_to_dynamo(fake: FakeAWS, objects: int) -> None:
+    from lambda_functions import sqs_to_dynamo
+
+    event = sqs_event("bucket", [f"weather/{i:06d}.csv" for i in range(objects)], records_per_message=10)
+    with patch.object(sqs_to_dynamo, "get_dynamodb_client", return_value=fake.dynamodb):
+        sqs_to_dynamo.lambda_handler(event, None)
+
+
+def bench_enrich(fake: FakeAWS, objects: int) -> None:
+    import enrich_tourist_partitioned as enrich
+
+    jobs = []
+    for i in range(objects):
+        key = f"pollution_partitioned/date=2022-05-10/part-{i:06d}.csv"
+        fake.s3.add_object("bucket", key, CSV_BODY)
+        jobs.append((key, "pollution_enriched/", "2022-05-10"))
+    fake.reset_calls()
+    enrich.enrich_files(fake.s3, "bucket", jobs, {("2022-05-10", "iasi"): 233}, workers=8)
+
+
+BENCHMARKS: Dict[str, Callable[[FakeAWS, int], None]] = {
+    "transfer_to_s3": bench_transfer_to_s3,
+    "csv_copy_image": bench_csv_copy_image,
+    "sqs_to_dynamo": bench_sqs_to_dynamo,
+    "enrich": bench_enrich,
+}
+
+
+def run(names: List[str], objects: int, latency_ms: float) -> List[Dict]:
+    results = []
+    for name in names:
+        fake = FakeAWS(latency=latency_ms / 1000)
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, patch("sys.stdout", new=devnull):
+            BENCHMARKS[name](fake, objects)
+        results.append({
+            "handler": name,
+            "objects": objects,
+            "latency_ms": latency_ms,
+            "seconds": round(time.perf_counter() - start, 3),
+            "calls": dict(fake.calls),
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run Lambda handlers against the in-process fake AWS backend.")
+    parser.add_argument("--handler", action="append", choices=sorted(BENCHMARKS), help="Repeatable; default: all")
+    parser.add_argument("--objects", type=int, default=200, help="Objects/files per handler (default: 200)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Delay per API call (default: 20)")
+    parser.add_argument("--json", default=None, help="Append results as JSON lines to this file")
+    args = parser.parse_args()
+
+    results = run(args.handler or sorted(BENCHMARKS), args.objects, args.latency_ms)
+    for r in results:
+        calls = ", ".join(f"{op}={n}" for op, n in sorted(r["calls"].items()))
+        print(f"{r['handler']:16} {r['seconds']:>8}s  {calls}")
+
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""
+End-to-end benchmark nad sintetičkim podacima (generate_synthetic.py, layout
+partitioned): partition -> enrich -> rollup -> athena upiti, plus weather transform.
+
+Svaka faza se pokreće u posebnom Python procesu, pa je peak RSS (ru_maxrss) baš
+te faze. Faze rade lokalno, bez AWS-a:
+  partition          pandas ekvivalent partition_by_date_job: date iz time_nano
+                     (time_columns) + dedup po (name, time_nano), ulazna date=
+                     particija po particija (generator sve kopije očitavanja
+                     upisuje u istu particiju), pa memorija prati jedan dan
+  enrich             enrich_single_file nad lokalnim "S3" (direktorijum), sa
+                     sintetičkom tabelom procena umesto API-ja
+  rollup             rollup_day (dedup očitavanja između fajlova dana) za svaki
+                     date= direktorijum enriched izlaza
+  athena             athena_queries/*.sql preko athena_local_runner (treba duckdb)
+  weather_transform  weather_transform.run nad weather particijama
+
+Rezultati se dopisuju kao JSON linije (commit, vreme, faza, redovi, sekunde,
+redovi/s, bajtovi, peak RSS, parametri), pa se runovi porede kroz commit-e.
+
+    python benchmarks/generate_synthetic.py --out /tmp/synth --rows 1000000
+    python benchmarks/run_benchmarks.py --data /tmp/synth --results benchmarks/results.jsonl
+
+enrich faza importuje enrich_tourist_partitioned, koji traži boto3 (ne i kredencijale).
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(REPO_ROOT / "scripts"), str(REPO_ROOT / "benchmarks")]
+
+STAGES = ["partition", "enrich", "rollup", "athena", "weather_transform"]
+DATASETS = ("pollution", "weather")
+DEDUP_KEYS = ["name", "time_nano"]
+DEDUP_MODES = ("first", "last", "none")
+# default DEDUP u partition_by_date_job
+PARTITION_DEDUP = "first"
+
+
+def _data_files(root: str) -> List[str]:
+    return sorted(
+        p for p in glob.glob(os.path.join(root, "**", "*"), recursive=True)
+        if os.path.isfile(p) and not os.path.basename(p).startswith(("_", "."))
+    )
+
+
+def _size(paths: List[str]) -> int:
+    return sum(os.path.getsize(p) for p in paths)
+
+
+def _csv_rows(paths: List[str]) -> int:
+    # sintetički CSV-ovi nemaju nove redove unutar vrednosti
+    rows = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            rows += max(sum(1 for _ in f) - 1, 0)
+    return rows
+
+
+def _file_rows(paths: List[str]) -> int:
+    # parquet broj redova iz footer-a, bez čitanja podataka
+    import pyarrow.parquet as pq
+
+    parquet = [p for p in paths if p.endswith(".parquet")]
+    csv = [p for p in paths if not p.endswith(".parquet")]
+    return sum(pq.ParquetFile(p).metadata.num_rows for p in parquet) + _csv_rows(csv)
+
+
+class LocalS3:
+    """
+    Minimalni get_object/put_object i list_objects_v2 paginator nad
+    direktorijumom; bucket se ignoriše.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def get_object(self, Bucket: str, Key: str) -> Dict:
+        with open(os.path.join(self.root, Key), "rb") as f:
+            return {"Body": io.BytesIO(f.read())}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes) -> Dict:
+        path = os.path.join(self.root, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(Body)
+        return {}
+
+    def get_paginator(self, operation: str) -> "LocalS3":
+        if operation != "list_objects_v2":
+            raise NotImplementedError(operation)
+        return self
+
+    def paginate(self, Bucket: str, Prefix: str) -> Iterator[Dict]:
+        # direktorijum prefiksa; key-evi su relativni na root, sa /
+        base = os.path.join(self.root, os.path.dirname(Prefix))
+        keys = (
+            os.path.relpath(p, self.root).replace(os.sep, "/")
+            for p in glob.glob(os.path.join(base, "**", "*"), recursive=True)
+            if os.path.isfile(p)
+        )
+        yield {"Contents": [{"Key": k} for k in sorted(keys) if k.startswith(Prefix)]}
+
+
+def stage_partition(data_dir: str, work_dir: str, params: Dict) -> Dict:
+    import pandas as pd
+
+    from time_columns import add_time_columns
+
+    dedup = params.get("partition_dedup", PARTITION_DEDUP)
+    stats = {"rows": 0, "rows_out": 0, "bytes": 0}
+    for dataset in DATASETS:
+        out_root = os.path.join(work_dir, f"{dataset}_dedup")
+        part_dirs = sorted(glob.glob(os.path.join(data_dir, f"{dataset}_partitioned", "date=*")))
+        for part_dir in part_dirs:
+            paths = _data_files(part_dir)
+            stats["bytes"] += _size(paths)
+            df = pd.concat((pd.read_csv(p) for p in paths), ignore_index=True)
+            stats["rows"] += len(df)
+
+            df = add_time_columns(df, columns=["date"])
+            if dedup != "none":
+                # kao row_number po _input_file u job-u: first = najmanji _input_file
+                df = df.sort_values("_input_file", kind="stable").drop_duplicates(DEDUP_KEYS, keep=dedup)
+            stats["rows_out"] += len(df)
+
+            # date iz time_nano može pasti u susedni dan, pa svaka ulazna
+            # particija piše svoj fajl u izlaznu particiju
+            file_name = f"part-{os.path.basename(part_dir)[len('date='):]}.csv"
+            for day, group in df.groupby("date"):
+                day_dir = os.path.join(out_root, f"date={day}")
+                os.makedirs(day_dir, exist_ok=True)
+                group.drop(columns=["date"]).to_csv(os.path.join(day_dir, file_name), index=False)
+    return stats
+
+
+def synthetic_estimates(dates: List[str], seed: int = 0) -> Dict:
+    import numpy as np
+
+    from enrich_tourist_partitioned import normalize_city
+    from generate_synthetic import CITIES
+
+    rng = np.random.default_rng(seed)
+    return {
+        (d, normalize_city(city)): int(rng.integers(1_000, 50_000))
+        for d in dates for city, _, _ in CITIES
+    }
+
+
+def _shift(date_str: str, days: int) -> str:
+    return (date.fromisoformat(date_str) + timedelta(days=days)).isoformat()
+
+
+def stage_enrich(data_dir: str, work_dir: str, params: Dict) -> Dict:
+    from enrich_tourist_partitioned import DATE_RE, enrich_single_file
+
+    s3 = LocalS3(data_dir)
+    output_format = params.get("output_format", "csv")
+    stats = {"rows": 0, "files": 0, "bytes": 0}
+    for dataset in DATASETS:
+        dst_prefix = os.path.relpath(os.path.join(work_dir, f"{dataset}_enriched"), data_dir) + "/"
+        jobs = []
+        for path in _data_files(os.path.join(data_dir, f"{dataset}_partitioned")):
+            key = os.path.relpath(path, data_dir).replace(os.sep, "/")
+            jobs.append((key, DATE_RE.search(key).group(1)))
+        paths = [os.path.join(data_dir, key) for key, _ in jobs]
+        stats["rows"] += _csv_rows(paths)
+        stats["bytes"] += _size(paths)
+
+        # procene pokrivaju i susedne dane, red može pasti u dan pre/posle particije
+        dates = sorted({d for _, d in jobs})
+        est_table = synthetic_estimates(dates + [_shift(d, -1) for d in dates] + [_shift(d, 1) for d in dates])
+        for key, date_str in jobs:
+            enrich_single_file(
+                s3, "local", key, dst_prefix, date_str, est_table,
+                output_format=output_format, dedup=params.get("dedup", "first"),
+            )
+            stats["files"] += 1
+
+    stats["rows_out"] = sum(_count_rows(os.path.join(work_dir, f"{d}_enriched")) for d in DATASETS)
+    return stats
+
+
+def _read(path: str):
+    import pandas as pd
+
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+
+def _count_rows(root: str) -> int:
+    return sum(len(_read(p)) for p in _data_files(root))
+
+
+def stage_rollup(data_dir: str, work_dir: str, params: Dict) -> Dict:
+    from rollup_pollution_daily_city import combine_rollups, rollup_day
+
+    enriched_dir = os.path.join(work_dir, "pollution_enriched")
+    paths = _data_files(enriched_dir)
+    if not paths:
+        raise FileNotFoundError("No enriched pollution files; run the enrich stage first")
+    rows = _file_rows(paths)
+
+    s3 = LocalS3(work_dir)
+    dates = sorted(os.path.basename(d)[len("date="):] for d in glob.glob(os.path.join(enriched_dir, "date=*")))
+    rollup = combine_rollups(rollup_day(s3, "local", "pollution_enriched/", d) for d in dates)
+    return {"rows": rows, "rows_out": len(rollup), "bytes": _size(paths)}
+
+
+def stage_athena(data_dir: str, work_dir: str, params: Dict) -> Dict:
+    import duckdb
+
+    from athena_local_runner import (
+        DEFAULT_QUERIES_GLOB, ROLLUP_TABLE, load_query, materialize_rollup, run_query,
+    )
+
+    sources = {
+        "tara_pollution_enriched": os.path.join(work_dir, "pollution_enriched"),
+        "tara_weather_enriched": os.path.join(work_dir, "weather_enriched"),
+    }
+    con = duckdb.connect()
+    queries = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sources[ROLLUP_TABLE] = materialize_rollup(sources["tara_pollution_enriched"], tmp_dir)
+        for path in sorted(glob.glob(str(REPO_ROOT / DEFAULT_QUERIES_GLOB))):
+            sql = load_query(path)
+            if sql is None:
+                continue
+            start = time.perf_counter()
+            r = run_query(con, os.path.basename(path), sql, sources)
+            queries[r["query"]] = {
+                "status": r["status"],
+                "seconds": round(time.perf_counter() - start, 4),
+                "rows_scanned": r["rows_scanned"],
+                "bytes_scanned": r["bytes_scanned"],
+            }
+    return {
+        "rows": sum(q["rows_scanned"] for q in queries.values()),
+        "bytes": sum(q["bytes_scanned"] for q in queries.values()),
+        "queries": queries,
+    }
+
+
+def stage_weather_transform(data_dir: str, work_dir: str, params: Dict) -> Dict:
+    from weather_transform import run
+
+    source = os.path.join(data_dir, "weather_partitioned")
+    stats = run([source], os.path.join(work_dir, "weather_transform.csv"))
+    return {"rows": stats["rows"], "files": stats["files"], "bytes": _size(_data_files(source))}
+
+
+STAGE_FUNCTIONS = {
+    "partition": stage_partition,
+    "enrich": stage_enrich,
+    "rollup": stage_rollup,
+    "athena": stage_athena,
+    "weather_transform": stage_weather_transform,
+}
+
+
+def run_child(stage: str, data_dir: str, work_dir: str, params: Dict) -> None:
+    """
+    Izvršava jednu fazu u ovom procesu i štampa JSON rezultat kao poslednju liniju.
+    """
+    start = time.perf_counter()
+    result = STAGE_FUNCTIONS[stage](data_dir, work_dir, params)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    # ru_maxrss je u KB na Linux-u, u bajtovima na macOS-u
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    print(json.dumps(result))
+
+
+def run_stage(stage: str, data_dir: str, work_dir: str, params: Dict) -> Dict:
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", stage, "--data", data_dir,
+         "--work", work_dir, "--params", json.dumps(params)],
+        capture_output=True, text=True, cwd=str(REPO_ROOT),
+    )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit code {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=str(REPO_ROOT), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(data_dir: str, work_dir: str, stages: List[str], params: Dict) -> List[Dict]:
+    meta = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "data": os.path.abspath(data_dir),
+        "params": params,
+    }
+    generated = os.path.join(data_dir, "_generated.json")
+    if os.path.exists(generated):
+        with open(generated, encoding="utf-8") as f:
+            meta["generated"] = {k: v for k, v in json.load(f).items() if k != "out_dir"}
+
+    records = []
+    for stage in stages:
+        result = run_stage(stage, data_dir, work_dir, params)
+        if "error" not in result and result.get("seconds"):
+            result["rows_per_sec"] = round(result.get("rows", 0) / result["seconds"], 1)
+        records.append({**meta, "stage": stage, **result})
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run the partition/enrich/rollup/athena/weather pipeline locally on synthetic data."
+    )
+    parser.add_argument("--data", required=True, help="Directory written by generate_synthetic.py (partitioned layout)")
+    parser.add_argument("--work", default=None, help="Directory for stage outputs (default: temporary, removed)")
+    parser.add_argument("--stage", action="append", choices=STAGES, help="Repeatable; default: all, in order")
+    parser.add_argument("--output-format", choices=("csv", "parquet"), default="csv", help="Enriched output format")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="first", help="Enrich dedup mode")
+    parser.add_argument(
+        "--partition-dedup",
+        choices=DEDUP_MODES,
+        default=PARTITION_DEDUP,
+        help=f"Partition stage dedup mode, as DEDUP of partition_by_date_job (default: {PARTITION_DEDUP})",
+    )
+    parser.add_argument(
+        "--results",
+        default=str(REPO_ROOT / "benchmarks" / "results.jsonl"),
+        help="Append results as JSON lines to this file (default: benchmarks/results.jsonl)",
+    )
+    parser.add_argument("--child", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--params", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.data, args.work, json.loads(args.params))
+        return
+
+    params = {"output_format": args.output_format, "dedup": args.dedup, "partition_dedup": args.partition_dedup}
+    work_dir = args.work or tempfile.mkdtemp(prefix="bench-")
+    try:
+        records = benchmark(args.data, work_dir, args.stage or STAGES, params)
+    finally:
+        if not args.work:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'stage':18} {'rows':>10} {'sec':>9} {'rows/s':>12} {'MB in':>9} {'peak RSS MB':>12}")
+    for r in records:
+        if "error" in r:
+            print(f"{r['stage']:18} ERROR {r['error']}")
+            continue
+        print(
+            f"{r['stage']:18} {r.get('rows', 0):>10} {r['seconds']:>9} {r.get('rows_per_sec', '-'):>12} "
+            f"{r.get('bytes', 0) / 1e6:>9.1f} {r['peak_rss_mb']:>12}"
+        )
+
+    if args.results:
+        with open(args.results, "a", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+'''
+Compaction particija - spaja male part fajlove u svakoj date= particiji
+(i dubljim, npr. date=/hour=) u fajlove ciljne veličine.
+
+Argumenti:
+  --TARGET_PATH s3://bucket/prefix   particionisani izlaz (npr. pollution_partitioned)
+  --TARGET_FILE_SIZE_MB 128          (opciono) ciljna veličina fajla
+  --DATES 2022-05-01,2022-05-02      (opciono) samo ove date= particije
+  --ENRICHED_PATH s3://bucket/prefix (opciono) enriched izlaz ovog dataset-a
+                                     (enrich_tourist_partitioned.py), u istom bucket-u;
+                                     BRIŠE enriched fajlove, vidi UPOZORENJE ispod
+
+enrich_tourist_partitioned.py pravi jedan enriched fajl po source fajlu (isti
+put bez prvog segmenta, scripts/enriched_paths.py), a manifest mu je po source
+key-u. Posle kompakcije sledeći enrich obogati part-compacted-* fajlove, pa bi
+stari enriched fajlovi istih redova ostali pored novih i Athena/rollup/korelacija
+bi ih brojali dvaput. Zato se za prefikse koje enrich čita (npr.
+pollution_partitioned) mora zadati ENRICHED_PATH: enriched fajlovi obrisanih
+source fajlova (.csv i .parquet varijanta) brišu se zajedno sa njima.
+Bez ENRICHED_PATH job je samo za terminalne prefikse iz kojih se ništa ne pravi
+fajl po fajl (enriched izlaz, pollution_daily_city, ...).
+
+!!! UPOZORENJE - ENRICHED_PATH BRIŠE ENRICHED PODATKE !!!
+  Brisanje je opt-in (samo uz ENRICHED_PATH) i job NE pokreće enrich ponovo.
+  Od kraja ovog job-a do sledećeg enrich_tourist_partitioned.py run-a dani
+  kompaktovanih particija NEMAJU enriched redove: Athena upiti nad enriched
+  tabelama i pollution_daily_city za te dane vraćaju manje ili ništa.
+  Job na kraju ispisuje "REENRICH DATES: [...]"; odmah posle njega pokrenuti
+  enrich za isti dataset (manifest preskače nepromenjene fajlove, pa se
+  obogate samo part-compacted-* fajlovi, a rollup tih dana se ponovo računa).
+  Ne zadavati ENRICHED_PATH ako enrich ne može da se pokrene odmah posle.
+
+Za svaku particiju:
+  1. ciljni broj fajlova = ceil(ukupno bajtova / ciljna veličina); ako particija
+     već nema više fajlova od toga, preskače se (ponovno pokretanje ne radi ništa)
+  2. Spark upisuje spojene fajlove u <particija>/_compacting/<run_id>/
+     (Athena i Spark ignorišu putanje sa _)
+  3. fajlovi se kopiraju u particiju kao part-compacted-<run_id>-NNNNN
+  4. upisuje se <particija>/_compaction.json sa listom starih fajlova, staging-a
+     i njihovih enriched fajlova (ako je zadat ENRICHED_PATH)
+  5. delete_objects briše sve iz liste, pa i marker
+
+S3 nema atomični rename, pa između koraka 3 i 5 čitač može na kratko da vidi i
+stare i nove fajlove. Prekinut run se popravlja na sledećem pokretanju: postojeći
+_compaction.json se dovrši (korak 5), a _compacting/<run_id>/ bez markera znači
+da kopiranje nije završeno, pa se brišu staging i part-compacted-<run_id>-* fajlovi.
+
+Firehose ulazi (pollution/<lokacija>/<dd-mm-yyyy>/...) se ne spajaju: dedup u
+partition_by_date_job bira red po imenu firehose fajla.
+
+Uz ENRICHED_PATH job se pokreće sa
+--extra-py-files s3://<bucket>/<scripts>/enriched_paths.py.
+'''
+
+import json
+import math
+import sys
+import uuid
+from collections import defaultdict
+
+import boto3
+from awsglue.utils import getResolvedOptions
+from awsglue.context import GlueContext
+from awsglue.job import Job
+from pyspark.context import SparkContext
+
+# scripts/enriched_paths.py, dodat preko --extra-py-files
+from enriched_paths import enriched_keys
+
+OPTIONAL_ARGS = {
+    "TARGET_FILE_SIZE_MB": "128",
+    "DATES": "",
+    "ENRICHED_PATH": "",
+}
+STAGING_DIR = "_compacting"
+MARKER_NAME = "_compaction.json"
+COMPACTED_PREFIX = "part-compacted-"
+DELETE_BATCH_SIZE = 1000
+
+args = getResolvedOptions(
+    sys.argv,
+    ["JOB_NAME", "TARGET_PATH"]
+    + [name for name in OPTIONAL_ARGS if f"--{name}" in sys.argv]
+)
+for name, default in OPTIONAL_ARGS.items():
+    args.setdefault(name, default)
+
+bucket, _, base_prefix = args["TARGET_PATH"].replace("s3://", "", 1).partition("/")
+base_prefix = base_prefix.rstrip("/") + "/"
+target_file_size = int(args["TARGET_FILE_SIZE_MB"]) * 1024 * 1024
+only_dates = {d.strip() for d in args["DATES"].split(",") if d.strip()}
+enriched_prefix = None
+if args["ENRICHED_PATH"]:
+    enriched_bucket, _, enriched_prefix = args["ENRICHED_PATH"].replace("s3://", "", 1).partition("/")
+    if enriched_bucket != bucket:
+        raise ValueError(f"ENRICHED_PATH must be in bucket {bucket}, got {args['ENRICHED_PATH']!r}")
+    enriched_prefix = enriched_prefix.rstrip("/") + "/"
+# dani čiji su enriched fajlovi obrisani; enrich ih mora ponovo obraditi
+reenrich_dates = set()
+
+print(f"TARGET PATH: s3://{bucket}/{base_prefix}")
+print(f"TARGET FILE SIZE: {target_file_size} bytes")
+print(f"DATES:       {sorted(only_dates) or 'all'}")
+print(f"ENRICHED:    {f's3://{bucket}/{enriched_prefix}' if enriched_prefix else 'none (terminal prefix)'}")
+
+sc = SparkContext()
+glueContext = GlueContext(sc)
+spark = glueContext.spark_session
+
+job = Job(glueContext)
+job.init(args["JOB_NAME"], args)
+
+s3 = boto3.client("s3")
+
+
+def list_objects(prefix):
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        yield from page.get("Contents", [])
+
+
+def delete_keys(keys):
+    keys = list(keys)
+    for i in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[i:i + DELETE_BATCH_SIZE]
+        resp = s3.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": k} for k in batch], "Quiet": True},
+        )
+        if resp.get("Errors"):
+            raise RuntimeError(f"delete_objects failed: {resp['Errors'][:5]}")
+
+
+def hidden_index(relative_key):
+    """
+    Indeks prvog segmenta putanje koji počinje sa _ ili . (None ako ga nema).
+    """
+    for i, part in enumerate(relative_key.split("/")):
+        if part.startswith(("_", ".")):
+            return i
+    return None
+
+
+def partition_date(partition):
+    for part in partition.split("/"):
+        if part.startswith("date="):
+            return part[len("date="):]
+    return None
+
+
+def scan_partitions(prefix=base_prefix):
+    """
+    {particija: {"files": [(key, size)], "hidden": [key]}} - particija je
+    direktorijum (sa / na kraju) u kome su data fajlovi. _compacting/...,
+    _compaction.json i _SUCCESS pripadaju prvom direktorijumu iznad njih.
+    """
+    partitions = defaultdict(lambda: {"files": [], "hidden": []})
+    for obj in list_objects(prefix):
+        key = obj["Key"]
+        if key.endswith("/"):
+            continue
+        parts = key[len(base_prefix):].split("/")
+        idx = hidden_index("/".join(parts))
+        if idx is None:
+            partitions[key.rsplit("/", 1)[0] + "/"]["files"].append((key, obj["Size"]))
+        else:
+            partition = base_prefix + "".join(p + "/" for p in parts[:idx])
+            partitions[partition]["hidden"].append(key)
+    return partitions
+
+
+def recover(partition, hidden_keys):
+    """
+    Dovršava ili poništava prekinut run u particiji.
+    """
+    marker_key = partition + MARKER_NAME
+    if marker_key in hidden_keys:
+        marker = json.loads(s3.get_object(Bucket=bucket, Key=marker_key)["Body"].read())
+        print(f"[RECOVER] {partition}: finishing run {marker['run_id']}")
+        delete_keys(marker["delete"] + [marker_key])
+        if enriched_prefix and any(k.startswith(enriched_prefix) for k in marker["delete"]):
+            reenrich_dates.add(partition_date(partition) or partition)
+        return True
+
+    staging_prefix = partition + STAGING_DIR + "/"
+    staged = [k for k in hidden_keys if k.startswith(staging_prefix)]
+    if not staged:
+        return False
+
+    run_ids = {k[len(staging_prefix):].split("/", 1)[0] for k in staged}
+    partial = [
+        obj["Key"] for run_id in run_ids
+        for obj in list_objects(f"{partition}{COMPACTED_PREFIX}{run_id}-")
+    ]
+    print(f"[RECOVER] {partition}: discarding unfinished runs {sorted(run_ids)}")
+    delete_keys(staged + partial)
+    return True
+
+
+def file_extension(keys):
+    name = keys[0].rsplit("/", 1)[-1]
+    ext = "." + name.rsplit(".", 1)[-1] if "." in name else ""
+    return ext if all(k.endswith(ext) for k in keys) else ""
+
+
+def compact(partition, files):
+    keys = [k for k, _ in files]
+    total_bytes = sum(size for _, size in files)
+    target_files = max(1, math.ceil(total_bytes / target_file_size))
+    if len(files) <= target_files:
+        return None
+
+    run_id = uuid.uuid4().hex[:12]
+    staging_prefix = f"{partition}{STAGING_DIR}/{run_id}/"
+    paths = [f"s3://{bucket}/{k}" for k in keys]
+    ext = file_extension(keys)
+
+    if ext == ".parquet":
+        df = spark.read.parquet(*paths)
+        df.repartition(target_files).write.option("compression", "snappy") \
+            .parquet(f"s3://{bucket}/{staging_prefix}")
+    else:
+        # bez inferSchema: vrednosti se prepisuju kao tekst, bez promene formata
+        df = spark.read.option("header", True).csv(paths)
+        df.repartition(target_files).write.option("header", True) \
+            .csv(f"s3://{bucket}/{staging_prefix}")
+
+    staged = [obj["Key"] for obj in list_objects(staging_prefix)]
+    staged_data = sorted(k for k in staged if hidden_index(k[len(staging_prefix):]) is None)
+
+    compacted = []
+    for i, staged_key in enumerate(staged_data):
+        dst_key = f"{partition}{COMPACTED_PREFIX}{run_id}-{i:05d}{ext}"
+        s3.copy_object(
+            Bucket=bucket,
+            Key=dst_key,
+            CopySource={"Bucket": bucket, "Key": staged_key},
+        )
+        compacted.append(dst_key)
+
+    # enriched fajlovi starih source fajlova; nepostojeći key delete_objects preskače
+    enriched = [k for key in keys for k in enriched_keys(key, enriched_prefix)] if enriched_prefix else []
+
+    marker_key = partition + MARKER_NAME
+    s3.put_object(
+        Bucket=bucket,
+        Key=marker_key,
+        Body=json.dumps({
+            "run_id": run_id,
+            "compacted": compacted,
+            "delete": keys + staged + enriched,
+        }).encode("utf-8"),
+    )
+    delete_keys(keys + staged + enriched + [marker_key])
+
+    return {"files_before": len(keys), "files_after": len(compacted), "bytes": total_bytes}
+
+
+stats = {"partitions": 0, "compacted": 0, "recovered": 0, "files_before": 0, "files_after": 0}
+
+for partition, content in sorted(scan_partitions().items()):
+    if only_dates and partition_date(partition) not in only_dates:
+        continue
+    stats["partitions"] += 1
+
+    if recover(partition, content["hidden"]):
+        stats["recovered"] += 1
+        # posle oporavka lista fajlova više ne važi
+        content = scan_partitions(partition).get(partition, {"files": []})
+
+    if not content["files"]:
+        continue
+
+    result = compact(partition, content["files"])
+    if result is None:
+        print(f"[SKIP] {partition}: {len(content['files'])} file(s), already compact")
+        continue
+
+    stats["compacted"] += 1
+    if enriched_prefix:
+        reenrich_dates.add(partition_date(partition) or partition)
+    stats["files_before"] += result["files_before"]
+    stats["files_after"] += result["files_after"]
+    print(f"[COMPACT] {partition}: {result['files_before']} -> {result['files_after']} file(s), "
+          f"{result['bytes']} bytes")
+
+print("COMPACTION: " + json.dumps(stats, sort_keys=True))
+if reenrich_dates:
+    print(f"REENRICH DATES: {json.dumps(sorted(reenrich_dates))} - enriched files deleted, "
+          f"rerun enrich_tourist_partitioned.py for s3://{bucket}/{base_prefix}")
+
+job.commit()
@@ -1,29 +1,183 @@
 '''
 Load and Partition Data from S3 Files - Trello task
-Za weather, pollution i sensor mi je ista skripta, jedina razlika 
-je partition kolona kod sensor - time_nano.
+Za weather, pollution i sensor mi je ista skripta, razlika su samo
+argumenti (DATASET, PARTITION_KEYS).
+
+Opcioni argument:
+  --OUTPUT_FORMAT csv|parquet  (default csv); parquet je snappy kompresovan,
+                               isti date= layout, pa Athena čita samo kolone
+                               koje query koristi.
+  --DEDUP first|last|none      (default first); firehose upisuje isti red
+                               (name, time_nano) u više fajlova, ovde ostaje
+                               samo jedan: prvi/poslednji po _input_file
+                               (ime firehose fajla sadrži vreme isporuke).
+  --DATASET weather|pollution|sensor
+                               (default: poslednji segment SOURCE_PATH-a);
+                               bira šemu iz SCHEMAS. CSV se čita jednom, sa
+                               zadatim tipovima, a "None"/prazno je null
+                               (inferSchema je čitao ulaz dva puta i pm10 je
+                               zbog "None" ispadao string). Za dataset bez
+                               šeme u SCHEMAS ostaje inferSchema.
+  --METRICS_MODE observe|count|off
+                               (default observe); observe skuplja broj redova,
+                               null datuma i redova posle dedup-a tokom samog
+                               upisa (Observation), a broj fajlova iz liste
+                               ulaznih fajlova, pa se ulaz čita jednom. Upis
+                               tada ide preko Spark writer-a (Observation se
+                               popunjava samo na DataFrame akciji). count je
+                               staro ponašanje sa dodatnim count() prolazima.
+                               Metrike se ispisuju kao jedan JSON red pre
+                               job.commit().
+  --INCREMENTAL true|false     (default false); umesto {SOURCE_PATH}/*/* čita
+                               samo objekte čiji je LastModified posle
+                               watermark-a prethodnog uspešnog run-a i dopisuje
+                               (append) ih u date= particije koje pogađaju.
+                               Uz DEDUP first|last novi redovi se porede i sa
+                               već upisanim particijama svojih datuma
+                               (scripts/partition_dedup.py), pa duplikat koji
+                               stigne u sledećem run-u ne ulazi; upisani red
+                               ostaje (last važi samo unutar batch-a).
+                               Datumi batch-a se skupljaju posebnom Spark
+                               akcijom, pa se dedup-ovan batch pre nje
+                               persist-uje (MEMORY_AND_DISK): ulaz se čita
+                               jednom, a upis čita keširan batch.
+  --WATERMARK_PATH s3://...    (default {TARGET_PATH}/_watermark.json); JSON sa
+                               poslednjim obrađenim LastModified i key-evima
+                               sa tim vremenom. Upisuje se tek posle upisa
+                               podataka, pa neuspeo run ponavlja iste fajlove.
+                               (Glue job bookmarks ne prate spark.read.)
+  --PARTITION_KEYS date[,hour][,location]
+                               (default date); kolone i redosled particija,
+                               npr. date,hour za sensor. hour se računa iz
+                               int64 time_nano celobrojno (bez parsiranja
+                               stringa), po lokalnom vremenu UTC_OFFSET_HOURS;
+                               location je id senzora iz name ("1248 - ...").
+  --UTC_OFFSET_HOURS 2         (default 2); time_date je time_nano + 2h za sve
+                               podatke, pa hour/date iz time_nano odgovaraju
+                               time_date.
+
+date i hour računa scripts/time_columns.py (add_spark_time_columns), isti kod
+kao u pandas skriptama; job se pokreće sa
+--extra-py-files s3://<bucket>/<scripts>/time_columns.py,s3://<bucket>/<scripts>/partition_dedup.py.
 '''
 
+import json
 import sys
+from datetime import datetime, timezone
+
+import boto3
 from awsglue.utils import getResolvedOptions
 from awsglue.context import GlueContext
 from awsglue.job import Job
 from awsglue.dynamicframe import DynamicFrame
+from pyspark import StorageLevel
 from pyspark.context import SparkContext
-from pyspark.sql.functions import to_date, col, input_file_name
+from pyspark.sql import Observation, Window
+from pyspark.sql.functions import (
+    col, count, input_file_name, lit, row_number, split, sum as sum_, when
+)
+from pyspark.sql.types import (
+    DoubleType, LongType, StringType, StructField, StructType, TimestampType
+)
+
+# scripts/time_columns.py i scripts/partition_dedup.py, dodati preko --extra-py-files
+from partition_dedup import drop_already_written
+from time_columns import add_spark_time_columns
+
+OPTIONAL_ARGS = {
+    "OUTPUT_FORMAT": "csv",
+    "DEDUP": "first",
+    "DATASET": "",
+    "METRICS_MODE": "observe",
+    "INCREMENTAL": "false",
+    "WATERMARK_PATH": "",
+    "PARTITION_KEYS": "date",
+    "UTC_OFFSET_HOURS": "2",
+}
+OUTPUT_FORMATS = ("csv", "parquet")
+DEDUP_MODES = ("first", "last", "none")
+DEDUP_KEYS = ["name", "time_nano"]
+DATASETS = ("weather", "pollution", "sensor")
+METRICS_MODES = ("observe", "count", "off")
+PARTITION_COLUMNS = ("date", "hour", "location")
+NULL_VALUE = "None"
+
+BASE_FIELDS = [
+    StructField("name", StringType()),
+    StructField("time_nano", LongType()),
+    StructField("time_date", TimestampType()),
+    StructField("location_latitude", DoubleType()),
+    StructField("location_longitude", DoubleType()),
+    StructField("location_name", StringType()),
+]
+
+# Kolone se mapiraju po poziciji; weather_windGust je poslednja jer je stariji
+# fajlovi nemaju, pa kod njih ostaje null.
+SCHEMAS = {
+    "weather": StructType(BASE_FIELDS + [
+        StructField("weather_temperature", DoubleType()),
+        StructField("weather_feelsLike", DoubleType()),
+        StructField("weather_pressure", LongType()),
+        StructField("weather_humidity", LongType()),
+        StructField("weather_dewPoint", DoubleType()),
+        StructField("weather_clouds", LongType()),
+        StructField("weather_windSpeed", DoubleType()),
+        StructField("weather_windDeg", LongType()),
+        StructField("weather_windGust", DoubleType()),
+    ]),
+    "pollution": StructType(BASE_FIELDS + [
+        StructField("measurement_pm10Atmo", DoubleType()),
+        StructField("measurement_pm25Atmo", DoubleType()),
+        StructField("measurement_pm100Atmo", DoubleType()),
+    ]),
+}
 
 args = getResolvedOptions(
     sys.argv,
     ["JOB_NAME", "SOURCE_PATH", "TARGET_PATH"]
+    + [name for name in OPTIONAL_ARGS if f"--{name}" in sys.argv]
 )
+for name, default in OPTIONAL_ARGS.items():
+    args.setdefault(name, default)
 
 source_base = args["SOURCE_PATH"].rstrip("/")
 target_path = args["TARGET_PATH"].rstrip("/")
+output_format = args["OUTPUT_FORMAT"].lower()
+if output_format not in OUTPUT_FORMATS:
+    raise ValueError(f"OUTPUT_FORMAT must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+dedup_mode = args["DEDUP"].lower()
+if dedup_mode not in DEDUP_MODES:
+    raise ValueError(f"DEDUP must be one of {DEDUP_MODES}, got {dedup_mode!r}")
+
+dataset = (args["DATASET"] or source_base.rsplit("/", 1)[-1]).lower()
+if args["DATASET"] and dataset not in DATASETS:
+    raise ValueError(f"DATASET must be one of {DATASETS}, got {dataset!r}")
+schema = SCHEMAS.get(dataset)
+metrics_mode = args["METRICS_MODE"].lower()
+if metrics_mode not in METRICS_MODES:
+    raise ValueError(f"METRICS_MODE must be one of {METRICS_MODES}, got {metrics_mode!r}")
+
+partition_keys = [k.strip().lower() for k in args["PARTITION_KEYS"].split(",") if k.strip()]
+unknown_keys = [k for k in partition_keys if k not in PARTITION_COLUMNS]
+if not partition_keys or unknown_keys or len(set(partition_keys)) != len(partition_keys):
+    raise ValueError(
+        f"PARTITION_KEYS must be distinct values from {PARTITION_COLUMNS}, got {args['PARTITION_KEYS']!r}"
+    )
+utc_offset_hours = int(args["UTC_OFFSET_HOURS"])
+
+incremental = args["INCREMENTAL"].lower() in ("true", "1", "yes")
+watermark_path = args["WATERMARK_PATH"] or f"{target_path}/_watermark.json"
 
 input_path = f"{source_base}/*/*"
 
 print(f"INPUT PATH:  {input_path}")
 print(f"TARGET PATH: {target_path}")
+print(f"OUTPUT FORMAT: {output_format}")
+print(f"DEDUP:       {dedup_mode}")
+print(f"DATASET:     {dataset} ({'explicit schema' if schema else 'inferSchema'})")
+print(f"METRICS:     {metrics_mode}")
+print(f"PARTITIONS:  {partition_keys} (UTC{utc_offset_hours:+d})")
+print(f"INCREMENTAL: {incremental}" + (f" (watermark {watermark_path})" if incremental else ""))
 
 sc = SparkContext()
 glueContext = GlueContext(sc)
@@ -32,42 +186,184 @@ spark = glueContext.spark_session
 job = Job(glueContext)
 job.init(args["JOB_NAME"], args)
 
-df = (
-    spark.read
-    .option("header", True)
-    .option("inferSchema", True)
-    .csv(input_path)
-)
+
+def split_s3_path(path):
+    bucket, _, key = path.replace("s3://", "", 1).replace("s3a://", "", 1).partition("/")
+    return bucket, key
+
+
+def read_watermark(s3_client, path):
+    bucket, key = split_s3_path(path)
+    try:
+        body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except s3_client.exceptions.NoSuchKey:
+        return None
+    return json.loads(body)
+
+
+def list_new_source_objects(s3_client, watermark):
+    """
+    Objekti na istoj dubini kao {SOURCE_PATH}/*/* (lokacija/datum/fajl), noviji
+    od watermark-a. Key-evi sa istim LastModified kao watermark se porede po imenu.
+    """
+    bucket, prefix = split_s3_path(source_base + "/")
+    since = datetime.fromisoformat(watermark["last_modified"]) if watermark else None
+    seen_at_since = set(watermark["keys"]) if watermark else set()
+
+    new_objects = []
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            parts = obj["Key"][len(prefix):].split("/")
+            if len(parts) != 3 or any(not p or p.startswith(("_", ".")) for p in parts):
+                continue
+            modified = obj["LastModified"]
+            if since is not None and (
+                modified < since or (modified == since and obj["Key"] in seen_at_since)
+            ):
+                continue
+            new_objects.append((obj["Key"], modified))
+    return bucket, new_objects
+
+
+def write_watermark(s3_client, path, objects):
+    last_modified = max(modified for _, modified in objects)
+    bucket, key = split_s3_path(path)
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps({
+            "last_modified": last_modified.isoformat(),
+            "keys": sorted(k for k, modified in objects if modified == last_modified),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }).encode("utf-8"),
+    )
+    return last_modified
+
+
+input_paths = [input_path]
+new_objects = []
+if incremental:
+    s3_client = boto3.client("s3")
+    watermark = read_watermark(s3_client, watermark_path)
+    source_bucket, new_objects = list_new_source_objects(s3_client, watermark)
+    print(f"WATERMARK:   {watermark['last_modified'] if watermark else 'none (first run)'}")
+    print(f"NEW FILES:   {len(new_objects)}")
+
+    if not new_objects:
+        print("Nothing new since the last run")
+        job.commit()
+        sys.exit(0)
+
+    input_paths = [f"s3://{source_bucket}/{key}" for key, _ in new_objects]
+
+reader = spark.read.option("header", True).option("nullValue", NULL_VALUE)
+if schema is not None:
+    reader = reader.schema(schema)
+else:
+    reader = reader.option("inferSchema", True)
+
+df = reader.csv(input_paths)
 
 df = df.withColumn("_input_file", input_file_name())
 
-row_count = df.count()
-file_count = df.select("_input_file").distinct().count()
+metrics = {
+    "job_name": args["JOB_NAME"],
+    "dataset": dataset,
+    "source_path": input_path,
+    "target_path": target_path,
+    "output_format": output_format,
+    "dedup": dedup_mode,
+    "incremental": incremental,
+    "partition_keys": partition_keys,
+}
 
-print(f"INPUT rows:  {row_count}")
-print(f"INPUT files: {file_count}")
+if metrics_mode == "count":
+    metrics["input_rows"] = df.count()
+    metrics["input_files"] = df.select("_input_file").distinct().count()
+    print(f"INPUT rows:  {metrics['input_rows']}")
+    print(f"INPUT files: {metrics['input_files']}")
+elif metrics_mode == "observe":
+    # lista fajlova iz file index-a, bez čitanja podataka
+    metrics["input_files"] = len(df.inputFiles())
 
-df = df.withColumn(
-    "date",
-    to_date(col("time_date"), "yyyy-MM-dd HH:mm:ss")
+# date (i hour) iz int64 time_nano, bez parsiranja time_date
+df = add_spark_time_columns(
+    df, utc_offset_hours, ["date"] + (["hour"] if "hour" in partition_keys else [])
 )
+if "location" in partition_keys:
+    df = df.withColumn("location", split(col("name"), " - ").getItem(0))
 
-null_date_count = df.filter(col("date").isNull()).count()
-print(f"ROWS WITH NULL date: {null_date_count}")
-
-dyf = DynamicFrame.fromDF(df, glueContext, "weather_dyf")
-
-glueContext.write_dynamic_frame.from_options(
-    frame=dyf,
-    connection_type="s3",
-    format="csv",
-    connection_options={
-        "path": target_path,
-        "partitionKeys": ["date"]
-    },
-    format_options={
-        "withHeader": True
-    }
-)
+if metrics_mode == "count":
+    metrics["null_date_rows"] = df.filter(col("date").isNull()).count()
+    print(f"ROWS WITH NULL date: {metrics['null_date_rows']}")
+elif metrics_mode == "observe":
+    input_observation = Observation("input")
+    df = df.observe(
+        input_observation,
+        count(lit(1)).alias("input_rows"),
+        sum_(when(col("date").isNull(), 1).otherwise(0)).alias("null_date_rows"),
+    )
+
+persisted = None
+if dedup_mode != "none":
+    order = col("_input_file").asc() if dedup_mode == "first" else col("_input_file").desc()
+    dedup_window = Window.partitionBy(*DEDUP_KEYS).orderBy(order)
+    df = (
+        df.withColumn("_dedup_rank", row_number().over(dedup_window))
+        .filter(col("_dedup_rank") == 1)
+        .drop("_dedup_rank")
+    )
+    if incremental:
+        # duplikati iz ranijih run-ova su već u target-u; drop_already_written
+        # skuplja datume posebnom akcijom, pa bez persist-a upis bi ponovo
+        # čitao ulaz i ponovo radio dedup
+        persisted = df.persist(StorageLevel.MEMORY_AND_DISK)
+        df = drop_already_written(persisted, spark, target_path, partition_keys, output_format)
+
+if metrics_mode == "observe":
+    output_observation = Observation("output")
+    df = df.observe(output_observation, count(lit(1)).alias("output_rows"))
+
+    writer = df.write.mode("append").partitionBy(*partition_keys)
+    if output_format == "parquet":
+        writer.option("compression", "snappy").parquet(target_path)
+    else:
+        # isti format time_date kao Glue csv writer
+        writer.option("header", True).option("timestampFormat", "yyyy-MM-dd HH:mm:ss").csv(target_path)
+
+    metrics.update(input_observation.get)
+    metrics.update(output_observation.get)
+    metrics["null_date_rows"] = metrics["null_date_rows"] or 0
+    metrics["duplicate_rows"] = metrics["input_rows"] - metrics["output_rows"]
+else:
+    dyf = DynamicFrame.fromDF(df, glueContext, "weather_dyf")
+
+    if output_format == "parquet":
+        write_format = "glueparquet"
+        format_options = {"compression": "snappy"}
+    else:
+        write_format = "csv"
+        format_options = {"withHeader": True}
+
+    glueContext.write_dynamic_frame.from_options(
+        frame=dyf,
+        connection_type="s3",
+        format=write_format,
+        connection_options={
+            "path": target_path,
+            "partitionKeys": partition_keys
+        },
+        format_options=format_options
+    )
+
+if persisted is not None:
+    persisted.unpersist()
+
+if incremental:
+    metrics["watermark"] = write_watermark(s3_client, watermark_path, new_objects).isoformat()
+
+if metrics_mode != "off":
+    print("JOB METRICS: " + json.dumps(metrics, sort_keys=True))
 
 job.commit()
\ No newline at end of file
@@ -16,6 +16,7 @@ DEST_BUCKET_NAME = os.getenv("CSV_DEST_BUCKET_NAME")
 CSV_COPY_FUNCTION_NAME = os.getenv("CSV_COPY_FUNCTION_NAME")
 CSV_SOURCE_KEY = os.getenv("CSV_SOURCE_KEY", "input/data.csv")
 CSV_DEST_KEY = os.getenv("CSV_DEST_KEY", "output/data-copy.csv")
+CSV_COPY_MAX_WORKERS = os.getenv("CSV_COPY_MAX_WORKERS", "16")
 MY_LAYER_VERSION_NAME = os.getenv("MY_UTILS_LAYER_NAME")
 LAYER_DEMO_FUNCTION_NAME = os.getenv("LAYER_DEMO_FUNCTION_NAME")
 
@@ -57,7 +58,8 @@ class CsvLambdaStack(Stack):
             code=_lambda.DockerImageCode.from_image_asset(
                 directory=str(lambda_image_dir)
             ),
-            timeout=Duration.seconds(30),
+            # batch/prefix copy runs many copies in one invocation
+            timeout=Duration.minutes(5),
             memory_size=512,
             architecture=_lambda.Architecture.ARM_64,
             reserved_concurrent_executions=1,
@@ -67,6 +69,7 @@ class CsvLambdaStack(Stack):
                 "SOURCE_KEY": CSV_SOURCE_KEY,
                 "DEST_BUCKET": dest_bucket.bucket_name,
                 "DEST_KEY": CSV_DEST_KEY,
+                "COPY_MAX_WORKERS": CSV_COPY_MAX_WORKERS,
             },
         )
 
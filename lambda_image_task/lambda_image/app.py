@@ -1,13 +1,26 @@
 import os
-import boto3
-from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 
-s3 = boto3.client("s3")
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
 DEFAULT_SOURCE_BUCKET = os.environ.get("SOURCE_BUCKET", "").strip()
 DEFAULT_SOURCE_KEY = os.environ.get("SOURCE_KEY", "").strip()
 DEFAULT_DEST_BUCKET = os.environ.get("DEST_BUCKET", "").strip()
 DEFAULT_DEST_KEY = os.environ.get("DEST_KEY", "").strip()
+MAX_WORKERS = int(os.environ.get("COPY_MAX_WORKERS", "16"))
+
+
+_s3_client = None
+
+
+def get_s3_client():
+    """S3 client is created on first use and reused by warm invocations."""
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client("s3", config=Config(max_pool_connections=MAX_WORKERS))
+    return _s3_client
 
 
 def _first_non_empty(*values):
@@ -17,11 +30,133 @@ def _first_non_empty(*values):
     return ""
 
 
+def _copy_one(s3, job):
+    """Server-side copy of one object.
+
+    copy_object keeps ContentType and user metadata by default
+    (MetadataDirective=COPY), so no head_object is needed.
+    """
+    source_bucket, source_key, dest_bucket, dest_key = job
+    result = {
+        "source": f"s3://{source_bucket}/{source_key}",
+        "dest": f"s3://{dest_bucket}/{dest_key}",
+    }
+    try:
+        s3.copy_object(
+            Bucket=dest_bucket,
+            Key=dest_key,
+            CopySource={"Bucket": source_bucket, "Key": source_key},
+        )
+    except (BotoCoreError, ClientError) as exc:
+        print(f"Copy failed {result['source']}: {exc}")
+        result.update(status="failed", error=str(exc))
+        return result
+
+    result["status"] = "copied"
+    return result
+
+
+def _list_prefix_jobs(s3, source_bucket, source_prefix, dest_bucket, dest_prefix):
+    jobs = []
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=source_bucket, Prefix=source_prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            if key.endswith("/"):
+                continue
+            jobs.append((source_bucket, key, dest_bucket, dest_prefix + key[len(source_prefix):]))
+    return jobs
+
+
+def _batch_jobs(event, source_bucket, dest_bucket):
+    """Jobs from `jobs` (list of source/dest overrides) and/or `source_prefix`."""
+    jobs = []
+    for item in event.get("jobs") or []:
+        item_source_bucket = _first_non_empty(item.get("source_bucket"), source_bucket).strip()
+        item_source_key = _first_non_empty(item.get("source_key"), item.get("key")).strip()
+        jobs.append((
+            item_source_bucket,
+            item_source_key,
+            _first_non_empty(item.get("dest_bucket"), dest_bucket, item_source_bucket).strip(),
+            _first_non_empty(item.get("dest_key"), item_source_key).strip(),
+        ))
+
+    source_prefix = event.get("source_prefix")
+    if source_prefix:
+        dest_prefix = event.get("dest_prefix", source_prefix)
+        jobs.extend(_list_prefix_jobs(
+            get_s3_client(), source_bucket, source_prefix, dest_bucket or source_bucket, dest_prefix
+        ))
+    return jobs
+
+
+def _copies_onto_itself(event, source_bucket, dest_bucket):
+    """True if prefix mode would write every object back to its own key."""
+    dest_prefix = event.get("dest_prefix", event["source_prefix"])
+    return (dest_bucket or source_bucket) == source_bucket and dest_prefix == event["source_prefix"]
+
+
+def _copy_batch(event, source_bucket, dest_bucket):
+    if event.get("source_prefix") and not source_bucket:
+        msg = "Missing source bucket for source_prefix; provide via env or event."
+        print(msg)
+        return {"statusCode": 400, "body": msg}
+
+    if event.get("source_prefix") and _copies_onto_itself(event, source_bucket, dest_bucket):
+        msg = "dest_bucket or dest_prefix must differ from the source for source_prefix."
+        print(msg)
+        return {"statusCode": 400, "body": msg}
+
+    try:
+        jobs = _batch_jobs(event, source_bucket, dest_bucket)
+    except (BotoCoreError, ClientError) as exc:
+        print(f"Listing failed: {exc}")
+        return {"statusCode": 500, "body": f"Listing failed: {exc}"}
+
+    invalid = [job for job in jobs if not all(job)]
+    if invalid:
+        msg = f"{len(invalid)} job(s) missing source/destination bucket or key."
+        print(msg)
+        return {"statusCode": 400, "body": msg}
+
+    self_copies = [job for job in jobs if job[:2] == job[2:]]
+    if self_copies:
+        msg = f"{len(self_copies)} job(s) would copy an object onto itself."
+        print(msg)
+        return {"statusCode": 400, "body": msg}
+
+    print(f"Copying {len(jobs)} object(s) with up to {MAX_WORKERS} workers")
+
+    s3 = get_s3_client() if jobs else None
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(lambda job: _copy_one(s3, job), jobs))
+
+    failed = sum(1 for r in results if r["status"] == "failed")
+    copied = len(results) - failed
+    return {
+        "statusCode": 500 if failed else 200,
+        "body": f"Copied {copied} of {len(results)} object(s)",
+        "copied": copied,
+        "failed": failed,
+        "results": results,
+    }
+
+
 def lambda_handler(event, context):
-    """Copy a CSV between buckets using server-side S3 copy.
+    """Copy CSVs between buckets using server-side S3 copy.
 
     Event can optionally override bucket/key values with the fields
     `source_bucket`, `source_key`, `dest_bucket`, `dest_key`.
+
+    Batch mode copies many objects concurrently in one invocation:
+    - `jobs`: list of {source_key, dest_key?, source_bucket?, dest_bucket?};
+      missing buckets fall back to the top-level/env values and a missing
+      dest_key keeps the source key.
+    - `source_prefix` (+ optional `dest_prefix`): every object under the prefix.
+      The destination bucket or prefix must differ from the source; a job
+      that would copy an object onto itself is rejected with 400.
+    The response then carries per-item `results`; statusCode is 500 if any
+    copy failed.
     """
 
     event = event or {}
@@ -31,6 +166,15 @@ def lambda_handler(event, context):
         event.get("bucket"),
         DEFAULT_SOURCE_BUCKET,
     ).strip()
+
+    if event.get("jobs") or event.get("source_prefix"):
+        dest_bucket = _first_non_empty(
+            event.get("dest_bucket"),
+            event.get("DestBucket"),
+            DEFAULT_DEST_BUCKET,
+        ).strip()
+        return _copy_batch(event, source_bucket, dest_bucket)
+
     source_key = _first_non_empty(
         event.get("source_key"),
         event.get("SourceKey"),
@@ -60,18 +204,9 @@ def lambda_handler(event, context):
 
     print(f"Copying s3://{source_bucket}/{source_key} -> s3://{dest_bucket}/{dest_key}")
 
-    try:
-        head = s3.head_object(Bucket=source_bucket, Key=source_key)
-        content_type = head.get("ContentType", "text/csv")
-        s3.copy_object(
-            Bucket=dest_bucket,
-            Key=dest_key,
-            CopySource={"Bucket": source_bucket, "Key": source_key},
-            ContentType=content_type,
-        )
-    except ClientError as exc:
-        print(f"Copy failed: {exc}")
-        return {"statusCode": 500, "body": f"Copy failed: {exc}"}
+    result = _copy_one(get_s3_client(), (source_bucket, source_key, dest_bucket, dest_key))
+    if result["status"] == "failed":
+        return {"statusCode": 500, "body": f"Copy failed: {result['error']}"}
 
     return {
         "statusCode": 200,
@@ -0,0 +1,285 @@
+"""
+Lokalno pokretanje athena_queries/*.sql nad data/*.csv ili lokalnim date= stablom,
+preko ugrađenog SQL engine-a (DuckDB, pip install duckdb).
+
+Za svaki query ispisuje broj vraćenih redova, broj fajlova, redova i bajtova koje
+bi Athena skenirala i trajanje, pa se izmene query-ja ili layout-a (parquet,
+rollup, kompakcija) mogu porediti bez Athene.
+
+- Particije se seku po predikatima `day = DATE 'YYYY-MM-DD'` i
+  `"date" = 'YYYY-MM-DD'`: za tabele sa date= layout-om čitaju se samo te
+  particije (day u query-jima je uvek datum particije). Predikat se ne
+  vezuje za tabelu, pa se query-ji sa više tabela (JOIN, npr. korelacija)
+  ne seku: datum jedne tabele bi sekao i ostale.
+- CSV se broji ceo (Athena čita ceo fajl); za Parquet se broje samo column
+  chunk-ovi kolona koje se pominju u query-ju.
+- Athena/Trino funkcije koje DuckDB nema pod istim imenom se prevode
+  (element_at nad nizom -> list_extract).
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+DEFAULT_QUERIES_GLOB = "athena_queries/*.sql"
+DEFAULT_TABLES = {
+    "tara_pollution_enriched": "data/pollution_enriched.csv",
+    "tara_weather_enriched": "data/weather_enriched.csv",
+}
+ROLLUP_TABLE = "tara_pollution_daily_city"
+NULL_STRINGS = ["None", ""]
+# tipovi iz Athena DDL-a; time_date je string, pa se ne sme prepoznati kao TIMESTAMP
+CSV_TYPE_CANDIDATES = ["BIGINT", "DOUBLE", "VARCHAR"]
+DATA_EXTENSIONS = (".csv", ".parquet")
+
+PARTITION_RE = re.compile(r"date=(\d{4}-\d{2}-\d{2})")
+DATE_PREDICATE_RE = re.compile(
+    r"""(?:\bday|"date")\s*=\s*(?:DATE\s*)?'(\d{4}-\d{2}-\d{2})'""", re.IGNORECASE
+)
+TABLE_REF_RE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)", re.IGNORECASE)
+CTE_NAME_RE = re.compile(r"\b([A-Za-z_]\w*)\s+AS\s*\(", re.IGNORECASE)
+IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+
+# (putanja, datum particije ili None)
+DataFile = Tuple[str, Optional[str]]
+
+
+def load_query(path: str) -> Optional[str]:
+    """
+    Prvi SQL iskaz iz fajla, bez komentara. DDL fajlovi (CREATE ...) vraćaju None.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    text = re.sub(r"--[^\n]*", "", text)
+    statements = [s.strip() for s in text.split(";") if s.strip()]
+    if not statements or statements[0].upper().startswith("CREATE"):
+        return None
+    return statements[0]
+
+
+def translate_to_duckdb(sql: str) -> str:
+    return re.sub(r"\belement_at\s*\(", "list_extract(", sql, flags=re.IGNORECASE)
+
+
+def referenced_tables(sql: str) -> Set[str]:
+    ctes = {name.lower() for name in CTE_NAME_RE.findall(sql)}
+    return {name for name in TABLE_REF_RE.findall(sql) if name.lower() not in ctes}
+
+
+def partition_dates_in_query(sql: str) -> Set[str]:
+    return set(DATE_PREDICATE_RE.findall(sql))
+
+
+def discover_files(source: str) -> List[DataFile]:
+    """
+    Fajl -> [(fajl, None)]; direktorijum -> svi CSV/Parquet fajlovi ispod njega,
+    sa datumom iz date= segmenta putanje. Putanje sa segmentom koji počinje
+    sa _ ili . se preskaču (kao u Atheni), npr. _compacting/ staging.
+    """
+    if os.path.isfile(source):
+        return [(source, None)]
+
+    files: List[DataFile] = []
+    for path in sorted(glob.glob(os.path.join(source, "**", "*"), recursive=True)):
+        relative = os.path.relpath(path, source).replace("\\", "/")
+        if not os.path.isfile(path) or any(p.startswith(("_", ".")) for p in relative.split("/")):
+            continue
+        if not path.endswith(DATA_EXTENSIONS):
+            continue
+        m = PARTITION_RE.search(path.replace("\\", "/"))
+        files.append((path, m.group(1) if m else None))
+    return files
+
+
+def prune(files: List[DataFile], dates: Set[str]) -> List[DataFile]:
+    if not dates or not any(d for _, d in files):
+        return files
+    return [(path, d) for path, d in files if d in dates]
+
+
+def scanned_bytes(path: str, sql: str) -> int:
+    if not path.endswith(".parquet"):
+        return os.path.getsize(path)
+
+    import pyarrow.parquet as pq
+
+    used = {ident.lower() for ident in IDENTIFIER_RE.findall(sql)}
+    metadata = pq.ParquetFile(path).metadata
+    total = 0
+    for rg in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg)
+        for c in range(row_group.num_columns):
+            column = row_group.column(c)
+            if column.path_in_schema.lower() in used:
+                total += column.total_compressed_size
+    return total
+
+
+def _reader_sql(paths: List[str]) -> str:
+    path_list = "[" + ", ".join("'" + p.replace("'", "''") + "'" for p in paths) + "]"
+    if all(p.endswith(".parquet") for p in paths):
+        return f"read_parquet({path_list}, hive_partitioning=true, union_by_name=true)"
+    nullstr = "[" + ", ".join(f"'{s}'" for s in NULL_STRINGS) + "]"
+    types = "[" + ", ".join(f"'{t}'" for t in CSV_TYPE_CANDIDATES) + "]"
+    return (
+        f"read_csv({path_list}, header=true, union_by_name=true, hive_partitioning=true, "
+        f"nullstr={nullstr}, auto_type_candidates={types})"
+    )
+
+
+def materialize_rollup(pollution_source: str, out_dir: str) -> str:
+    """
+    Pravi lokalni pollution_daily_city (date=/part-00000.csv) iz pollution izvora,
+    istom logikom kao rollup_pollution_daily_city.py.
+    """
+    import pandas as pd
+
+    from rollup_pollution_daily_city import build_daily_city_rollup, combine_rollups, drop_seen_readings
+
+    partials = []
+    seen = set()
+    for path, _ in discover_files(pollution_source):
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path)
+        partials.append(build_daily_city_rollup(drop_seen_readings(df, seen)))
+    rollup = combine_rollups(partials)
+
+    root = os.path.join(out_dir, "pollution_daily_city")
+    for day, group in rollup.groupby("day"):
+        part_dir = os.path.join(root, f"date={day}")
+        os.makedirs(part_dir, exist_ok=True)
+        group.drop(columns=["day"]).to_csv(os.path.join(part_dir, "part-00000.csv"), index=False)
+    return root
+
+
+def run_query(con, name: str, sql: str, sources: Dict[str, str], use_pruning: bool = True) -> Dict:
+    result: Dict = {"query": name, "status": "ok", "tables": {}}
+    tables = referenced_tables(sql)
+    # predikat datuma se ne vezuje za tabelu, pa se seče samo query sa jednom
+    dates = partition_dates_in_query(sql) if use_pruning and len(tables) == 1 else set()
+    files_scanned = rows_scanned = bytes_scanned = 0
+
+    try:
+        for table in sorted(tables):
+            if table not in sources:
+                raise KeyError(f"No local source for table {table}")
+
+            all_files = discover_files(sources[table])
+            if not all_files:
+                raise FileNotFoundError(f"No data files under {sources[table]}")
+            selected = prune(all_files, dates)
+            paths = [p for p, _ in selected]
+
+            if paths:
+                con.execute(f'CREATE OR REPLACE VIEW "{table}" AS SELECT * FROM {_reader_sql(paths)}')
+                table_rows = con.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0]
+            else:
+                # ista šema, nula redova
+                con.execute(
+                    f'CREATE OR REPLACE VIEW "{table}" AS '
+                    f"SELECT * FROM {_reader_sql([all_files[0][0]])} LIMIT 0"
+                )
+                table_rows = 0
+            table_bytes = sum(scanned_bytes(p, sql) for p in paths)
+
+            result["tables"][table] = {
+                "files": len(paths),
+                "files_total": len(all_files),
+                "rows_scanned": table_rows,
+                "bytes_scanned": table_bytes,
+            }
+            files_scanned += len(paths)
+            rows_scanned += table_rows
+            bytes_scanned += table_bytes
+
+        start = time.perf_counter()
+        rows = con.execute(translate_to_duckdb(sql)).fetchall()
+        result["seconds"] = round(time.perf_counter() - start, 4)
+        result["rows_returned"] = len(rows)
+        result["rows"] = [[str(v) for v in row] for row in rows]
+    except Exception as exc:
+        result["status"] = "error"
+        result["error"] = str(exc).splitlines()[0]
+
+    result["pruned_to"] = sorted(dates)
+    result["files_scanned"] = files_scanned
+    result["rows_scanned"] = rows_scanned
+    result["bytes_scanned"] = bytes_scanned
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run athena_queries/*.sql locally with DuckDB and report rows/bytes scanned."
+    )
+    parser.add_argument(
+        "queries",
+        nargs="*",
+        help=f"SQL files to run (default: {DEFAULT_QUERIES_GLOB}, DDL files are skipped)",
+    )
+    parser.add_argument(
+        "--table",
+        action="append",
+        default=[],
+        metavar="NAME=PATH",
+        help="Local source for a table: a CSV/Parquet file or a date= partition tree. "
+             "Repeatable; overrides the data/*.csv defaults.",
+    )
+    parser.add_argument("--no-prune", action="store_true", help="Disable partition pruning")
+    parser.add_argument("--show", action="store_true", help="Print result rows")
+    parser.add_argument("--json", default=None, help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    try:
+        import duckdb
+    except ImportError as exc:
+        raise SystemExit("The local runner needs duckdb (pip install duckdb)") from exc
+
+    sources = dict(DEFAULT_TABLES)
+    for item in args.table:
+        name, sep, path = item.partition("=")
+        if not sep:
+            parser.error(f"--table expects NAME=PATH, got {item!r}")
+        sources[name] = path
+
+    query_files = args.queries or sorted(glob.glob(DEFAULT_QUERIES_GLOB))
+    con = duckdb.connect()
+    report = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if ROLLUP_TABLE not in sources and "tara_pollution_enriched" in sources:
+            sources[ROLLUP_TABLE] = materialize_rollup(sources["tara_pollution_enriched"], tmp_dir)
+
+        for path in query_files:
+            sql = load_query(path)
+            if sql is None:
+                continue
+            report.append(run_query(con, os.path.basename(path), sql, sources, not args.no_prune))
+
+    print(f"{'query':45} {'status':6} {'rows':>6} {'files':>7} {'rows scanned':>13} {'bytes scanned':>14} {'sec':>7}")
+    for r in report:
+        print(
+            f"{r['query']:45} {r['status']:6} {r.get('rows_returned', '-'):>6} "
+            f"{r['files_scanned']:>7} {r['rows_scanned']:>13} {r['bytes_scanned']:>14} "
+            f"{r.get('seconds', '-'):>7}"
+        )
+        if r["status"] == "error":
+            print(f"    {r['error']}")
+        elif args.show:
+            for row in r["rows"]:
+                print("    " + " | ".join(row))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,158 @@
 import argparse
+import cProfile
 import io
-import os
 import re
-from typing import Dict, Iterable, List, Tuple
+import sys
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import boto3
 import pandas as pd
 
-from fetch_tourist_estimates import fetch_estimates
+from enriched_paths import OUTPUT_FORMATS, build_dst_key
+from enrichment_manifest import EnrichmentManifest
+from fetch_tourist_estimates import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_RATE_PER_SECOND,
+    fetch_estimates_many,
+)
+from pipeline_metrics import METRICS_FORMATS, InstrumentedClient, StageMetrics, timer
+from pollution_weather_correlation import update_correlations
+from rollup_pollution_daily_city import update_rollups
+from time_columns import date_from_nano
 
 
 DATE_RE = re.compile(r"date=(\d{4}-\d{2}-\d{2})/")
+DEFAULT_WORKERS = 1
+# S3 multipart minimum je 5 MiB po delu (osim poslednjeg).
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+STREAM_CHUNK_ROWS = 50_000
+PARQUET_COMPRESSION = "snappy"
+# tipovi kolona iz athena_queries/create_enriched_tables_parquet.sql; parquet
+# izlaz se kastuje na njih (umesto da se tip pogađa iz podataka), pa svi
+# fajlovi i chunk-ovi imaju istu šemu i kolona sa NaN ne menja tip
+PARQUET_COLUMN_TYPES = {
+    "name": "string",
+    "time_nano": "bigint",
+    "time_date": "string",
+    "location_latitude": "double",
+    "location_longitude": "double",
+    "location_name": "string",
+    "measurement_pm10Atmo": "double",
+    "measurement_pm25Atmo": "double",
+    "measurement_pm100Atmo": "double",
+    "weather_temperature": "double",
+    "weather_feelsLike": "double",
+    "weather_pressure": "bigint",
+    "weather_humidity": "bigint",
+    "weather_dewPoint": "double",
+    "weather_clouds": "bigint",
+    "weather_windSpeed": "double",
+    "weather_windDeg": "bigint",
+    "weather_windGust": "double",
+    "_input_file": "string",
+    "tourist_estimate": "bigint",
+}
+# firehose upisuje isti red u više fajlova; red je jedinstven po (name, time_nano)
+DEDUP_KEYS = ["name", "time_nano"]
+DEDUP_MODES = ("first", "last", "none")
+# streaming dedup pamti najviše ovoliko poslednjih ključeva (~200 B po ključu,
+# oko 40 MB); duplikat udaljeniji od toga u fajlu ostaje
+STREAM_DEDUP_WINDOW = 200_000
+
+# (src_key, dst_prefix, date_str)
+EnrichJob = Tuple[str, str, str]
+# {(date_str, city_key) -> tourist_estimate}, city_key vidi normalize_city
+EstimateTable = Dict[Tuple[str, str], int]
+
+
+def make_s3_client(workers: int = DEFAULT_WORKERS):
+    """
+    Pravi jedan S3 client koji dele svi worker-i. boto3 client je thread-safe,
+    samo connection pool mora da bude bar onoliki koliko ima worker-a.
+    """
+    from botocore.config import Config
+
+    return boto3.client(
+        "s3",
+        config=Config(max_pool_connections=max(10, workers)),
+    )
+
+
+class MultipartUploadWriter:
+    """
+    File-like objekat koji upisuje u S3 deo po deo (multipart upload), tako da
+    se u memoriji nikad ne drži više od jednog dela.
+
+    Ako ukupno upisano stane u jedan deo, radi se običan put_object.
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str, part_size: int = MULTIPART_PART_SIZE):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.bytes_written = 0
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, object]] = []
+
+    def tell(self) -> int:
+        return self.bytes_written
+
+    def flush(self) -> None:
+        pass
+
+    @property
+    def closed(self) -> bool:
+        return False
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def _upload_part(self, data: bytes) -> None:
+        if self._upload_id is None:
+            resp = self.s3_client.create_multipart_upload(Bucket=self.bucket, Key=self.key)
+            self._upload_id = resp["UploadId"]
+
+        part_number = len(self._parts) + 1
+        resp = self.s3_client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        self._parts.append({"ETag": resp["ETag"], "PartNumber": part_number})
+
+    def close(self) -> None:
+        if self._upload_id is None:
+            self.s3_client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        self._buffer = bytearray()
+
+    def abort(self) -> None:
+        if self._upload_id is not None:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+            self._upload_id = None
+        self._buffer = bytearray()
 
 
 def extract_date_from_key(key: str) -> str:
@@ -25,13 +167,13 @@ def extract_date_from_key(key: str) -> str:
     return m.group(1)
 
 
-def list_csv_keys_with_dates(
+def list_csv_objects(
     s3_client, bucket: str, base_prefix: str
-) -> List[Tuple[str, str]]:
+) -> List[Tuple[str, str, str]]:
     """
-    Vrati listu (key, date_str) za sve fajlove ispod base_prefix.
+    Vrati listu (key, date_str, etag) za sve fajlove ispod base_prefix.
     """
-    results: List[Tuple[str, str]] = []
+    results: List[Tuple[str, str, str]] = []
     continuation_token = None
 
     while True:
@@ -48,9 +190,12 @@ def list_csv_keys_with_dates(
 
             if key.endswith("/") or key == base_prefix.rstrip("/"):
                 continue
+            # _SUCCESS, _compacting/ (compaction staging), _compaction.json...
+            if any(part.startswith(("_", ".")) for part in key[len(base_prefix):].split("/")):
+                continue
 
             date_str = extract_date_from_key(key)
-            results.append((key, date_str))
+            results.append((key, date_str, obj.get("ETag", "")))
 
         if resp.get("IsTruncated"):
             continuation_token = resp.get("NextContinuationToken")
@@ -60,93 +205,429 @@ def list_csv_keys_with_dates(
     return results
 
 
-def build_iasi_estimate_map(dates: Iterable[str]) -> Dict[str, int]:
+def normalize_city(name: str) -> str:
+    """
+    Ključ grada nezavisan od dijakritika i velikih slova: "Iași" -> "iasi".
+    """
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).strip().lower()
+
+
+def city_from_location_name(location_name: str) -> str:
+    """
+    location_name je oblika "Kvart, Grad, Država", npr.
+    "Tătărași Sud, Iași, Romania" -> "iasi".
+    """
+    parts = [p for p in str(location_name).split(",") if p.strip()]
+    city = parts[-2] if len(parts) >= 2 else (parts[0] if parts else "")
+    return normalize_city(city)
+
+
+def build_estimate_table(
+    dates: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+    metrics: Optional[StageMetrics] = None,
+) -> EstimateTable:
     """
-    Za sve unikatne datume poziva API JEDNOM po datumu
-    i vraća mapu {date_str -> tourist_estimate_iasi}.
+    Za sve unikatne datume poziva API JEDNOM po datumu (paralelno, uz rate limit)
+    i iz svakog odgovora uzima SVE gradove iz "info" liste:
+    {(date_str, city_key) -> estimated_no_people}.
+    Sa metrics se meri ceo dohvat ("api") i svaki HTTP zahtev ("api.request").
     """
     unique_dates = sorted(set(dates))
-    est_map: Dict[str, int] = {}
+    est_table: EstimateTable = {}
+
+    def on_request(date_str: str, seconds: float, status_code: int) -> None:
+        metrics.record("api.request", seconds, errors=int(status_code != 200))
+
+    print(f"[API] Fetching estimates for {len(unique_dates)} date(s)")
+    with timer(metrics, "api"):
+        responses = fetch_estimates_many(
+            unique_dates, max_concurrency, rate_per_second,
+            on_request=on_request if metrics is not None else None,
+        )
 
     for d in unique_dates:
-        print(f"[API] Fetching estimates for date={d}")
-        data = fetch_estimates(d)
+        for city_info in responses[d].get("info", []):
+            name = city_info.get("name")
+            if not name or city_info.get("estimated_no_people") is None:
+                continue
+            est_table[(d, normalize_city(name))] = int(city_info["estimated_no_people"])
 
-        iasi_entry = None
-        for city_info in data.get("info", []):
-            if city_info.get("name", "").lower() == "iasi":
-                iasi_entry = city_info
-                break
+    return est_table
 
-        if iasi_entry is None:
-            raise RuntimeError(f"No 'Iasi' entry found in API response for date={d}")
 
-        est_map[d] = int(iasi_entry["estimated_no_people"])
+def build_iasi_estimate_map(
+    dates: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+) -> Dict[str, int]:
+    """
+    Mapa {date_str -> tourist_estimate_iasi}, izvučena iz build_estimate_table.
+    """
+    unique_dates = sorted(set(dates))
+    est_table = build_estimate_table(unique_dates, max_concurrency, rate_per_second)
+
+    est_map: Dict[str, int] = {}
+    for d in unique_dates:
+        if (d, "iasi") not in est_table:
+            raise RuntimeError(f"No 'Iasi' entry found in API response for date={d}")
+        est_map[d] = est_table[(d, "iasi")]
 
     return est_map
 
 
+def estimates_for_date(est_table: EstimateTable, date_str: str) -> Dict[str, int]:
+    """
+    {city_key -> estimate} za jedan datum (npr. za upis u manifest).
+    """
+    return {city: est for (d, city), est in est_table.items() if d == date_str}
+
+
+def add_tourist_estimates(
+    df: pd.DataFrame, date_str: str, est_table: EstimateTable
+) -> pd.DataFrame:
+    """
+    Dodaje kolonu tourist_estimate vektorskim join-om po (datum reda, grad iz
+    location_name). Datum reda se računa iz time_nano (time_columns), a ako
+    te kolone ili vrednosti nema, uzima se datum particije (date_str).
+    Ako za neki (datum, grad) nema procene, baca KeyError.
+    """
+    if "location_name" not in df.columns:
+        raise KeyError("Missing 'location_name' column, cannot match rows to cities")
+
+    if df.empty:
+        df["tourist_estimate"] = pd.Series(dtype="int64")
+        return df
+
+    locations = df["location_name"].astype(str)
+    city_keys = locations.map({loc: city_from_location_name(loc) for loc in locations.unique()})
+    if "time_nano" in df.columns:
+        row_dates = date_from_nano(df["time_nano"]).fillna(date_str)
+    else:
+        row_dates = pd.Series(date_str, index=df.index)
+
+    keys = pd.MultiIndex.from_arrays([row_dates, city_keys])
+    lookup = pd.Series(est_table, dtype="int64")
+    if lookup.empty:
+        estimates = pd.Series(float("nan"), index=df.index)
+    else:
+        estimates = pd.Series(lookup.reindex(keys).to_numpy(), index=df.index)
+
+    if estimates.isna().any():
+        missing = sorted(set(zip(row_dates[estimates.isna()], city_keys[estimates.isna()])))
+        raise KeyError(f"Missing estimate for (date, city) {missing}")
+
+    df["tourist_estimate"] = estimates.astype("int64")
+    return df
+
+
+def read_frame(body_bytes: bytes, key: str) -> pd.DataFrame:
+    """
+    Parsira ceo fajl; format se bira po ekstenziji ključa (.parquet ili CSV),
+    jer partition_by_date_job može da piše i jedno i drugo.
+    """
+    if key.endswith(".parquet"):
+        _import_pyarrow()
+        return pd.read_parquet(io.BytesIO(body_bytes))
+    return pd.read_csv(io.StringIO(body_bytes.decode("utf-8")))
+
+
+def read_chunks(body, key: str, chunk_rows: int) -> Iterable[pd.DataFrame]:
+    """
+    Chunk-ovi od chunk_rows redova iz S3 body-ja. CSV se čita direktno iz
+    stream-a; parquet traži footer na kraju fajla, pa se kompresovani fajl
+    skida ceo, a u DataFrame se raspakuje batch po batch.
+    """
+    if key.endswith(".parquet"):
+        _, pq = _import_pyarrow()
+        parquet_file = pq.ParquetFile(io.BytesIO(body.read()))
+        return (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunk_rows))
+    return pd.read_csv(body, chunksize=chunk_rows)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from exc
+    return pyarrow, pyarrow.parquet
+
+
+def to_arrow_table(df: pd.DataFrame, schema=None):
+    """
+    DataFrame -> pyarrow Table sa tipovima iz PARQUET_COLUMN_TYPES (vrednosti
+    koje nisu brojevi postaju null). Kolone van te mape dobijaju tip iz schema
+    (šema prvog chunk-a) ili, bez nje, tip koji pyarrow zaključi.
+    """
+    pa, _ = _import_pyarrow()
+    arrow_types = {"string": pa.string(), "double": pa.float64(), "bigint": pa.int64()}
+    arrays, fields = [], []
+    for name in df.columns:
+        column = df[name]
+        kind = PARQUET_COLUMN_TYPES.get(name)
+        if kind == "string":
+            column = column.astype("string")
+        elif kind is not None:
+            column = pd.to_numeric(column, errors="coerce")
+        if kind is not None:
+            arrow_type = arrow_types[kind]
+        elif schema is not None and name in schema.names:
+            arrow_type = schema.field(name).type
+        else:
+            arrow_type = None
+        array = pa.array(column, type=arrow_type, from_pandas=True)
+        arrays.append(array)
+        fields.append(pa.field(name, array.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def serialize_frame(df: pd.DataFrame, output_format: str = "csv") -> bytes:
+    """
+    Serijalizuje DataFrame u CSV (sa header-om) ili kompresovani Parquet
+    (tipovi kolona vidi to_arrow_table).
+    """
+    if output_format == "parquet":
+        _, pq = _import_pyarrow()
+        buffer = io.BytesIO()
+        pq.write_table(to_arrow_table(df), buffer, compression=PARQUET_COMPRESSION)
+        return buffer.getvalue()
+
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def deduplicate(df: pd.DataFrame, tie_break: str = "first") -> pd.DataFrame:
+    """
+    Ostavlja jedan red po (name, time_nano). Kod duplikata pobeđuje prvi
+    ("first") ili poslednji ("last") po _input_file (ime firehose fajla sadrži
+    vreme isporuke), a ako te kolone nema, po redosledu u fajlu.
+    Redosled preostalih redova se ne menja.
+    """
+    if tie_break == "none":
+        return df
+    if tie_break not in DEDUP_MODES:
+        raise ValueError(f"tie_break must be one of {DEDUP_MODES}, got {tie_break!r}")
+
+    ordered = df
+    if "_input_file" in df.columns:
+        ordered = df.sort_values("_input_file", kind="stable")
+    return ordered.drop_duplicates(DEDUP_KEYS, keep=tie_break).sort_index()
+
+
 def enrich_single_file(
     s3_client,
     bucket: str,
     src_key: str,
     dst_prefix: str,
     date_str: str,
-    est_map: Dict[str, int],
+    est_table: EstimateTable,
+    output_format: str = "csv",
+    dedup: str = "none",
+    metrics: Optional[StageMetrics] = None,
 ) -> None:
     """
-    Skida jedan CSV sa S3, dodaje kolonu tourist_estimate i upisuje nazad
-    u isti relativni put, ali ispod dst_prefix.
+    Skida jedan CSV ili parquet fajl sa S3 (vidi read_frame), izbacuje
+    duplikate (vidi deduplicate), dodaje kolonu
+    tourist_estimate (po datumu i gradu svakog reda) i upisuje nazad u isti
+    relativni put, ali ispod dst_prefix (kao CSV ili Parquet).
+    Sa metrics se odvojeno mere faze read, parse, transform, serialize i write.
     """
-    if date_str not in est_map:
-        raise KeyError(f"Missing estimate for date {date_str} (key={src_key})")
-
-    resp = s3_client.get_object(Bucket=bucket, Key=src_key)
-    body_bytes = resp["Body"].read()
-    text = body_bytes.decode("utf-8")
-
-    df = pd.read_csv(io.StringIO(text))
-    df["tourist_estimate"] = est_map[date_str]
-
+    with timer(metrics, "read") as m:
+        resp = s3_client.get_object(Bucket=bucket, Key=src_key)
+        body_bytes = resp["Body"].read()
+        m["bytes_read"] = len(body_bytes)
+
+    with timer(metrics, "parse") as m:
+        df = read_frame(body_bytes, src_key)
+        m["rows"] = len(df)
+    with timer(metrics, "transform") as m:
+        df = deduplicate(df, dedup)
+        df = add_tourist_estimates(df, date_str, est_table)
+        m["rows"] = len(df)
+
+    dst_key = build_dst_key(src_key, dst_prefix, output_format)
+
+    with timer(metrics, "serialize"):
+        body = serialize_frame(df, output_format)
+    with timer(metrics, "write", bytes_written=len(body)):
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=dst_key,
+            Body=body,
+        )
+    print(f"[WRITE] {dst_key} (rows={len(df)})")
 
-    base_name = src_key.split("/", 1)[1]  
-    dst_key = os.path.join(dst_prefix.rstrip("/"), base_name).replace("\\", "/")
 
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    s3_client.put_object(
-        Bucket=bucket,
-        Key=dst_key,
-        Body=csv_buffer.getvalue().encode("utf-8"),
-    )
-    print(f"[WRITE] {dst_key} (rows={len(df)})")
+def _timed_chunks(reader: Iterable[pd.DataFrame], metrics: Optional[StageMetrics]):
+    """
+    Prosleđuje chunk-ove iz read_chunks i meri čitanje+parsiranje
+    svakog kao fazu "parse".
+    """
+    chunks = iter(reader)
+    while True:
+        with timer(metrics, "parse") as m:
+            chunk = next(chunks, None)
+            m["rows"] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        yield chunk
 
 
-def process_dataset(
+def enrich_single_file_streaming(
     s3_client,
     bucket: str,
-    src_prefix: str,
+    src_key: str,
     dst_prefix: str,
-    est_map: Dict[str, int],
+    date_str: str,
+    est_table: EstimateTable,
+    output_format: str = "csv",
+    dedup: str = "none",
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    part_size: int = MULTIPART_PART_SIZE,
+    metrics: Optional[StageMetrics] = None,
+    dedup_window: int = STREAM_DEDUP_WINDOW,
 ) -> None:
     """
-    Obrada jednog dataset-a (weather ili pollution):
-    prolazi kroz sve CSV fajlove u src_prefix i za svaki pravi enriched verziju u dst_prefix.
+    Isto kao enrich_single_file, ali bez učitavanja celog fajla u memoriju:
+    S3 body se parsira u chunk-ovima od chunk_rows redova, svaki chunk dobija
+    kolonu tourist_estimate i odmah ide u multipart upload.
+    Za parquet izlaz je svaki chunk jedan row group, a kolone se kastuju na
+    tipove iz PARQUET_COLUMN_TYPES (vidi to_arrow_table), pa NaN u kasnijem
+    chunk-u ne ruši upis. Potrošnja memorije zavisi od chunk_rows i part_size,
+    ne od veličine fajla; parquet izvor se drži ceo u memoriji (vidi read_chunks).
+
+    Deduplikacija ovde podržava samo "first" (prvi viđen red po ključu), jer
+    su ranije poslati chunk-ovi već upload-ovani. Pamti se najviše dedup_window
+    poslednjih ključeva, pa memorija ostaje ograničena, a duplikati udaljeniji
+    od toga se ne hvataju; za potpunu deduplikaciju koristiti obradu bez
+    streaming-a.
+    Sa metrics se read/parse/transform/write mere po chunk-u.
+    """
+    if dedup not in ("first", "none"):
+        raise ValueError("Streaming enrichment supports only dedup 'first' or 'none'")
+    dst_key = build_dst_key(src_key, dst_prefix, output_format)
+    with timer(metrics, "read") as m:
+        resp = s3_client.get_object(Bucket=bucket, Key=src_key)
+        m["bytes_read"] = resp.get("ContentLength") or 0
+
+    writer = MultipartUploadWriter(s3_client, bucket, dst_key, part_size)
+    parquet_writer = None
+    seen_keys = set()
+    seen_order = deque()
+    rows = 0
+    try:
+        reader = read_chunks(resp["Body"], src_key, chunk_rows)
+        for i, chunk in enumerate(_timed_chunks(reader, metrics)):
+            with timer(metrics, "transform") as m:
+                if dedup == "first":
+                    chunk = chunk.drop_duplicates(DEDUP_KEYS)
+                    keys = list(zip(chunk["name"], chunk["time_nano"]))
+                    is_new = [key not in seen_keys for key in keys]
+                    chunk = chunk[is_new]
+                    for key, new in zip(keys, is_new):
+                        if new:
+                            seen_keys.add(key)
+                            seen_order.append(key)
+                    while len(seen_order) > dedup_window:
+                        seen_keys.discard(seen_order.popleft())
+                chunk = add_tourist_estimates(chunk, date_str, est_table)
+                m["rows"] = len(chunk)
+            with timer(metrics, "write") as m:
+                written = writer.tell()
+                if output_format == "parquet":
+                    _, pq = _import_pyarrow()
+                    schema = parquet_writer.schema if parquet_writer else None
+                    table = to_arrow_table(chunk, schema)
+                    if parquet_writer is None:
+                        parquet_writer = pq.ParquetWriter(
+                            writer, table.schema, compression=PARQUET_COMPRESSION
+                        )
+                    parquet_writer.write_table(table)
+                else:
+                    writer.write(chunk.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+                m["bytes_written"] = writer.tell() - written
+            rows += len(chunk)
+        with timer(metrics, "write") as m:
+            written = writer.tell()
+            if parquet_writer is not None:
+                parquet_writer.close()
+            writer.close()
+            m["bytes_written"] = writer.tell() - written
+    except BaseException:
+        writer.abort()
+        raise
+
+    print(f"[WRITE] {dst_key} (rows={rows}, streamed)")
+
+
+def enrich_files(
+    s3_client,
+    bucket: str,
+    jobs: List[EnrichJob],
+    est_table: EstimateTable,
+    workers: int = DEFAULT_WORKERS,
+    streaming: bool = False,
+    output_format: str = "csv",
+    on_success: Optional[Callable[[EnrichJob], None]] = None,
+    dedup: str = "none",
+    metrics: Optional[StageMetrics] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Pokreće enrich_single_file (ili enrich_single_file_streaming ako je
+    streaming=True) za svaki (src_key, dst_prefix, date_str) posao,
+    redom ili kroz thread pool sa najviše `workers` niti.
+
+    Greška u jednom fajlu ne prekida ostale; vraća listu (src_key, poruka)
+    za fajlove koji nisu uspeli, uvek u redosledu u kom su poslovi zadati.
+    on_success se poziva (iz worker niti) odmah posle svakog uspešnog fajla.
+    Sa metrics se ceo fajl meri kao faza "file", a njegovi delovi kao u
+    enrich_single_file.
     """
-    print(f"\n=== Processing dataset: {src_prefix} -> {dst_prefix} ===")
-    keys_with_dates = list_csv_keys_with_dates(s3_client, bucket, src_prefix)
 
-    if not keys_with_dates:
-        print(f"No CSV files found under prefix {src_prefix}")
+    enrich_fn = enrich_single_file_streaming if streaming else enrich_single_file
+
+    def run(job: EnrichJob) -> Optional[str]:
+        src_key, dst_prefix, date_str = job
+        try:
+            with timer(metrics, "file"):
+                enrich_fn(
+                    s3_client, bucket, src_key, dst_prefix, date_str, est_table,
+                    output_format, dedup, metrics=metrics,
+                )
+            if on_success is not None:
+                on_success(job)
+        except Exception as exc:
+            print(f"[ERROR] {src_key}: {exc!r}")
+            return repr(exc)
+        return None
+
+    if workers <= 1:
+        errors = [run(job) for job in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(run, jobs))
+
+    return [(job[0], err) for job, err in zip(jobs, errors) if err is not None]
+
+
+def report_failures(failures: List[Tuple[str, str]]) -> None:
+    """
+    Ispisuje sve neuspele fajlove i prekida izvršavanje ako ih ima.
+    """
+    if not failures:
         return
 
-    for key, date_str in keys_with_dates:
-        enrich_single_file(s3_client, bucket, key, dst_prefix, date_str, est_map)
+    print(f"\n{len(failures)} file(s) failed:")
+    for key, err in failures:
+        print(f"  {key}: {err}")
+    raise RuntimeError(f"Enrichment failed for {len(failures)} file(s)")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
-        description="Enrich partitioned weather/pollution data with tourist estimates for Iasi."
+        description="Enrich partitioned weather/pollution data with per-city tourist estimates."
     )
     parser.add_argument(
         "--bucket",
@@ -173,36 +654,218 @@ def main() -> None:
         default="pollution_partitioned_enriched/",
         help="Destination prefix for enriched pollution data.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of files (weather and pollution together) enriched "
+             f"concurrently (default: {DEFAULT_WORKERS})",
+    )
+
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Stream each file in chunks and upload with multipart upload "
+             "(bounded memory regardless of file size; see --dedup).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Output file format; parquet is snappy-compressed and typed, "
+             "written under the same date= layout (default: csv)",
+    )
+    parser.add_argument(
+        "--dedup",
+        choices=DEDUP_MODES,
+        default=None,
+        help="Drop duplicate (name, time_nano) rows within each file, keeping the "
+             "first or last by _input_file (default: first, or none with --streaming). "
+             "With --streaming only 'first' (first row seen) is supported, and it "
+             f"remembers only the last {STREAM_DEDUP_WINDOW} keys (about 200 bytes each) "
+             "so memory stays bounded; duplicates further apart are kept.",
+    )
+    parser.add_argument(
+        "--api-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Concurrent estimate API requests (default: {DEFAULT_MAX_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--api-rate",
+        type=float,
+        default=DEFAULT_RATE_PER_SECOND,
+        help=f"Max estimate API requests per second (default: {DEFAULT_RATE_PER_SECOND})",
+    )
+    parser.add_argument(
+        "--rollup-prefix",
+        default=None,
+        help="If set, rebuild the pollution_daily_city rollup under this prefix "
+             "for every day whose pollution files were enriched in this run.",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Local path or s3://bucket/key of a processed-files manifest. "
+             "Only new or changed source objects (by ETag) are enriched, and "
+             "an interrupted run resumes where it stopped.",
+    )
+
+    parser.add_argument(
+        "--correlation-state",
+        default=None,
+        help="Local path or s3://bucket/key of the exposure vs weather correlation state. "
+             "If set, every day whose pollution or weather files were enriched in this run "
+             "is recomputed into it.",
+    )
+    parser.add_argument(
+        "--metrics",
+        choices=METRICS_FORMATS,
+        default=None,
+        help="Print per-stage timings, bytes, rows and latency percentiles at the end, "
+             "as one JSON line or as CloudWatch EMF lines (one per stage).",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Also write the per-stage JSON summary to this local path.",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Write cProfile stats for the run to this path (view with python -m pstats "
+             "or snakeviz). Only the main thread is profiled; use --workers 1 to see "
+             "the per-file work.",
+    )
 
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.streaming and args.dedup == "last":
+        parser.error("--dedup last is not supported with --streaming")
+    if args.dedup is None:
+        args.dedup = "none" if args.streaming else "first"
+
+    metrics = StageMetrics() if args.metrics or args.metrics_file else None
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        run_enrichment(args, metrics)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"[PROFILE] cProfile stats written to {args.profile}")
+        if metrics is not None:
+            if args.metrics:
+                metrics.emit(args.metrics, sys.stdout, Bucket=args.bucket)
+            if args.metrics_file:
+                with open(args.metrics_file, "w", encoding="utf-8") as f:
+                    metrics.emit("json", f, Bucket=args.bucket)
+
+
+def run_enrichment(args: argparse.Namespace, metrics: Optional[StageMetrics] = None) -> None:
+    """
+    Ceo run za parsirane argumente iz main: listing, API, enrich, rollup.
+    Sa metrics se svaki S3 poziv meri kroz InstrumentedClient (s3.<operacija>).
+    """
+    s3_client = make_s3_client(args.workers)
+    if metrics is not None:
+        s3_client = InstrumentedClient(s3_client, metrics)
 
-    s3_client = boto3.client("s3")
-    
-    weather_files = list_csv_keys_with_dates(s3_client, args.bucket, args.weather_prefix)
-    pollution_files = list_csv_keys_with_dates(s3_client, args.bucket, args.pollution_prefix)
+    with timer(metrics, "list") as m:
+        weather_files = list_csv_objects(s3_client, args.bucket, args.weather_prefix)
+        pollution_files = list_csv_objects(s3_client, args.bucket, args.pollution_prefix)
+        m["objects"] = len(weather_files) + len(pollution_files)
 
-    all_dates = [d for _, d in weather_files] + [d for _, d in pollution_files]
-    if not all_dates:
+    if not weather_files and not pollution_files:
         print("No CSV files found in given prefixes. Nothing to do.")
         return
 
-    est_map = build_iasi_estimate_map(all_dates)
-    
-    process_dataset(
-        s3_client,
-        args.bucket,
-        args.weather_prefix,
-        args.weather_out_prefix,
-        est_map,
-    )
-    process_dataset(
-        s3_client,
-        args.bucket,
-        args.pollution_prefix,
-        args.pollution_out_prefix,
-        est_map,
+    jobs = [(key, args.weather_out_prefix, d) for key, d, _ in weather_files]
+    jobs += [(key, args.pollution_out_prefix, d) for key, d, _ in pollution_files]
+    etags = {key: etag for key, _, etag in weather_files + pollution_files}
+
+    manifest = None
+    if args.manifest:
+        manifest = EnrichmentManifest.load(args.manifest, s3_client=s3_client)
+        total = len(jobs)
+        jobs = [
+            job for job in jobs
+            if not manifest.is_current(
+                job[0], etags[job[0]], build_dst_key(job[0], job[1], args.format)
+            )
+        ]
+        print(f"[MANIFEST] {total - len(jobs)} of {total} files unchanged, skipping them")
+        if not jobs:
+            print("Nothing new to enrich.")
+            return
+
+    est_table = build_estimate_table(
+        [d for _, _, d in jobs], args.api_concurrency, args.api_rate, metrics=metrics
     )
 
+    def record_in_manifest(job: EnrichJob) -> None:
+        src_key, dst_prefix, date_str = job
+        manifest.record(
+            src_key,
+            etags[src_key],
+            date_str,
+            estimates_for_date(est_table, date_str),
+            build_dst_key(src_key, dst_prefix, args.format),
+        )
+
+    print(f"\n=== Enriching {len(jobs)} files with {args.workers} worker(s) ===")
+    try:
+        failures = enrich_files(
+            s3_client,
+            args.bucket,
+            jobs,
+            est_table,
+            args.workers,
+            args.streaming,
+            args.format,
+            on_success=record_in_manifest if manifest else None,
+            dedup=args.dedup,
+            metrics=metrics,
+        )
+    finally:
+        if manifest is not None:
+            with timer(metrics, "manifest"):
+                manifest.flush()
+
+    failed_keys = {key for key, _ in failures}
+    if args.rollup_prefix:
+        changed_days = {
+            date_str
+            for src_key, dst_prefix, date_str in jobs
+            if dst_prefix == args.pollution_out_prefix and src_key not in failed_keys
+        }
+        with timer(metrics, "rollup", days=len(changed_days)):
+            update_rollups(
+                s3_client,
+                args.bucket,
+                args.pollution_out_prefix,
+                args.rollup_prefix,
+                changed_days,
+                args.format,
+            )
+
+    if args.correlation_state:
+        enriched_days = {date_str for src_key, _, date_str in jobs if src_key not in failed_keys}
+        with timer(metrics, "correlation", days=len(enriched_days)):
+            update_correlations(
+                s3_client,
+                args.bucket,
+                args.pollution_out_prefix,
+                args.weather_out_prefix,
+                args.correlation_state,
+                enriched_days,
+            )
+
+    report_failures(failures)
+
     print("\nDone. All enriched files have been written to S3.")
 
 
@@ -0,0 +1,34 @@
+"""
+Putanja enriched fajla za source fajl: enrich_tourist_partitioned.py po njoj
+upisuje, a compact_partitions_job po njoj briše enriched fajlove spojenih
+source fajlova. Obe strane moraju da računaju isti put, pa je kod ovde.
+
+Bez pandas/boto3 zavisnosti; Glue job dobija ovaj fajl preko --extra-py-files.
+"""
+import os
+from typing import List
+
+OUTPUT_FORMATS = ("csv", "parquet")
+
+
+def build_dst_key(src_key: str, dst_prefix: str, output_format: str = "csv") -> str:
+    """
+    Isti relativni put kao src_key (bez prvog segmenta), ali ispod dst_prefix.
+    Ekstenzija prati izlazni format: .csv -> .parquet za parquet i
+    .parquet -> .csv za CSV izlaz iz parquet izvora.
+    """
+    base_name = src_key.split("/", 1)[1]
+    root, ext = os.path.splitext(base_name)
+    if output_format == "parquet" and ext != ".parquet":
+        base_name = (root if ext == ".csv" else base_name) + ".parquet"
+    elif output_format == "csv" and ext == ".parquet":
+        base_name = root + ".csv"
+    return os.path.join(dst_prefix.rstrip("/"), base_name).replace("\\", "/")
+
+
+def enriched_keys(src_key: str, dst_prefix: str) -> List[str]:
+    """
+    Svi enriched key-evi koje je enrich mogao da napravi od src_key (CSV i
+    parquet izlaz), sortirani i bez duplikata.
+    """
+    return sorted({build_dst_key(src_key, dst_prefix, fmt) for fmt in OUTPUT_FORMATS})
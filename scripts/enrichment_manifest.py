@@ -0,0 +1,100 @@
+"""
+Manifest obrađenih fajlova za enrich_tourist_partitioned.py.
+
+Za svaki uspešno obogaćen source objekat čuva se jedan JSON red:
+{"key": ..., "etag": ..., "date": ..., "estimate": ..., "dst_key": ...}
+
+Fajl se smatra obrađenim ako se i ETag i dst_key poklapaju sa zapisom,
+pa ponovno pokretanje obrađuje samo nove ili izmenjene objekte.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from state_store import is_s3_uri, read_text, write_text
+
+DEFAULT_S3_FLUSH_EVERY = 50
+
+
+class EnrichmentManifest:
+    """
+    Manifest u lokalnom fajlu ili na S3 (s3://bucket/key).
+
+    Lokalni manifest se dopisuje red po red odmah posle svakog fajla, pa
+    prekinuti run nastavlja tačno gde je stao. S3 objekat ne može da se
+    dopisuje, pa se ceo manifest prepisuje na svakih flush_every zapisa
+    i na kraju run-a (flush()).
+    """
+
+    def __init__(self, location: str, s3_client=None, flush_every: int = DEFAULT_S3_FLUSH_EVERY):
+        self.location = location
+        self.s3_client = s3_client
+        self.flush_every = flush_every
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        if not is_s3_uri(location):
+            os.makedirs(os.path.dirname(os.path.abspath(location)), exist_ok=True)
+
+    @classmethod
+    def load(cls, location: str, s3_client=None, **kwargs) -> "EnrichmentManifest":
+        manifest = cls(location, s3_client=s3_client, **kwargs)
+        text = read_text(location, s3_client) or ""
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # poslednji red može biti nedovršen ako je run prekinut usred upisa
+                print(f"[MANIFEST] Skipping unreadable line in {location}")
+                continue
+            manifest.entries[entry["key"]] = entry
+        return manifest
+
+    def is_current(self, key: str, etag: str, dst_key: str) -> bool:
+        entry = self.entries.get(key)
+        return (
+            entry is not None
+            and entry.get("etag") == etag
+            and entry.get("dst_key") == dst_key
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def record(self, key: str, etag: str, date_str: str, estimate: Any, dst_key: str) -> None:
+        entry = {
+            "key": key,
+            "etag": etag,
+            "date": date_str,
+            "estimate": estimate,
+            "dst_key": dst_key,
+        }
+        with self._lock:
+            self.entries[key] = entry
+            if is_s3_uri(self.location):
+                self._pending += 1
+                if self._pending >= self.flush_every:
+                    self._write_all()
+            else:
+                with open(self.location, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def flush(self) -> None:
+        """
+        Upisuje kompaktan manifest (jedan red po key-u). Za lokalni fajl
+        ovo samo sabija duplikate nastale dopisivanjem.
+        """
+        with self._lock:
+            self._write_all()
+
+    def _write_all(self) -> None:
+        text = "".join(
+            json.dumps(entry, ensure_ascii=False) + "\n"
+            for _, entry in sorted(self.entries.items())
+        )
+        write_text(self.location, text, self.s3_client)
+        self._pending = 0
@@ -1,8 +1,13 @@
 import argparse
 import json
 import os
-from datetime import datetime
-from typing import Any, Dict, Optional
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_type, datetime
+from typing import Any, Callable, Dict, Iterable, Optional
 
 import boto3
 import requests
@@ -15,12 +20,40 @@ DEFAULT_SECRET_NAME = "tourist_estimate_token"
 SECRET_REGION = os.getenv("SECRET_REGION", DEFAULT_SECRET_REGION)
 SECRET_NAME = os.getenv("SECRET_NAME", DEFAULT_SECRET_NAME)
 API_TIMEOUT_SECONDS = 10
+# Connections kept per host; bounds the useful concurrency of fetch_estimates_many.
+HTTP_POOL_SIZE = 32
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_RATE_PER_SECOND = 5.0
+MAX_THROTTLED_ATTEMPTS = 5
+THROTTLE_BACKOFF_SECONDS = 2.0
+
+# Persistent estimate cache. Set ESTIMATE_CACHE_PATH to an empty string to disable it.
+# Lambda only allows writes under /tmp, which also survives warm invocations.
+DEFAULT_CACHE_PATH = (
+    "/tmp/tourist_estimates.sqlite"
+    if os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+    else os.path.join(os.path.expanduser("~"), ".cache", "tourist_estimates.sqlite")
+)
+CACHE_PATH = os.getenv("ESTIMATE_CACHE_PATH", DEFAULT_CACHE_PATH)
+CACHE_S3_URI = os.getenv("ESTIMATE_CACHE_S3_URI", "")
+# Dates within CACHE_RECENT_DAYS of today may still change, so they expire after the TTL;
+# older dates are cached forever.
+CACHE_RECENT_DAYS = int(os.getenv("ESTIMATE_CACHE_RECENT_DAYS", "7"))
+CACHE_RECENT_TTL_SECONDS = int(os.getenv("ESTIMATE_CACHE_TTL_SECONDS", "86400"))
+CACHE_MAX_ENTRIES = int(os.getenv("ESTIMATE_CACHE_MAX_ENTRIES", "10000"))
+
 _token_cache: Optional[str] = None
 _session: Optional[requests.Session] = None
+_estimate_cache: Optional["EstimateCache"] = None
 
 
 def get_session() -> requests.Session:
-    """Return a reusable requests session with basic retries configured."""
+    """Return a reusable requests session with basic retries configured.
+
+    Once the retries are used up the last response is returned rather than
+    raising ``RetryError``, so callers see the real status (e.g. a 429 to back
+    off on, or the final 5xx).
+    """
     global _session
     if _session is None:
         retry_strategy = Retry(
@@ -28,8 +61,13 @@ def get_session() -> requests.Session:
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["GET"],
             backoff_factor=0.5,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         s = requests.Session()
         s.mount("https://", adapter)
         s.mount("http://", adapter)
@@ -63,27 +101,286 @@ def validate_date(date_str: str) -> str:
     return parsed.strftime("%Y-%m-%d")
 
 
-def fetch_estimates(date_str: str) -> Dict[str, Any]:
+class EstimateCache:
+    """SQLite-backed cache of API responses keyed by date, optionally mirrored to S3.
+
+    Entries for dates older than ``recent_days`` never expire; more recent ones
+    expire after ``recent_ttl_seconds``. When more than ``max_entries`` are stored,
+    the least recently used ones are evicted. With ``s3_uri`` set, local misses
+    fall back to ``<s3_uri>/<date>.json`` and new entries are written there too,
+    so fresh machines and Lambda cold starts share the same cache. S3 errors
+    (missing object, access denied, throttling, malformed JSON) are logged and
+    treated as a cache miss, so the cache never fails a fetch.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        s3_uri: str = "",
+        recent_days: int = CACHE_RECENT_DAYS,
+        recent_ttl_seconds: int = CACHE_RECENT_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.s3_uri = s3_uri.rstrip("/")
+        self.recent_days = recent_days
+        self.recent_ttl_seconds = recent_ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._s3_client = None
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS estimates ("
+                " date TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+
+    def _is_fresh(self, date_str: str, fetched_at: float, now: float) -> bool:
+        age_days = (date_type.today() - datetime.strptime(date_str, "%Y-%m-%d").date()).days
+        if age_days > self.recent_days:
+            return True
+        return now - fetched_at < self.recent_ttl_seconds
+
+    def get(self, date_str: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM estimates WHERE date = ?", (date_str,)
+            ).fetchone()
+            if row is not None and self._is_fresh(date_str, row[1], now):
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE estimates SET accessed_at = ? WHERE date = ?", (now, date_str)
+                    )
+                return json.loads(row[0])
+
+        if self.s3_uri:
+            entry = self._s3_get(date_str)
+            if entry is not None and self._is_fresh(date_str, entry["fetched_at"], now):
+                self._store(date_str, entry["payload"], entry["fetched_at"])
+                return entry["payload"]
+        return None
+
+    def put(self, date_str: str, payload: Dict[str, Any]) -> None:
+        fetched_at = time.time()
+        self._store(date_str, payload, fetched_at)
+        if self.s3_uri:
+            self._s3_put(date_str, payload, fetched_at)
+
+    def _store(self, date_str: str, payload: Dict[str, Any], fetched_at: float) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO estimates (date, payload, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (date_str, json.dumps(payload), fetched_at, now),
+            )
+            self._conn.execute(
+                "DELETE FROM estimates WHERE date NOT IN ("
+                " SELECT date FROM estimates ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def _s3_location(self, date_str: str):
+        if not self.s3_uri.startswith("s3://"):
+            raise ValueError(f"ESTIMATE_CACHE_S3_URI must start with s3://, got {self.s3_uri!r}")
+        bucket, _, prefix = self.s3_uri[len("s3://"):].partition("/")
+        key = f"{prefix}/{date_str}.json" if prefix else f"{date_str}.json"
+        if self._s3_client is None:
+            self._s3_client = boto3.client("s3")
+        return self._s3_client, bucket, key
+
+    def _s3_get(self, date_str: str) -> Optional[Dict[str, Any]]:
+        client, bucket, key = self._s3_location(date_str)
+        try:
+            resp = client.get_object(Bucket=bucket, Key=key)
+            return json.loads(resp["Body"].read())
+        except client.exceptions.NoSuchKey:
+            return None
+        except Exception as exc:
+            print(f"[WARN] estimate cache read s3://{bucket}/{key} failed: {exc!r}", file=sys.stderr)
+            return None
+
+    def _s3_put(self, date_str: str, payload: Dict[str, Any], fetched_at: float) -> None:
+        client, bucket, key = self._s3_location(date_str)
+        body = json.dumps({"fetched_at": fetched_at, "payload": payload})
+        try:
+            client.put_object(Bucket=bucket, Key=key, Body=body.encode("utf-8"))
+        except Exception as exc:
+            print(f"[WARN] estimate cache write s3://{bucket}/{key} failed: {exc!r}", file=sys.stderr)
+
+
+def get_estimate_cache() -> Optional[EstimateCache]:
+    """Return the process-wide estimate cache, or None when caching is disabled."""
+    global _estimate_cache
+    if _estimate_cache is None and CACHE_PATH:
+        _estimate_cache = EstimateCache(CACHE_PATH, CACHE_S3_URI)
+    return _estimate_cache
+
+
+def fetch_estimates(date_str: str, use_cache: bool = True) -> Dict[str, Any]:
     date = validate_date(date_str)
+
+    cache = get_estimate_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(date)
+        if cached is not None:
+            return cached
+
+    response = _request_estimates(date)
+
+    if response.status_code != 200:
+        raise RuntimeError(f"API error {response.status_code}: {response.text}")
+
+    data = response.json()
+    if cache is not None:
+        cache.put(date, data)
+    return data
+
+
+def _request_estimates(date: str) -> requests.Response:
     token = get_token()
 
     headers = {"Authorization": f"Bearer {token}"}
     params = {"date": date}
 
-    response = get_session().get(API_URL, headers=headers, params=params, timeout=API_TIMEOUT_SECONDS)
+    return get_session().get(API_URL, headers=headers, params=params, timeout=API_TIMEOUT_SECONDS)
 
-    if response.status_code != 200:
-        raise RuntimeError(f"API error {response.status_code}: {response.text}")
 
-    return response.json()
+class TokenBucket:
+    """Thread-safe token bucket shared by all fetch_estimates_many workers.
+
+    ``throttle`` is called when the API answers 429 and pauses every worker,
+    not only the one that got throttled.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self.rate = rate_per_second
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._blocked_until:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._blocked_until - now
+            time.sleep(wait)
+
+    def throttle(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._blocked_until)
+
+
+def _retry_after_seconds(response: Optional[requests.Response], default: float) -> float:
+    if response is None:
+        return default
+    try:
+        return max(default, float(response.headers.get("Retry-After", default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def fetch_estimates_many(
+    dates: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+    use_cache: bool = True,
+    on_request: Optional[Callable[[str, float, int], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch estimates for many dates concurrently and return ``{date: payload}``.
+
+    Cached dates are answered without a request. The rest are fetched by at most
+    ``max_concurrency`` threads sharing the ``get_session`` retry setup, paced by a
+    token bucket of ``rate_per_second``. A 429 pauses the whole bucket for the
+    Retry-After period before the date is retried; any other error status, or a
+    ``RetryError`` from the session, fails the date.
+
+    ``on_request(date, seconds, status_code)`` is called after every HTTP request
+    (status 0 for a ``RetryError``), e.g. to collect latencies.
+    """
+    unique_dates = sorted({validate_date(d) for d in dates})
+    cache = get_estimate_cache() if use_cache else None
+
+    results: Dict[str, Dict[str, Any]] = {}
+    missing = []
+    for d in unique_dates:
+        cached = cache.get(d) if cache is not None else None
+        if cached is not None:
+            results[d] = cached
+        else:
+            missing.append(d)
+
+    if not missing:
+        return results
+
+    # fetch the secret once, before the workers race for it
+    get_token()
+    bucket = TokenBucket(rate_per_second)
+
+    def fetch_one(d: str) -> Dict[str, Any]:
+        for _ in range(MAX_THROTTLED_ATTEMPTS):
+            bucket.acquire()
+            start = time.perf_counter()
+            try:
+                response = _request_estimates(d)
+            except requests.exceptions.RetryError as e:
+                # the session already retried; not a throttle, so don't retry again
+                if on_request is not None:
+                    on_request(d, time.perf_counter() - start, 0)
+                raise RuntimeError(f"API retries exhausted for date={d}: {e}") from e
+            if on_request is not None:
+                on_request(d, time.perf_counter() - start, response.status_code)
+
+            if response.status_code == 429:
+                bucket.throttle(_retry_after_seconds(response, THROTTLE_BACKOFF_SECONDS))
+                continue
+            if response.status_code != 200:
+                raise RuntimeError(f"API error {response.status_code} for date={d}: {response.text}")
+
+            data = response.json()
+            if cache is not None:
+                cache.put(d, data)
+            return data
+
+        raise RuntimeError(f"API kept throttling requests for date={d}")
+
+    workers = max(1, min(max_concurrency, HTTP_POOL_SIZE, len(missing)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for d, data in zip(missing, executor.map(fetch_one, missing)):
+            results[d] = data
+
+    return dict(sorted(results.items()))
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Fetch tourist estimates for a given date.")
     parser.add_argument("date", help="Date in YYYY-MM-DD format")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the persistent estimate cache")
     args = parser.parse_args()
 
-    data = fetch_estimates(args.date)
+    data = fetch_estimates(args.date, use_cache=not args.no_cache)
     print(json.dumps(data, indent=2))
 
 
@@ -4,21 +4,103 @@ Enable S3 Event Notifications, SQS Trigger, and DynamoDB Insertion Trello task.
 Develop Lambda Function:
 - Develop a Lambda function that is triggered by messages from the SQS queue.
 - Lambda function should process files only from the "pollution", "sensor" and "weather" folders.
+
+Item-i iz celog SQS batch-a se skupljaju i upisuju sa batch_write_item
+(do 25 po zahtevu); UnprocessedItems se ponovo šalju uz exponential backoff.
+
+Item je {file_name, timestamp, status}. Ključ tabele (partition + sort key)
+zadaje env TABLE_KEY_ATTRIBUTES, atributi odvojeni zarezom (default
+"file_name", tj. tabela sa samo partition key-em file_name). Item-i sa istim
+ključem u jednom batch-u se spajaju u poslednji, jer batch_write_item odbija
+duplikate ključa; zato TABLE_KEY_ATTRIBUTES mora da odgovara tabeli. Npr. uz
+ključ file_name, pollution/a/data.csv i weather/b/data.csv su isti item.
+
+DynamoDB client (low-level, bez resource modela) se pravi tek kad prvi put
+ima šta da se upiše i čuva se na nivou modula za sledeće pozive, pa cold start
+i pozivi koji samo preskaču fajlove ne plaćaju njegovo pravljenje.
 '''
 
 import json
 import os
+import time
 import boto3
 from datetime import datetime
 from urllib.parse import unquote_plus
 
 VALID_PREFIXES = ("pollution/", "sensor/", "weather/")
+BATCH_WRITE_LIMIT = 25
+MAX_BATCH_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 0.05
+BACKOFF_MAX_SECONDS = 2.0
+
+ITEM_ATTRIBUTES = ("file_name", "timestamp", "status")
 
-dynamodb = boto3.resource("dynamodb")
 table_name = os.environ["DDB_TABLE_NAME"]
-table = dynamodb.Table(table_name)
+table_key_attributes = tuple(
+    name.strip() for name in os.environ.get("TABLE_KEY_ATTRIBUTES", "file_name").split(",") if name.strip()
+)
+unknown_key_attributes = [name for name in table_key_attributes if name not in ITEM_ATTRIBUTES]
+if not table_key_attributes or unknown_key_attributes:
+    raise ValueError(
+        f"TABLE_KEY_ATTRIBUTES must be a subset of {ITEM_ATTRIBUTES}, got {os.environ.get('TABLE_KEY_ATTRIBUTES')!r}"
+    )
+
+_dynamodb_client = None
+
+
+def get_dynamodb_client():
+    global _dynamodb_client
+    if _dynamodb_client is None:
+        _dynamodb_client = boto3.client("dynamodb")
+    return _dynamodb_client
+
+
+def to_attribute_values(item):
+    '''
+    Python vrednosti -> DynamoDB typed atributi za low-level client.
+    '''
+    attributes = {}
+    for name, value in item.items():
+        if isinstance(value, bool):
+            attributes[name] = {"BOOL": value}
+        elif isinstance(value, (int, float)):
+            attributes[name] = {"N": str(value)}
+        else:
+            attributes[name] = {"S": str(value)}
+    return attributes
+
+
+def batch_write_items(items):
+    '''
+    Upisuje item-e u tabelu u grupama od BATCH_WRITE_LIMIT. Neobrađeni item-i
+    (throttling) se šalju ponovo sa exponential backoff-om; ako ni posle
+    MAX_BATCH_ATTEMPTS pokušaja nisu upisani, baca grešku da bi SQS ponovio batch.
+    '''
+    dynamodb = get_dynamodb_client()
+
+    for start in range(0, len(items), BATCH_WRITE_LIMIT):
+        requests = [
+            {"PutRequest": {"Item": to_attribute_values(item)}}
+            for item in items[start:start + BATCH_WRITE_LIMIT]
+        ]
+
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            response = dynamodb.batch_write_item(RequestItems={table_name: requests})
+            requests = response.get("UnprocessedItems", {}).get(table_name, [])
+            if not requests:
+                break
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+            print(f"{len(requests)} unprocessed items, retrying in {delay:.2f}s")
+            time.sleep(delay)
+        else:
+            raise Exception(f"{len(requests)} items still unprocessed after {MAX_BATCH_ATTEMPTS} attempts")
+
 
 def lambda_handler(event, context):
+    # isti ključ tabele dva puta u batch-u bi oborio batch_write_item, pa
+    # ostaje poslednji zapis (kao kod put_item)
+    items = {}
+
     for record in event.get("Records", []):
         body = json.loads(record["body"])
 
@@ -47,13 +129,15 @@ def lambda_handler(event, context):
 
             print(f"Processing object {bucket}/{key} -> file_name={file_name}")
 
-            table.put_item(
-                Item={
-                    "file_name": file_name,
-                    "timestamp": event_time,
-                    "status": status
-                }
-            )
+            item = {
+                "file_name": file_name,
+                "timestamp": event_time,
+                "status": status
+            }
+            items[tuple(item[name] for name in table_key_attributes)] = item
+
+    if items:
+        batch_write_items(list(items.values()))
 
     return {
         "statusCode": 200,
@@ -1,44 +1,171 @@
 '''
 S3 file extraction using Lambda Trello task,
 za sve 3 lambda funkcije kod mi je isti samo je razlika u env variables (putanjama u S3)
+
+Kopiranje ide paralelno (COPY_MAX_WORKERS niti, jedan zajednički S3 client),
+objekti veći od MULTIPART_THRESHOLD_BYTES se kopiraju multipart upload_part_copy
+pozivima (copy_object ne radi iznad 5 GB); ContentType i metadata se za njih
+prenose iz head_object, jer ih create_multipart_upload ne kopira sam. Delove svih
+multipart kopija radi jedan zajednički pool od COPY_PART_WORKERS niti, pa je
+istovremeno najviše COPY_MAX_WORKERS + COPY_PART_WORKERS zahteva.
+
+Pre svakog objekta se proverava preostalo vreme Lambde; kad ostane manje od
+TIME_SAFETY_MARGIN_MS, novi objekti se preskaču, handler čeka one koji su u toku
+i vraća start_after (poslednji kopirani ključ). Event sa start_after nastavlja od
+sledećeg ključa (list_objects_v2 StartAfter); kopiranje je idempotentno, pa
+ponovljeno kopiranje nekog objekta ne smeta.
 '''
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
+from botocore.config import Config
+
+MAX_WORKERS = int(os.environ.get("COPY_MAX_WORKERS", "16"))
+PART_WORKERS = int(os.environ.get("COPY_PART_WORKERS", "8"))
+MULTIPART_THRESHOLD = int(os.environ.get("MULTIPART_THRESHOLD_BYTES", str(512 * 1024 * 1024)))
+PART_SIZE = int(os.environ.get("MULTIPART_PART_SIZE_BYTES", str(256 * 1024 * 1024)))
+MAX_PARTS = 10000
+TIME_SAFETY_MARGIN_MS = int(os.environ.get("TIME_SAFETY_MARGIN_MS", "60000"))
+# zaglavlja izvora koja create_multipart_upload ne preuzima sam
+COPIED_HEADERS = ("ContentType", "Metadata", "CacheControl", "ContentDisposition", "ContentEncoding",
+                  "ContentLanguage")
+
+
+def multipart_copy(s3, source_bucket, key, dest_bucket, dest_key, size, part_size=PART_SIZE, executor=None):
+    """
+    Kopira objekat delovima; executor je zajednički pool za delove (bez njega
+    se pravi sopstveni od PART_WORKERS niti).
+    """
+    # S3 dozvoljava najviše 10000 delova, pa za ogromne objekte delovi rastu
+    part_size = max(part_size, -(-size // MAX_PARTS))
+    head = s3.head_object(Bucket=source_bucket, Key=key)
+    headers = {name: head[name] for name in COPIED_HEADERS if head.get(name)}
+    upload_id = s3.create_multipart_upload(Bucket=dest_bucket, Key=dest_key, **headers)["UploadId"]
+
+    def copy_part(part_number):
+        start = (part_number - 1) * part_size
+        end = min(start + part_size, size) - 1
+        resp = s3.upload_part_copy(
+            Bucket=dest_bucket,
+            Key=dest_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource={"Bucket": source_bucket, "Key": key},
+            CopySourceRange=f"bytes={start}-{end}",
+        )
+        return {"ETag": resp["CopyPartResult"]["ETag"], "PartNumber": part_number}
+
+    part_numbers = range(1, -(-size // part_size) + 1)
+    try:
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=PART_WORKERS) as own_executor:
+                parts = list(own_executor.map(copy_part, part_numbers))
+        else:
+            parts = list(executor.map(copy_part, part_numbers))
+        s3.complete_multipart_upload(
+            Bucket=dest_bucket,
+            Key=dest_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except Exception:
+        s3.abort_multipart_upload(Bucket=dest_bucket, Key=dest_key, UploadId=upload_id)
+        raise
+
 
 def lambda_handler(event, context):
     source_bucket = os.environ["SOURCE_BUCKET"]
     dest_bucket = os.environ["DEST_BUCKET"]
     source_prefix = os.environ["SOURCE_PREFIX"]
     dest_prefix = os.environ["DEST_PREFIX"]
-    
-    s3 = boto3.client("s3")
+
+    event = event or {}
+    # continuation_token je stari format nastavka (granica stranice), i dalje se prihvata
+    continuation_token = event.get("continuation_token")
+    start_after = event.get("start_after")
+
+    s3 = boto3.client("s3", config=Config(max_pool_connections=MAX_WORKERS + PART_WORKERS))
 
     paginator = s3.get_paginator("list_objects_v2")
+    list_kwargs = {"Bucket": source_bucket, "Prefix": source_prefix}
+    if continuation_token:
+        list_kwargs["ContinuationToken"] = continuation_token
+    elif start_after:
+        list_kwargs["StartAfter"] = start_after
 
-    copied_files = 0
+    stopping = threading.Event()
+    started = threading.Event()
+
+    def out_of_time():
+        # prvi objekat se uvek kopira, da svaki poziv napreduje
+        if not started.is_set():
+            started.set()
+            return False
+        return context is not None and context.get_remaining_time_in_millis() < TIME_SAFETY_MARGIN_MS
+
+    def copy_one(obj):
+        if stopping.is_set() or out_of_time():
+            stopping.set()
+            return False
 
-    for page in paginator.paginate(Bucket=source_bucket, Prefix=source_prefix):
-        for obj in page.get("Contents", []):
-            key = obj["Key"]
+        key = obj["Key"]
+        suffix = key[len(source_prefix):]
+        dest_key = dest_prefix + suffix
 
-            if key.endswith("/") and key == source_prefix:
-                continue
+        if obj.get("Size", 0) > MULTIPART_THRESHOLD:
+            multipart_copy(s3, source_bucket, key, dest_bucket, dest_key, obj["Size"], executor=part_executor)
+            return True
+
+        copy_source = {"Bucket": source_bucket, "Key": key}
+
+        s3.copy_object(
+            Bucket=dest_bucket,
+            Key=dest_key,
+            CopySource=copy_source
+        )
+        return True
+
+    copied_files = 0
+    last_key = start_after
+    stopped = False
 
-            suffix = key[len(source_prefix):]
-            dest_key = dest_prefix + suffix
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor, \
+            ThreadPoolExecutor(max_workers=PART_WORKERS) as part_executor:
+        for page in paginator.paginate(**list_kwargs):
+            objects = [
+                obj for obj in page.get("Contents", [])
+                if not (obj["Key"].endswith("/") and obj["Key"] == source_prefix)
+            ]
 
-            copy_source = {"Bucket": source_bucket, "Key": key}
+            # list() čeka celu stranicu i prosleđuje prvu grešku
+            copied = list(executor.map(copy_one, objects))
+            copied_files += sum(copied)
 
-            s3.copy_object(
-                Bucket=dest_bucket,
-                Key=dest_key,
-                CopySource=copy_source
-            )
+            if stopping.is_set():
+                # niti uzimaju objekte redom, pa su kopirani oni pre prvog preskočenog
+                done = copied.index(False)
+                if done:
+                    last_key = objects[done - 1]["Key"]
+                stopped = True
+                break
+            if objects:
+                last_key = objects[-1]["Key"]
 
-            copied_files += 1
+    body = (f"Copied {copied_files} objects from {source_bucket}/{source_prefix} "
+            f"to {dest_bucket}/{dest_prefix}")
+    if stopped:
+        print(f"Stopping early, resume with start_after={last_key}")
+        return {
+            "statusCode": 200,
+            "body": body + " (partial, resume with start_after)",
+            "complete": False,
+            "start_after": last_key,
+        }
 
     return {
         "statusCode": 200,
-        "body": f"Copied {copied_files} objects from {source_bucket}/{source_prefix} "
-                f"to {dest_bucket}/{dest_prefix}"
+        "body": body,
+        "complete": True,
     }
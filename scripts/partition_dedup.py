@@ -0,0 +1,72 @@
+"""
+Dedup inkrementalnog batch-a partition_by_date_job protiv već upisanih particija.
+
+Firehose isti red (name, time_nano) isporučuje i 30+ minuta kasnije, pa duplikat
+često stigne u sledećem INCREMENTAL run-u. Dedup samo unutar batch-a ga ne vidi;
+zato se za datume koje batch pogađa pročitaju ključevi iz već upisanih date=
+particija i novi redovi sa istim ključem se izbacuju (left anti join). Upisani
+red uvek ostaje, jer se u append modu ne prepisuje.
+
+Glue job dobija ovaj fajl preko --extra-py-files, kao i time_columns.py.
+"""
+from datetime import date
+from typing import Iterable, List
+
+DEDUP_KEYS = ["name", "time_nano"]
+
+
+def partition_paths(target_path: str, dates: Iterable[date], partition_keys: List[str]) -> List[str]:
+    """
+    Putanje koje treba pročitati za zadate datume: date=YYYY-MM-DD direktorijumi
+    kad je date prva particija, inače ceo target (filtrira se po koloni date).
+    """
+    target_path = target_path.rstrip("/")
+    if partition_keys[0] != "date":
+        return [target_path]
+    return [f"{target_path}/date={d.isoformat()}" for d in sorted(set(dates))]
+
+
+def _path_exists(spark, path: str) -> bool:
+    jvm_path = spark._jvm.org.apache.hadoop.fs.Path(path)
+    return jvm_path.getFileSystem(spark._jsc.hadoopConfiguration()).exists(jvm_path)
+
+
+def read_written_keys(spark, target_path: str, dates: List[date], partition_keys: List[str], output_format: str):
+    """
+    Distinct (name, time_nano) iz već upisanih particija zadatih datuma, ili
+    None ako nijedna još ne postoji.
+    """
+    from pyspark.sql.functions import col
+
+    paths = [p for p in partition_paths(target_path, dates, partition_keys) if _path_exists(spark, p)]
+    if not paths:
+        return None
+
+    reader = spark.read.option("basePath", target_path.rstrip("/"))
+    if output_format == "parquet":
+        written = reader.parquet(*paths)
+    else:
+        # header daje imena kolona; time_nano je tada string
+        written = reader.option("header", True).csv(paths)
+    return (
+        written.where(col("date").isin(dates))
+        .select(col("name"), col("time_nano").cast("long").alias("time_nano"))
+        .distinct()
+    )
+
+
+def drop_already_written(df, spark, target_path: str, partition_keys: List[str], output_format: str):
+    """
+    Izbacuje redove batch-a čiji (name, time_nano) već postoji u target-u.
+    df mora imati kolonu date (add_spark_time_columns). Datumi batch-a se
+    skupljaju posebnom Spark akcijom (distinct date + collect), dodatnim
+    prolazom kroz batch pre upisa; pozivalac zato treba da persist-uje df,
+    inače se batch (čitanje ulaza i dedup) računa dvaput.
+    """
+    dates = [row["date"] for row in df.select("date").distinct().collect() if row["date"] is not None]
+    if not dates:
+        return df
+    written = read_written_keys(spark, target_path, dates, partition_keys, output_format)
+    if written is None:
+        return df
+    return df.join(written, on=DEDUP_KEYS, how="left_anti")
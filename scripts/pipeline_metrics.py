@@ -0,0 +1,189 @@
+"""
+Merenje faza pipeline-a: vreme, bajtovi, redovi i broj zahteva po fazi.
+
+Svaki zapis faze (timer/record) nosi trajanje i proizvoljne brojače (rows,
+bytes_read, bytes_written, errors...). summary() daje po fazi broj poziva,
+ukupno i "wall" vreme (od prvog starta do poslednjeg kraja, bitno kad faza
+radi u više niti), p50/p90/p99/max latenciju i sume brojača.
+
+InstrumentedClient obmotava boto3 client i meri svaki API poziv kao fazu
+"<prefix>.<operacija>" (npr. s3.get_object), bez izmena u kodu koji ga koristi.
+
+Izlaz je jedan JSON (format "json") ili CloudWatch EMF linije, jedna po fazi
+(format "emf"); EMF linije iz Lambda/Glue log-a CloudWatch sam pretvara u metrike.
+"""
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, IO, Iterator, List, Optional
+
+METRICS_FORMATS = ("json", "emf")
+DEFAULT_NAMESPACE = "TaraEnrichment"
+PERCENTILES = (50, 90, 99)
+
+EMF_UNITS = {
+    "count": "Count",
+    "total_ms": "Milliseconds",
+    "wall_ms": "Milliseconds",
+    "p50_ms": "Milliseconds",
+    "p90_ms": "Milliseconds",
+    "p99_ms": "Milliseconds",
+    "max_ms": "Milliseconds",
+    "rows": "Count",
+    "bytes_read": "Bytes",
+    "bytes_written": "Bytes",
+    "errors": "Count",
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentil već sortirane liste.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class StageMetrics:
+    """
+    Thread-safe kolektor; isti objekat dele sve worker niti.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, List[float]] = {}
+        self._counters: Dict[str, Dict[str, float]] = {}
+        self._spans: Dict[str, List[float]] = {}
+        self.started = time.time()
+
+    def record(self, stage: str, seconds: float, start: Optional[float] = None, **counters: float) -> None:
+        end = time.perf_counter()
+        start = end - seconds if start is None else start
+        with self._lock:
+            self._latencies.setdefault(stage, []).append(seconds)
+            totals = self._counters.setdefault(stage, {})
+            for name, value in counters.items():
+                if value:
+                    totals[name] = totals.get(name, 0) + value
+            span = self._spans.setdefault(stage, [start, end])
+            span[0] = min(span[0], start)
+            span[1] = max(span[1], end)
+
+    @contextmanager
+    def timer(self, stage: str, **counters: float) -> Iterator[Dict[str, float]]:
+        """
+        Meri blok kao jedan poziv faze; brojači se mogu dopuniti u bloku
+        (m["rows"] = len(df)). Izuzetak se broji kao errors=1 i prosleđuje dalje.
+        """
+        values = dict(counters)
+        start = time.perf_counter()
+        try:
+            yield values
+        except BaseException:
+            values["errors"] = values.get("errors", 0) + 1
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start, start=start, **values)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = {}
+            for stage, latencies in self._latencies.items():
+                ordered = sorted(latencies)
+                span = self._spans[stage]
+                stats = {
+                    "count": len(ordered),
+                    "total_ms": round(sum(ordered) * 1000, 3),
+                    "wall_ms": round((span[1] - span[0]) * 1000, 3),
+                    "max_ms": round(ordered[-1] * 1000, 3),
+                }
+                for pct in PERCENTILES:
+                    stats[f"p{pct}_ms"] = round(percentile(ordered, pct) * 1000, 3)
+                stats.update(self._counters[stage])
+                stages[stage] = stats
+        return dict(sorted(stages.items()))
+
+    def to_json(self, **dimensions: str) -> str:
+        return json.dumps({**dimensions, "started": self.started, "stages": self.summary()}, ensure_ascii=False)
+
+    def emf_lines(self, namespace: str = DEFAULT_NAMESPACE, **dimensions: str) -> List[str]:
+        """
+        CloudWatch Embedded Metric Format: jedna linija po fazi, dimenzija Stage
+        (plus zadate dimenzije, npr. Dataset).
+        """
+        timestamp = int(time.time() * 1000)
+        dimension_names = ["Stage", *sorted(dimensions)]
+        lines = []
+        for stage, stats in self.summary().items():
+            metrics = [
+                {"Name": name, "Unit": EMF_UNITS.get(name, "None")}
+                for name in stats
+            ]
+            lines.append(json.dumps({
+                "_aws": {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [{
+                        "Namespace": namespace,
+                        "Dimensions": [dimension_names],
+                        "Metrics": metrics,
+                    }],
+                },
+                "Stage": stage,
+                **dimensions,
+                **stats,
+            }, ensure_ascii=False))
+        return lines
+
+    def emit(self, fmt: str, out: IO[str], namespace: str = DEFAULT_NAMESPACE, **dimensions: str) -> None:
+        if fmt == "emf":
+            for line in self.emf_lines(namespace, **dimensions):
+                print(line, file=out)
+        elif fmt == "json":
+            print(self.to_json(**dimensions), file=out)
+        else:
+            raise ValueError(f"Unknown metrics format {fmt!r}, expected one of {METRICS_FORMATS}")
+
+
+def timer(metrics: Optional[StageMetrics], stage: str, **counters: float):
+    """
+    metrics.timer(...) ili no-op kad merenje nije uključeno (metrics=None).
+    """
+    if metrics is None:
+        return nullcontext(dict(counters))
+    return metrics.timer(stage, **counters)
+
+
+class InstrumentedClient:
+    """
+    Proxy oko boto3 client-a: svaki API poziv se meri kao faza
+    "<prefix>.<operacija>". Za get_object se broji ContentLength, za pozive sa
+    bytes Body (put_object, upload_part) njegova dužina.
+    """
+
+    PASSTHROUGH = {"get_paginator", "can_paginate", "generate_presigned_url", "close"}
+
+    def __init__(self, client, metrics: StageMetrics, prefix: str = "s3") -> None:
+        self._client = client
+        self._metrics = metrics
+        self._prefix = prefix
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if name.startswith("_") or name in self.PASSTHROUGH or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with self._metrics.timer(f"{self._prefix}.{name}") as m:
+                body = kwargs.get("Body")
+                if isinstance(body, (bytes, bytearray)):
+                    m["bytes_written"] = len(body)
+                response = attr(*args, **kwargs)
+                if isinstance(response, dict) and name == "get_object":
+                    m["bytes_read"] = response.get("ContentLength") or 0
+            return response
+
+        return call
@@ -0,0 +1,311 @@
+"""
+Inkrementalna korelacija izloženosti turista PM2.5 i vremena (vetar, kiša) po gradu.
+
+Isto što i athena_queries/pollution_weather_correlation.sql, ali bez ponovnog
+skeniranja cele istorije: za svaki (grad, dan) čuva se tačka
+(exposure, wind, rain), a za svaki par metrika (exposure_wind, exposure_rain)
+tekuće sume n, sx, sy, sxx, syy, sxy. Korelacija se iz njih računa odmah.
+
+Dan se uvek računa iz CELIH enriched particija tog dana (kao rollup), pa se
+njegov stari doprinos prvo oduzme iz suma, a onda doda novi; ponovno pokretanje
+za isti dan ne duplira podatke.
+
+  exposure  SUM(pm25 * tourist_estimate) za dan i grad (rollup_day)
+  wind      prosek satnih proseka weather_windSpeed
+  rain      suma satnih proseka padavina (weather_precipitation); u trenutnim
+            weather podacima te kolone nema, pa exposure_rain ostaje prazan
+
+Stanje je JSON u lokalnom fajlu ili na S3 (state_store).
+
+    python scripts/pollution_weather_correlation.py --bucket my-bucket \\
+        --state s3://my-bucket/state/pollution_weather_correlation.json --date 2022-04-28
+"""
+import argparse
+import json
+import math
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from rollup_pollution_daily_city import (
+    DATE_RE,
+    list_partition_keys,
+    read_data_file,
+    rollup_day,
+)
+from state_store import read_text, write_text
+
+STATE_VERSION = 1
+EXPOSURE_COLUMN = "pollution_total_visitor_pm25"
+WIND_COLUMNS = ("weather_windSpeed", "weather_wind_speed")
+RAIN_COLUMNS = ("weather_precipitation", "weather_rain")
+NANOS_PER_HOUR = 3_600_000_000_000
+# par -> (x, y) iz tačke dana
+PAIRS = {
+    "exposure_wind": ("exposure", "wind"),
+    "exposure_rain": ("exposure", "rain"),
+}
+SUM_FIELDS = ("n", "sx", "sy", "sxx", "syy", "sxy")
+
+# {city -> {"exposure": ..., "wind": ..., "rain": ...}}, None gde vrednosti nema
+DayPoints = Dict[str, Dict[str, Optional[float]]]
+
+
+def _first_column(df: pd.DataFrame, candidates: Iterable[str]) -> Optional[str]:
+    return next((c for c in candidates if c in df.columns), None)
+
+
+def daily_weather(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Weather redovi jednog dana -> (city, wind, rain): prvo prosek po satu
+    (time_nano // 1h), pa prosek (vetar) odnosno suma (kiša) satnih proseka.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["city", "wind", "rain"])
+
+    wind_col = _first_column(df, WIND_COLUMNS)
+    rain_col = _first_column(df, RAIN_COLUMNS)
+    hourly = pd.DataFrame({
+        "city": df["location_name"],
+        "hour": pd.to_numeric(df["time_nano"], errors="coerce") // NANOS_PER_HOUR,
+        "wind": pd.to_numeric(df[wind_col], errors="coerce") if wind_col else float("nan"),
+        "rain": pd.to_numeric(df[rain_col], errors="coerce") if rain_col else float("nan"),
+    }).groupby(["city", "hour"], as_index=False).mean()
+
+    daily = hourly.groupby("city").agg(wind=("wind", "mean"), rain=("rain", "sum"))
+    if rain_col is None:
+        daily["rain"] = float("nan")
+    return daily.reset_index()
+
+
+def day_points(rollup: pd.DataFrame, weather: pd.DataFrame) -> DayPoints:
+    """
+    Spaja dnevni pollution rollup i daily_weather po gradu (inner join, kao SQL).
+    """
+    joined = rollup[["city", EXPOSURE_COLUMN]].merge(weather, on="city", how="inner")
+    points: DayPoints = {}
+    for row in joined.itertuples(index=False):
+        points[row.city] = {
+            "exposure": _clean(getattr(row, EXPOSURE_COLUMN)),
+            "wind": _clean(row.wind),
+            "rain": _clean(row.rain),
+        }
+    return points
+
+
+def _clean(value) -> Optional[float]:
+    if value is None or pd.isna(value):
+        return None
+    return float(value)
+
+
+def empty_sums() -> Dict[str, float]:
+    return {field: 0.0 for field in SUM_FIELDS}
+
+
+def correlation_from_sums(sums: Dict[str, float]) -> Optional[float]:
+    """
+    Pearson-ova korelacija iz n, sx, sy, sxx, syy, sxy (isto što i corr()).
+    None ako ima manje od 2 tačke ili je jedna strana konstantna.
+    """
+    n = sums["n"]
+    if n < 2:
+        return None
+    cov = sums["sxy"] - sums["sx"] * sums["sy"] / n
+    var_x = sums["sxx"] - sums["sx"] ** 2 / n
+    var_y = sums["syy"] - sums["sy"] ** 2 / n
+    if var_x <= 0 or var_y <= 0:
+        return None
+    return max(-1.0, min(1.0, cov / math.sqrt(var_x * var_y)))
+
+
+class CorrelationState:
+    """
+    Tačke po (grad, dan) i tekuće sume po (grad, par).
+    """
+
+    def __init__(self, cities: Optional[Dict[str, Dict]] = None) -> None:
+        self.cities: Dict[str, Dict] = cities or {}
+
+    @classmethod
+    def load(cls, location: str, s3_client=None) -> "CorrelationState":
+        text = read_text(location, s3_client)
+        if not text:
+            return cls()
+        data = json.loads(text)
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported correlation state version {data.get('version')} in {location}")
+        return cls(data["cities"])
+
+    def save(self, location: str, s3_client=None) -> None:
+        text = json.dumps({"version": STATE_VERSION, "cities": self.cities}, ensure_ascii=False, sort_keys=True)
+        write_text(location, text, s3_client)
+
+    def _city(self, city: str) -> Dict:
+        return self.cities.setdefault(city, {"days": {}, "sums": {pair: empty_sums() for pair in PAIRS}})
+
+    def _apply(self, city_state: Dict, point: Dict[str, Optional[float]], sign: int) -> None:
+        for pair, (x_name, y_name) in PAIRS.items():
+            x, y = point.get(x_name), point.get(y_name)
+            if x is None or y is None:
+                continue
+            sums = city_state["sums"].setdefault(pair, empty_sums())
+            sums["n"] += sign
+            sums["sx"] += sign * x
+            sums["sy"] += sign * y
+            sums["sxx"] += sign * x * x
+            sums["syy"] += sign * y * y
+            sums["sxy"] += sign * x * y
+
+    def update_day(self, day: str, points: DayPoints) -> None:
+        """
+        Zamenjuje sve tačke dana: gradovi kojih više nema u points se brišu
+        za taj dan, ostali se oduzimaju pa dodaju sa novim vrednostima.
+        """
+        for city, city_state in self.cities.items():
+            old = city_state["days"].pop(day, None)
+            if old is not None:
+                self._apply(city_state, old, -1)
+
+        for city, point in points.items():
+            city_state = self._city(city)
+            city_state["days"][day] = point
+            self._apply(city_state, point, +1)
+
+    def rebuild_sums(self) -> None:
+        """
+        Ponovo sabira sume iz sačuvanih tačaka (npr. protiv nagomilane
+        greške zaokruživanja posle mnogo zamena).
+        """
+        for city_state in self.cities.values():
+            city_state["sums"] = {pair: empty_sums() for pair in PAIRS}
+            for point in city_state["days"].values():
+                self._apply(city_state, point, +1)
+
+    def correlation(self, city: str, pair: str) -> Optional[float]:
+        city_state = self.cities.get(city)
+        if city_state is None or pair not in city_state["sums"]:
+            return None
+        return correlation_from_sums(city_state["sums"][pair])
+
+    def report(self) -> List[Dict]:
+        rows = []
+        for city in sorted(self.cities):
+            city_state = self.cities[city]
+            for pair in PAIRS:
+                sums = city_state["sums"].get(pair, empty_sums())
+                rows.append({
+                    "city": city,
+                    "pair": pair,
+                    "n": int(sums["n"]),
+                    "corr": correlation_from_sums(sums),
+                    "days": len(city_state["days"]),
+                })
+        return rows
+
+
+def weather_day(s3_client, bucket: str, weather_prefix: str, date_str: str) -> pd.DataFrame:
+    """
+    daily_weather za particiju date=date_str; iz svakog fajla se čuvaju samo
+    kolone potrebne za satne proseke.
+    """
+    partition_prefix = f"{weather_prefix.rstrip('/')}/date={date_str}/"
+    frames = []
+    for key in list_partition_keys(s3_client, bucket, partition_prefix):
+        df = read_data_file(s3_client, bucket, key)
+        keep = ["location_name", "time_nano"]
+        keep += [c for c in (_first_column(df, WIND_COLUMNS), _first_column(df, RAIN_COLUMNS)) if c]
+        frames.append(df[keep])
+    if not frames:
+        return daily_weather(pd.DataFrame())
+    return daily_weather(pd.concat(frames, ignore_index=True))
+
+
+def update_correlations(
+    s3_client,
+    bucket: str,
+    pollution_prefix: str,
+    weather_prefix: str,
+    state_location: str,
+    dates: Iterable[str],
+) -> CorrelationState:
+    """
+    Učitava stanje, ponovo računa tačke zadatih dana iz enriched particija i
+    upisuje stanje nazad.
+    """
+    state = CorrelationState.load(state_location, s3_client)
+    for date_str in sorted(set(dates)):
+        rollup = rollup_day(s3_client, bucket, pollution_prefix, date_str)
+        rollup = rollup[rollup["day"] == date_str]
+        points = day_points(rollup, weather_day(s3_client, bucket, weather_prefix, date_str))
+        state.update_day(date_str, points)
+        print(f"[CORR] {date_str} (cities={len(points)})")
+    state.save(state_location, s3_client)
+    return state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Update and print per-city exposure vs wind/rain correlations from enriched partitions."
+    )
+    parser.add_argument("--bucket", default=None, help="S3 bucket name (needed with --date/--all-dates)")
+    parser.add_argument(
+        "--pollution-prefix",
+        default="pollution_partitioned_enriched/",
+        help="Prefix of enriched pollution data (default: pollution_partitioned_enriched/)",
+    )
+    parser.add_argument(
+        "--weather-prefix",
+        default="weather_partitioned_enriched/",
+        help="Prefix of enriched weather data (default: weather_partitioned_enriched/)",
+    )
+    parser.add_argument("--state", required=True, help="Local path or s3://bucket/key of the state JSON")
+    parser.add_argument(
+        "--date",
+        action="append",
+        dest="dates",
+        default=[],
+        help="Day (YYYY-MM-DD) to (re)compute; repeatable.",
+    )
+    parser.add_argument("--all-dates", action="store_true", help="Recompute every day found under the pollution prefix")
+    parser.add_argument("--rebuild-sums", action="store_true", help="Recompute running sums from the stored points")
+    parser.add_argument("--city", default=None, help="Only print this city")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    s3_client = None
+    if args.dates or args.all_dates or args.state.startswith("s3://"):
+        import boto3
+
+        s3_client = boto3.client("s3")
+
+    if args.dates or args.all_dates:
+        if not args.bucket:
+            parser.error("--bucket is required with --date/--all-dates")
+        dates = set(args.dates)
+        if args.all_dates:
+            keys = list_partition_keys(s3_client, args.bucket, args.pollution_prefix)
+            dates |= {m.group(1) for m in map(DATE_RE.search, keys) if m}
+        state = update_correlations(
+            s3_client, args.bucket, args.pollution_prefix, args.weather_prefix, args.state, dates
+        )
+    else:
+        state = CorrelationState.load(args.state, s3_client)
+
+    if args.rebuild_sums:
+        state.rebuild_sums()
+        state.save(args.state, s3_client)
+
+    rows = [r for r in state.report() if args.city is None or r["city"] == args.city]
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{'city':40} {'pair':15} {'n':>5} {'corr':>10}")
+    for r in rows:
+        corr = "-" if r["corr"] is None else f"{r['corr']:.6f}"
+        print(f"{r['city']:40} {r['pair']:15} {r['n']:>5} {corr:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Dnevni rollup izloženosti po gradu (pollution_daily_city).
+
+Za svaki (dan, grad) čuva SUM(pm * tourist_estimate) za pm10/pm25/pm100 i broj
+redova, particionisano po date=YYYY-MM-DD. Athena query-ji (per city, per
+country, top days) onda čitaju par KB umesto celog enriched seta.
+
+Rollup za jedan dan se uvek računa iz CELE enriched particije tog dana i
+prepisuje se, pa je ponovno pokretanje bezbedno; enrich_tourist_partitioned.py
+ga poziva samo za dane čiji su fajlovi upravo obogaćeni.
+
+Duplikati se izbacuju po (name, time_nano) u celom danu, preko svih fajlova.
+Stari query-ji su radili SELECT DISTINCT nad (dan, grad, pm vrednosti,
+tourist_estimate), što je spajalo i različite sate sa istim očitavanjima, pa su
+sume ovde za takve dane nešto veće nego u starim OUTPUT EXAMPLE blokovima.
+"""
+import argparse
+import io
+import re
+from typing import Iterable, List, Set, Tuple
+
+import pandas as pd
+
+from time_columns import date_from_nano
+
+DATE_RE = re.compile(r"date=(\d{4}-\d{2}-\d{2})/")
+PM_COLUMNS = {
+    "measurement_pm10Atmo": "pollution_total_visitor_pm10",
+    "measurement_pm25Atmo": "pollution_total_visitor_pm25",
+    "measurement_pm100Atmo": "pollution_total_visitor_pm100",
+}
+ROLLUP_COLUMNS = ["day", "city", *PM_COLUMNS.values(), "row_count"]
+# jedno očitavanje senzora; firehose isti red upisuje u više fajlova
+DEDUP_KEYS = ["name", "time_nano"]
+
+
+def drop_seen_readings(df: pd.DataFrame, seen: Set[Tuple]) -> pd.DataFrame:
+    """
+    Izbacuje redove čiji je (name, time_nano) već viđen u df ili u ranijim
+    fajlovima (seen), i dopunjava seen novim ključevima.
+    """
+    if df.empty or not set(DEDUP_KEYS) <= set(df.columns):
+        return df
+    df = df.drop_duplicates(DEDUP_KEYS)
+    keys = list(zip(df["name"], df["time_nano"]))
+    df = df[[key not in seen for key in keys]]
+    seen.update(keys)
+    return df
+
+
+def build_daily_city_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Iz enriched pollution redova pravi (day, city) sume, isto kao
+    SUM(COALESCE(pm, 0) * tourist_estimate) u Athena query-jima.
+    day je lokalni datum iz time_nano.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    out = pd.DataFrame({
+        "day": date_from_nano(df["time_nano"]),
+        "city": df["location_name"],
+    })
+    for pm_col, total_col in PM_COLUMNS.items():
+        values = df[pm_col] if pm_col in df.columns else pd.Series(0.0, index=df.index)
+        out[total_col] = pd.to_numeric(values, errors="coerce").fillna(0) * df["tourist_estimate"]
+    out["row_count"] = 1
+
+    return out.groupby(["day", "city"], as_index=False, sort=True).sum()
+
+
+def combine_rollups(partials: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Sabira parcijalne rollup-ove (npr. po fajlu) u jedan.
+    """
+    partials = [p for p in partials if not p.empty]
+    if not partials:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+    return pd.concat(partials).groupby(["day", "city"], as_index=False, sort=True).sum()
+
+
+def list_partition_keys(s3_client, bucket: str, prefix: str) -> List[str]:
+    paginator = s3_client.get_paginator("list_objects_v2")
+    keys: List[str] = []
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            relative = key[len(prefix):]
+            if key.endswith("/") or any(p.startswith(("_", ".")) for p in relative.split("/")):
+                continue
+            keys.append(key)
+    return keys
+
+
+def read_data_file(s3_client, bucket: str, key: str) -> pd.DataFrame:
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    if key.endswith(".parquet"):
+        return pd.read_parquet(io.BytesIO(body))
+    return pd.read_csv(io.BytesIO(body))
+
+
+def rollup_day(s3_client, bucket: str, enriched_prefix: str, date_str: str) -> pd.DataFrame:
+    """
+    Rollup jednog dana: fajl po fajl, pa se u memoriji drži samo jedan fajl,
+    male parcijalne sume i ključevi (name, time_nano) dana.
+    """
+    partition_prefix = f"{enriched_prefix.rstrip('/')}/date={date_str}/"
+    seen: Set[Tuple] = set()
+    partials = [
+        build_daily_city_rollup(drop_seen_readings(read_data_file(s3_client, bucket, key), seen))
+        for key in list_partition_keys(s3_client, bucket, partition_prefix)
+    ]
+    return combine_rollups(partials)
+
+
+def rollup_key(rollup_prefix: str, date_str: str, output_format: str = "csv") -> str:
+    return f"{rollup_prefix.rstrip('/')}/date={date_str}/part-00000.{output_format}"
+
+
+def update_rollups(
+    s3_client,
+    bucket: str,
+    enriched_prefix: str,
+    rollup_prefix: str,
+    dates: Iterable[str],
+    output_format: str = "csv",
+) -> None:
+    """
+    Ponovo računa i prepisuje rollup za svaki od zadatih dana.
+    Kolona day se ne upisuje u fajl; to je particija date=.
+    """
+    for date_str in sorted(set(dates)):
+        rollup = rollup_day(s3_client, bucket, enriched_prefix, date_str)
+        key = rollup_key(rollup_prefix, date_str, output_format)
+
+        if rollup.empty:
+            s3_client.delete_object(Bucket=bucket, Key=key)
+            print(f"[ROLLUP] {key} removed (no rows)")
+            continue
+
+        data = rollup.drop(columns=["day"])
+        if output_format == "parquet":
+            buffer = io.BytesIO()
+            data.to_parquet(buffer, index=False, compression="snappy")
+            body = buffer.getvalue()
+        else:
+            body = data.to_csv(index=False).encode("utf-8")
+
+        s3_client.put_object(Bucket=bucket, Key=key, Body=body)
+        print(f"[ROLLUP] {key} (cities={len(rollup)})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the pollution_daily_city rollup from enriched pollution data."
+    )
+    parser.add_argument("--bucket", required=True, help="S3 bucket name")
+    parser.add_argument(
+        "--enriched-prefix",
+        default="pollution_partitioned_enriched/",
+        help="Prefix of enriched pollution data (default: pollution_partitioned_enriched/)",
+    )
+    parser.add_argument(
+        "--rollup-prefix",
+        default="pollution_daily_city/",
+        help="Destination prefix of the rollup (default: pollution_daily_city/)",
+    )
+    parser.add_argument(
+        "--date",
+        action="append",
+        dest="dates",
+        help="Day (YYYY-MM-DD) to rebuild; repeatable. Default: every day found.",
+    )
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    args = parser.parse_args()
+
+    import boto3
+
+    s3_client = boto3.client("s3")
+    dates = args.dates
+    if not dates:
+        keys = list_partition_keys(s3_client, args.bucket, args.enriched_prefix)
+        dates = {m.group(1) for m in map(DATE_RE.search, keys) if m}
+
+    update_rollups(
+        s3_client, args.bucket, args.enriched_prefix, args.rollup_prefix, dates, args.format
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Mali helper-i za čitanje/pisanje stanja skripti (manifest, keš, ...) koje može
+da bude lokalni fajl ili S3 objekat (s3://bucket/key).
+"""
+import os
+from typing import Optional, Tuple
+
+import boto3
+
+
+def is_s3_uri(location: str) -> bool:
+    return location.startswith("s3://")
+
+
+def split_s3_uri(uri: str) -> Tuple[str, str]:
+    """
+    s3://bucket/path/to/key -> ("bucket", "path/to/key")
+    """
+    if not is_s3_uri(uri):
+        raise ValueError(f"Not an S3 URI: {uri}")
+    bucket, _, key = uri[len("s3://"):].partition("/")
+    if not bucket or not key:
+        raise ValueError(f"S3 URI must contain bucket and key: {uri}")
+    return bucket, key
+
+
+def read_text(location: str, s3_client=None) -> Optional[str]:
+    """
+    Vraća sadržaj lokalnog fajla ili S3 objekta, ili None ako ne postoji.
+    """
+    if is_s3_uri(location):
+        bucket, key = split_s3_uri(location)
+        s3_client = s3_client or boto3.client("s3")
+        try:
+            resp = s3_client.get_object(Bucket=bucket, Key=key)
+        except s3_client.exceptions.NoSuchKey:
+            return None
+        return resp["Body"].read().decode("utf-8")
+
+    if not os.path.exists(location):
+        return None
+    with open(location, encoding="utf-8") as f:
+        return f.read()
+
+
+def write_text(location: str, text: str, s3_client=None) -> None:
+    """
+    Upisuje ceo sadržaj u lokalni fajl (atomski, preko privremenog fajla)
+    ili u S3 objekat.
+    """
+    if is_s3_uri(location):
+        bucket, key = split_s3_uri(location)
+        s3_client = s3_client or boto3.client("s3")
+        s3_client.put_object(Bucket=bucket, Key=key, Body=text.encode("utf-8"))
+        return
+
+    directory = os.path.dirname(os.path.abspath(location))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{location}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, location)
@@ -0,0 +1,107 @@
+"""
+Zajednička normalizacija vremena: date, hour i ISO timestamp iz int64 time_nano,
+celobrojnom aritmetikom, umesto parsiranja time_date stringa red po red.
+
+time_date je u svim podacima time_nano + 2h (konstantan offset, i posle prelaska
+na letnje vreme), pa UTC_OFFSET_HOURS = 2 daje iste vrednosti kao time_date.
+
+Isti proračun postoji za pandas (add_time_columns) i Spark (add_spark_time_columns);
+Glue job dobija ovaj fajl preko --extra-py-files.
+"""
+from typing import Iterable
+
+import pandas as pd
+
+UTC_OFFSET_HOURS = 2
+TIME_COLUMNS = ("date", "hour", "time_iso")
+
+NANOS_PER_SECOND = 1_000_000_000
+SECONDS_PER_HOUR = 3600
+
+
+def local_seconds(time_nano: pd.Series, utc_offset_hours: int = UTC_OFFSET_HOURS) -> pd.Series:
+    """
+    Sekunde od epohe po lokalnom vremenu (Int64, <NA> gde time_nano nedostaje).
+    """
+    nanos = pd.to_numeric(time_nano, errors="coerce").astype("Int64")
+    return nanos // NANOS_PER_SECOND + utc_offset_hours * SECONDS_PER_HOUR
+
+
+def _format(seconds: pd.Series, unit: str) -> pd.Series:
+    valid = seconds.notna()
+    out = pd.Series(None, index=seconds.index, dtype="object")
+    if valid.any():
+        values = seconds[valid].to_numpy(dtype="int64").astype("datetime64[s]")
+        out[valid] = values.astype(f"datetime64[{unit}]").astype(str)
+    return out
+
+
+def date_from_nano(time_nano: pd.Series, utc_offset_hours: int = UTC_OFFSET_HOURS) -> pd.Series:
+    """
+    YYYY-MM-DD string po lokalnom vremenu, isto što i time_date[:10].
+    """
+    return _format(local_seconds(time_nano, utc_offset_hours), "D")
+
+
+def add_time_columns(
+    df: pd.DataFrame,
+    utc_offset_hours: int = UTC_OFFSET_HOURS,
+    columns: Iterable[str] = TIME_COLUMNS,
+) -> pd.DataFrame:
+    """
+    Dodaje date (YYYY-MM-DD), hour (0-23) i time_iso (YYYY-MM-DDTHH:MM:SS) iz
+    time_nano. Postojeće kolone istog imena se prepisuju.
+    """
+    columns = list(columns)
+    unknown = set(columns) - set(TIME_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown time columns {sorted(unknown)}, expected some of {TIME_COLUMNS}")
+
+    seconds = local_seconds(df["time_nano"], utc_offset_hours)
+    if "date" in columns:
+        df["date"] = _format(seconds, "D")
+    if "hour" in columns:
+        df["hour"] = (seconds // SECONDS_PER_HOUR) % 24
+    if "time_iso" in columns:
+        df["time_iso"] = _format(seconds, "s")
+    return df
+
+
+def add_spark_time_columns(
+    df,
+    utc_offset_hours: int = UTC_OFFSET_HOURS,
+    columns: Iterable[str] = TIME_COLUMNS,
+):
+    """
+    Spark verzija add_time_columns: date je DateType, hour int, time_iso string.
+    Sve je izraz nad CAST(time_nano AS BIGINT), bez parsiranja stringa.
+    """
+    from pyspark.sql.functions import expr
+
+    columns = list(columns)
+    unknown = set(columns) - set(TIME_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown time columns {sorted(unknown)}, expected some of {TIME_COLUMNS}")
+
+    seconds = (
+        f"(CAST(time_nano AS BIGINT) div {NANOS_PER_SECOND} "
+        f"+ {utc_offset_hours * SECONDS_PER_HOUR})"
+    )
+    if "date" in columns:
+        df = df.withColumn(
+            "date", expr(f"date_add(DATE '1970-01-01', CAST({seconds} div 86400 AS INT))")
+        )
+    if "hour" in columns:
+        df = df.withColumn("hour", expr(f"CAST(pmod({seconds} div {SECONDS_PER_HOUR}, 24) AS INT)"))
+    if "time_iso" in columns:
+        # from_unixtime bi koristio timezone sesije; ovde je offset već uračunat
+        df = df.withColumn(
+            "time_iso",
+            expr(
+                f"concat(date_add(DATE '1970-01-01', CAST({seconds} div 86400 AS INT)), 'T', "
+                f"lpad(CAST(pmod({seconds}, 86400) div 3600 AS STRING), 2, '0'), ':', "
+                f"lpad(CAST(pmod({seconds}, 3600) div 60 AS STRING), 2, '0'), ':', "
+                f"lpad(CAST(pmod({seconds}, 60) AS STRING), 2, '0'))"
+            ),
+        )
+    return df
@@ -0,0 +1,202 @@
+"""
+Weather transform bez Spark-a (zamena za weather_job.ipynb).
+
+Za svaki red weather CSV-a pravi:
+    name;datetime_iso;temperature_c;wind_speed_kmh
+gde je datetime_iso lokalno vreme iz time_nano (time_columns) a
+wind_speed_kmh = weather_windSpeed * 3.6.
+
+Ulazi mogu biti lokalni fajlovi, direktorijumi, glob-ovi ili s3://bucket/prefix
+(svi objekti ispod prefiksa), npr. ceo dan ili mesec firehose fajlova. Fajlovi
+se čitaju u chunk-ovima (--chunk-rows) i odmah dopisuju u izlaz, pa memorija ne
+raste sa brojem fajlova. boto3 se importuje samo za s3:// ulaze/izlaz.
+
+    python scripts/weather_transform.py s3://bucket/weather/1248 - .../04-2022 \\
+        --output output/weather_1248_2022-04.csv
+"""
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from time_columns import add_time_columns
+
+OUTPUT_COLUMNS = ["name", "datetime_iso", "temperature_c", "wind_speed_kmh"]
+INPUT_COLUMNS = ["name", "time_nano", "time_date", "weather_temperature", "weather_windSpeed"]
+KMH_PER_MS = 3.6
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_SEP = ";"
+NULL_VALUES = ["None", ""]
+
+
+def _split_s3(uri: str) -> Tuple[str, str]:
+    bucket, _, key = uri[len("s3://"):].partition("/")
+    return bucket, key
+
+
+def _s3_client():
+    import boto3
+
+    return boto3.client("s3")
+
+
+def _is_hidden(path: str) -> bool:
+    return any(part.startswith(("_", ".")) for part in path.replace("\\", "/").split("/") if part)
+
+
+def iter_inputs(
+    inputs: List[str], s3_client=None, exclude: Iterable[str] = ()
+) -> Iterator[Tuple[str, IO]]:
+    """
+    (oznaka, otvoren binarni stream) za svaki ulazni fajl, redom. Lokalni fajlovi
+    iz exclude (npr. sam izlaz, ako je u ulaznom direktorijumu) se preskaču.
+    """
+    exclude = {os.path.abspath(p) for p in exclude}
+    for item in inputs:
+        if item.startswith("s3://"):
+            s3_client = s3_client or _s3_client()
+            bucket, prefix = _split_s3(item)
+            paginator = s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    key = obj["Key"]
+                    if key.endswith("/") or _is_hidden(key[len(prefix):]):
+                        continue
+                    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+                    yield f"s3://{bucket}/{key}", body
+            continue
+
+        if os.path.isdir(item):
+            paths = sorted(
+                p for p in glob.glob(os.path.join(item, "**", "*"), recursive=True)
+                if os.path.isfile(p) and not _is_hidden(os.path.relpath(p, item))
+            )
+        else:
+            paths = sorted(glob.glob(item)) or [item]
+
+        for path in paths:
+            if os.path.abspath(path) in exclude:
+                continue
+            with open(path, "rb") as f:
+                yield path, f
+
+
+def transform_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Weather redovi -> OUTPUT_COLUMNS, vektorski.
+    """
+    if "time_nano" in df.columns:
+        datetime_iso = add_time_columns(df[["time_nano"]].copy(), columns=["time_iso"])["time_iso"]
+    else:
+        # stari fajlovi bez time_nano: "YYYY-MM-DD HH:MM:SS[.f]" -> ISO
+        datetime_iso = df["time_date"].astype(str).str.slice(0, 19).str.replace(" ", "T", n=1)
+
+    return pd.DataFrame({
+        "name": df["name"],
+        "datetime_iso": datetime_iso,
+        "temperature_c": pd.to_numeric(df["weather_temperature"], errors="coerce"),
+        "wind_speed_kmh": pd.to_numeric(df["weather_windSpeed"], errors="coerce") * KMH_PER_MS,
+    })
+
+
+def transform_stream(
+    inputs: List[str],
+    out: IO[str],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sep: str = DEFAULT_SEP,
+    s3_client=None,
+    exclude: Iterable[str] = (),
+) -> dict:
+    """
+    Transformiše sve ulaze i piše jedan CSV (sa jednim header-om) u out.
+    """
+    stats = {"files": 0, "rows": 0}
+    header = True
+    for label, stream in iter_inputs(inputs, s3_client, exclude):
+        try:
+            reader = pd.read_csv(
+                stream,
+                usecols=lambda c: c in INPUT_COLUMNS,
+                chunksize=chunk_rows,
+                na_values=NULL_VALUES,
+                keep_default_na=False,
+            )
+        except pd.errors.EmptyDataError:
+            print(f"[SKIP] {label} (empty)", file=sys.stderr)
+            continue
+        file_rows = 0
+        for chunk in reader:
+            transform_frame(chunk).to_csv(out, sep=sep, index=False, header=header)
+            header = False
+            file_rows += len(chunk)
+
+        stats["files"] += 1
+        stats["rows"] += file_rows
+        print(f"[READ] {label} (rows={file_rows})", file=sys.stderr)
+
+    if header:
+        # nijedan red: i dalje upiši header
+        pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(out, sep=sep, index=False)
+    return stats
+
+
+def run(
+    inputs: List[str],
+    output: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sep: str = DEFAULT_SEP,
+    s3_client=None,
+) -> dict:
+    """
+    Lokalni izlaz se piše preko privremenog fajla i zamenjuje na kraju; S3 izlaz
+    se piše u privremeni fajl i šalje sa upload_file (multipart za velike fajlove).
+    """
+    if output.startswith("s3://"):
+        with tempfile.NamedTemporaryFile("w+", encoding="utf-8", newline="", suffix=".csv") as tmp:
+            stats = transform_stream(inputs, tmp, chunk_rows, sep, s3_client)
+            tmp.flush()
+            s3_client = s3_client or _s3_client()
+            bucket, key = _split_s3(output)
+            s3_client.upload_file(tmp.name, bucket, key)
+        return stats
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        stats = transform_stream(inputs, f, chunk_rows, sep, s3_client, exclude=[output, tmp_path])
+    shutil.move(tmp_path, output)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Compute datetime_iso and wind_speed_kmh for weather CSVs (local or s3://) without Spark."
+    )
+    parser.add_argument("inputs", nargs="+", help="Files, directories, globs or s3://bucket/prefix")
+    parser.add_argument("--output", "-o", required=True, help="Output CSV path or s3://bucket/key")
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f"Rows per chunk; bounds memory (default: {DEFAULT_CHUNK_ROWS})",
+    )
+    parser.add_argument("--sep", default=DEFAULT_SEP, help=f"Output separator (default: {DEFAULT_SEP!r})")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    stats = run(args.inputs, args.output, args.chunk_rows, args.sep)
+    print(
+        f"Wrote {stats['rows']} rows from {stats['files']} file(s) to {args.output} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""
+In-process zamena za S3, DynamoDB i SQS evente, za testove i benchmark-e bez mreže.
+
+Za razliku od MagicMock-a, fake stvarno čuva objekte/item-e, pa se vidi šta je
+handler upisao, i broji pozive po operaciji (calls["copy_object"]). Svaki poziv
+može da kasni (latency, latency_by_op), a sledećih N poziva neke operacije može
+da bude throttle-ovano (throttle(op, n)):
+  - S3 operacije i DynamoDB put_item bacaju ClientError (SlowDown /
+    ProvisionedThroughputExceededException)
+  - batch_write_item vraća drugu polovinu zahteva kao UnprocessedItems
+
+    fake = FakeAWS(latency=0.05)
+    fake.s3.put_object(Bucket="b", Key="pollution/a.csv", Body=b"...")
+    with patch.object(lambda_mod.boto3, "client", side_effect=fake.client):
+        lambda_mod.lambda_handler(event, None)
+    fake.calls  # Counter({"copy_object": 1, "list_objects_v2": 1, ...})
+
+ClientError je botocore-ov ako je dostupan (ili stub koji je test ubacio u
+sys.modules), inače lokalna klasa istog oblika.
+"""
+import io
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+S3_PAGE_SIZE = 1000
+BATCH_WRITE_LIMIT = 25
+
+
+class _LocalClientError(Exception):
+    def __init__(self, error_response: Dict, operation_name: str) -> None:
+        self.response = error_response
+        self.operation_name = operation_name
+        super().__init__(
+            f"An error occurred ({error_response['Error']['Code']}) when calling the "
+            f"{operation_name} operation: {error_response['Error'].get('Message', '')}"
+        )
+
+
+def client_error(code: str, operation_name: str, message: str = ""):
+    try:
+        from botocore.exceptions import ClientError
+    except ImportError:
+        ClientError = _LocalClientError
+
+    response = {"Error": {"Code": code, "Message": message}}
+    try:
+        return ClientError(response, operation_name)
+    except TypeError:
+        # stub ClientError(Exception) iz testova ne prima iste argumente
+        return ClientError(f"{code}: {message}")
+
+
+class _FakeService:
+    """
+    Zajedničko za sve fake servise: brojanje poziva, kašnjenje i throttling.
+    calls i lock mogu da se dele između servisa (FakeAWS).
+    """
+
+    THROTTLE_CODE = "Throttling"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_by_op: Optional[Dict[str, float]] = None,
+        calls: Optional[Counter] = None,
+        lock: Optional[threading.Lock] = None,
+    ) -> None:
+        self.latency = latency
+        self.latency_by_op = dict(latency_by_op or {})
+        self.calls = calls if calls is not None else Counter()
+        self._lock = lock or threading.Lock()
+        self._throttled: Counter = Counter()
+
+    def throttle(self, operation: str, times: int = 1) -> None:
+        """
+        Sledećih `times` poziva operacije biće throttle-ovano.
+        """
+        with self._lock:
+            self._throttled[operation] += times
+
+    def _call(self, operation: str) -> bool:
+        """
+        Broji poziv, čeka latency i vraća True ako ovaj poziv treba throttle-ovati.
+        """
+        with self._lock:
+            self.calls[operation] += 1
+            throttled = self._throttled[operation] > 0
+            if throttled:
+                self._throttled[operation] -= 1
+        delay = self.latency_by_op.get(operation, self.latency)
+        if delay:
+            time.sleep(delay)
+        return throttled
+
+    def _enter(self, operation: str) -> None:
+        if self._call(operation):
+            raise client_error(self.THROTTLE_CODE, operation, "Throttled by fake backend")
+
+
+class _Paginator:
+
+    def __init__(self, s3: "FakeS3", operation: str) -> None:
+        if operation != "list_objects_v2":
+            raise NotImplementedError(f"FakeS3 has no paginator for {operation}")
+        self._s3 = s3
+
+    def paginate(self, **kwargs) -> Iterable[Dict]:
+        token = kwargs.pop("ContinuationToken", None)
+        while True:
+            page = self._s3.list_objects_v2(ContinuationToken=token, **kwargs) if token \
+                else self._s3.list_objects_v2(**kwargs)
+            yield page
+            token = page.get("NextContinuationToken")
+            if not token:
+                return
+
+
+class FakeS3(_FakeService):
+    """
+    S3 sa objektima u memoriji: list/get/put/head/copy/delete, multipart upload
+    i upload_part_copy, upload_file/download_file.
+    """
+
+    THROTTLE_CODE = "SlowDown"
+
+    def __init__(self, page_size: int = S3_PAGE_SIZE, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.page_size = page_size
+        # bucket -> key -> {"Body", "ContentType", "Metadata", "LastModified"}
+        self.objects: Dict[str, Dict[str, Dict]] = {}
+        self._uploads: Dict[str, Dict] = {}
+
+    # --- pomoćne metode za testove, ne broje se kao pozivi ---
+
+    def add_object(self, bucket: str, key: str, body=b"", **extra) -> None:
+        self._store(bucket, key, _to_bytes(body), extra.get("ContentType"), extra.get("Metadata"))
+
+    def read(self, bucket: str, key: str) -> bytes:
+        return self.objects[bucket][key]["Body"]
+
+    def keys(self, bucket: str, prefix: str = "") -> List[str]:
+        return sorted(k for k in self.objects.get(bucket, {}) if k.startswith(prefix))
+
+    def _store(self, bucket, key, body: bytes, content_type=None, metadata=None) -> Dict:
+        obj = {
+            "Body": body,
+            "ContentType": content_type or "binary/octet-stream",
+            "Metadata": dict(metadata or {}),
+            "LastModified": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            self.objects.setdefault(bucket, {})[key] = obj
+        return obj
+
+    def _get(self, bucket: str, key: str, operation: str) -> Dict:
+        try:
+            return self.objects[bucket][key]
+        except KeyError:
+            raise client_error("NoSuchKey", operation, f"{bucket}/{key}") from None
+
+    # --- S3 API ---
+
+    def get_paginator(self, operation: str) -> _Paginator:
+        return _Paginator(self, operation)
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", ContinuationToken: Optional[str] = None,
+                        MaxKeys: Optional[int] = None, **_) -> Dict:
+        self._enter("list_objects_v2")
+        keys = self.keys(Bucket, Prefix)
+        start = int(ContinuationToken) if ContinuationToken else 0
+        end = start + min(MaxKeys or self.page_size, self.page_size)
+        page = {"KeyCount": len(keys[start:end]), "IsTruncated": end < len(keys)}
+        if keys[start:end]:
+            page["Contents"] = [
+                {
+                    "Key": k,
+                    "Size": len(self.objects[Bucket][k]["Body"]),
+                    "LastModified": self.objects[Bucket][k]["LastModified"],
+                }
+                for k in keys[start:end]
+            ]
+        if end < len(keys):
+            page["NextContinuationToken"] = str(end)
+        return page
+
+    def get_object(self, Bucket: str, Key: str, **_) -> Dict:
+        self._enter("get_object")
+        obj = self._get(Bucket, Key, "get_object")
+        return {
+            "Body": io.BytesIO(obj["Body"]),
+            "ContentLength": len(obj["Body"]),
+            "ContentType": obj["ContentType"],
+            "Metadata": dict(obj["Metadata"]),
+        }
+
+    def head_object(self, Bucket: str, Key: str, **_) -> Dict:
+        self._enter("head_object")
+        obj = self._get(Bucket, Key, "head_object")
+        return {
+            "ContentLength": len(obj["Body"]),
+            "ContentType": obj["ContentType"],
+            "Metadata": dict(obj["Metadata"]),
+            "LastModified": obj["LastModified"],
+        }
+
+    def put_object(self, Bucket: str, Key: str, Body=b"", ContentType: Optional[str] = None,
+                   Metadata: Optional[Dict] = None, **_) -> Dict:
+        self._enter("put_object")
+        self._store(Bucket, Key, _to_bytes(Body), ContentType, Metadata)
+        return {"ETag": f'"{uuid.uuid4().hex}"'}
+
+    def copy_object(self, Bucket: str, Key: str, CopySource: Dict, MetadataDirective: str = "COPY",
+                    ContentType: Optional[str] = None, Metadata: Optional[Dict] = None, **_) -> Dict:
+        self._enter("copy_object")
+        src = self._get(CopySource["Bucket"], CopySource["Key"], "copy_object")
+        if MetadataDirective == "REPLACE":
+            self._store(Bucket, Key, src["Body"], ContentType, Metadata)
+        else:
+            self._store(Bucket, Key, src["Body"], src["ContentType"], src["Metadata"])
+        return {"CopyObjectResult": {"ETag": f'"{uuid.uuid4().hex}"'}}
+
+    def delete_object(self, Bucket: str, Key: str, **_) -> Dict:
+        self._enter("delete_object")
+        with self._lock:
+            self.objects.get(Bucket, {}).pop(Key, None)
+        return {}
+
+    def delete_objects(self, Bucket: str, Delete: Dict, **_) -> Dict:
+        self._enter("delete_objects")
+        deleted = []
+        with self._lock:
+            for item in Delete.get("Objects", []):
+                self.objects.get(Bucket, {}).pop(item["Key"], None)
+                deleted.append({"Key": item["Key"]})
+        return {"Deleted": deleted}
+
+    def create_multipart_upload(self, Bucket: str, Key: str, ContentType: Optional[str] = None,
+                                Metadata: Optional[Dict] = None, **_) -> Dict:
+        self._enter("create_multipart_upload")
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {
+                "Bucket": Bucket, "Key": Key, "parts": {},
+                "ContentType": ContentType, "Metadata": Metadata,
+            }
+        return {"UploadId": upload_id}
+
+    def _upload(self, upload_id: str, operation: str) -> Dict:
+        if upload_id not in self._uploads:
+            raise client_error("NoSuchUpload", operation, upload_id)
+        return self._uploads[upload_id]
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body=b"", **_) -> Dict:
+        self._enter("upload_part")
+        etag = f'"{uuid.uuid4().hex}"'
+        with self._lock:
+            self._upload(UploadId, "upload_part")["parts"][PartNumber] = (etag, _to_bytes(Body))
+        return {"ETag": etag}
+
+    def upload_part_copy(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, CopySource: Dict,
+                         CopySourceRange: Optional[str] = None, **_) -> Dict:
+        self._enter("upload_part_copy")
+        body = self._get(CopySource["Bucket"], CopySource["Key"], "upload_part_copy")["Body"]
+        if CopySourceRange:
+            start, end = CopySourceRange[len("bytes="):].split("-")
+            body = body[int(start):int(end) + 1]
+        etag = f'"{uuid.uuid4().hex}"'
+        with self._lock:
+            self._upload(UploadId, "upload_part_copy")["parts"][PartNumber] = (etag, body)
+        return {"CopyPartResult": {"ETag": etag}}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict, **_) -> Dict:
+        self._enter("complete_multipart_upload")
+        with self._lock:
+            upload = self._upload(UploadId, "complete_multipart_upload")
+            parts = []
+            for part in MultipartUpload["Parts"]:
+                etag, body = upload["parts"].get(part["PartNumber"], (None, b""))
+                if etag != part["ETag"]:
+                    raise client_error("InvalidPart", "complete_multipart_upload", str(part["PartNumber"]))
+                parts.append(body)
+            del self._uploads[UploadId]
+        self._store(Bucket, Key, b"".join(parts), upload["ContentType"], upload["Metadata"])
+        return {"ETag": f'"{uuid.uuid4().hex}-{len(parts)}"'}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **_) -> Dict:
+        self._enter("abort_multipart_upload")
+        with self._lock:
+            self._uploads.pop(UploadId, None)
+        return {}
+
+    @property
+    def open_uploads(self) -> int:
+        return len(self._uploads)
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, ExtraArgs: Optional[Dict] = None, **_) -> None:
+        self._enter("upload_file")
+        with open(Filename, "rb") as f:
+            self._store(Bucket, Key, f.read(), **_extra(ExtraArgs))
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, **_) -> None:
+        self._enter("download_file")
+        with open(Filename, "wb") as f:
+            f.write(self._get(Bucket, Key, "download_file")["Body"])
+
+
+class FakeDynamoDB(_FakeService):
+    """
+    Low-level DynamoDB client (typed atributi): put_item, get_item, batch_write_item.
+    Ključ tabele je atribut iz key_attributes[table] (default "file_name").
+    batch_write_item proverava limit od 25 zahteva i duple ključeve, kao pravi servis.
+    """
+
+    THROTTLE_CODE = "ProvisionedThroughputExceededException"
+
+    def __init__(self, key_attributes: Optional[Dict[str, str]] = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.key_attributes = dict(key_attributes or {})
+        # table -> key -> item (typed)
+        self.tables: Dict[str, Dict[str, Dict]] = {}
+
+    def _key(self, table: str, item: Dict) -> str:
+        attribute = self.key_attributes.get(table, "file_name")
+        if attribute not in item:
+            raise client_error("ValidationException", "PutItem", f"Missing key attribute {attribute}")
+        return json.dumps(item[attribute], sort_keys=True)
+
+    def _put(self, table: str, item: Dict) -> None:
+        key = self._key(table, item)
+        with self._lock:
+            self.tables.setdefault(table, {})[key] = item
+
+    def items(self, table: str) -> List[Dict]:
+        return list(self.tables.get(table, {}).values())
+
+    def put_item(self, TableName: str, Item: Dict, **_) -> Dict:
+        self._enter("put_item")
+        self._put(TableName, Item)
+        return {}
+
+    def get_item(self, TableName: str, Key: Dict, **_) -> Dict:
+        self._enter("get_item")
+        item = self.tables.get(TableName, {}).get(self._key(TableName, Key))
+        return {"Item": item} if item is not None else {}
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict]], **_) -> Dict:
+        throttled = self._call("batch_write_item")
+        total = sum(len(requests) for requests in RequestItems.values())
+        if total > BATCH_WRITE_LIMIT:
+            raise client_error("ValidationException", "BatchWriteItem",
+                               f"Too many items requested for the BatchWriteItem call ({total})")
+
+        unprocessed: Dict[str, List[Dict]] = {}
+        for table, requests in RequestItems.items():
+            keys = [self._key(table, r["PutRequest"]["Item"]) for r in requests if "PutRequest" in r]
+            if len(keys) != len(set(keys)):
+                raise client_error("ValidationException", "BatchWriteItem",
+                                   "Provided list of item keys contains duplicates")
+            # throttle: prva polovina se upiše, ostatak se vraća kao neobrađen
+            accepted = requests[:len(requests) // 2] if throttled else requests
+            for request in accepted:
+                if "PutRequest" in request:
+                    self._put(table, request["PutRequest"]["Item"])
+                elif "DeleteRequest" in request:
+                    with self._lock:
+                        self.tables.get(table, {}).pop(self._key(table, request["DeleteRequest"]["Key"]), None)
+            if len(accepted) < len(requests):
+                unprocessed[table] = requests[len(accepted):]
+        return {"UnprocessedItems": unprocessed}
+
+
+class FakeAWS:
+    """
+    S3 i DynamoDB fake sa zajedničkim brojačem poziva; client() može da zameni
+    boto3.client (patch.object(mod.boto3, "client", side_effect=fake.client)).
+    """
+
+    def __init__(self, latency: float = 0.0, latency_by_op: Optional[Dict[str, float]] = None,
+                 s3_page_size: int = S3_PAGE_SIZE, dynamodb_keys: Optional[Dict[str, str]] = None) -> None:
+        self.calls: Counter = Counter()
+        lock = threading.Lock()
+        common = {"latency": latency, "latency_by_op": latency_by_op, "calls": self.calls, "lock": lock}
+        self.s3 = FakeS3(page_size=s3_page_size, **common)
+        self.dynamodb = FakeDynamoDB(key_attributes=dynamodb_keys, **common)
+
+    def client(self, service_name: str, *args, **kwargs):
+        if service_name == "s3":
+            return self.s3
+        if service_name == "dynamodb":
+            return self.dynamodb
+        raise NotImplementedError(f"FakeAWS has no {service_name} client")
+
+    def reset_calls(self) -> None:
+        self.calls.clear()
+
+
+def s3_event_record(bucket: str, key: str, event_time: Optional[str] = None, size: int = 0) -> Dict:
+    from urllib.parse import quote_plus
+
+    return {
+        "eventSource": "aws:s3",
+        "eventName": "ObjectCreated:Put",
+        "eventTime": event_time or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "s3": {
+            "bucket": {"name": bucket},
+            # S3 notifikacije šalju URL-encoded ključ
+            "object": {"key": quote_plus(key, safe="/"), "size": size},
+        },
+    }
+
+
+def sqs_event(bucket: str, keys: Iterable[str], records_per_message: int = 1,
+              event_time: Optional[str] = None) -> Dict:
+    """
+    SQS event (kao za Lambda trigger) čiji je body S3 notifikacija; svaka poruka
+    nosi do records_per_message S3 record-a.
+    """
+    keys = list(keys)
+    messages = []
+    for start in range(0, len(keys), records_per_message):
+        records = [s3_event_record(bucket, k, event_time) for k in keys[start:start + records_per_message]]
+        messages.append({
+            "messageId": str(uuid.uuid4()),
+            "eventSource": "aws:sqs",
+            "body": json.dumps({"Records": records}),
+        })
+    return {"Records": messages}
+
+
+def _to_bytes(body) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, bytes):
+        return body
+    if isinstance(body, (bytearray, memoryview)):
+        return bytes(body)
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return _to_bytes(body.read())
+
+
+def _extra(extra_args: Optional[Dict]) -> Dict:
+    extra_args = extra_args or {}
+    return {"content_type": extra_args.get("ContentType"), "metadata": extra_args.get("Metadata")}
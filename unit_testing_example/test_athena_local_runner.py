@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import athena_local_runner as runner_mod
+
+try:
+    import duckdb
+except ImportError:  # duckdb je opciona zavisnost lokalnog runner-a
+    duckdb = None
+
+
+ROLLUP_CSV = "city,pollution_total_visitor_pm25,row_count\nIasi,{value},1\n"
+QUERY = """
+SELECT city, SUM(pollution_total_visitor_pm25) AS total
+FROM tara_pollution_daily_city
+WHERE "date" = '2022-05-02'
+GROUP BY city
+"""
+
+
+class TestQueryParsing(unittest.TestCase):
+
+    def test_finds_tables_and_partition_dates(self):
+        sql = (
+            "WITH base AS (SELECT * FROM tara_pollution_enriched) "
+            "SELECT * FROM base WHERE day = DATE '2022-05-02'"
+        )
+
+        self.assertEqual(runner_mod.referenced_tables(sql), {"tara_pollution_enriched"})
+        self.assertEqual(runner_mod.partition_dates_in_query(sql), {"2022-05-02"})
+
+    def test_element_at_is_translated(self):
+        sql = "SELECT element_at(split(x, ','), -2) FROM t"
+
+        self.assertEqual(
+            runner_mod.translate_to_duckdb(sql), "SELECT list_extract(split(x, ','), -2) FROM t"
+        )
+
+
+@unittest.skipIf(duckdb is None, "duckdb not installed")
+class TestRunQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for day, value in (("2022-05-01", 1.5), ("2022-05-02", 2.5)):
+            part_dir = os.path.join(self.tmp.name, f"date={day}")
+            os.makedirs(part_dir)
+            with open(os.path.join(part_dir, "part-00000.csv"), "w") as f:
+                f.write(ROLLUP_CSV.format(value=value))
+        self.sources = {"tara_pollution_daily_city": self.tmp.name}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_prunes_to_predicate_partition(self):
+        result = runner_mod.run_query(duckdb.connect(), "q", QUERY, self.sources)
+
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["rows"], [["Iasi", "2.5"]])
+        self.assertEqual(result["files_scanned"], 1)
+        self.assertEqual(result["rows_scanned"], 1)
+
+    def test_no_pruning_scans_every_partition(self):
+        result = runner_mod.run_query(duckdb.connect(), "q", QUERY, self.sources, use_pruning=False)
+
+        self.assertEqual(result["rows"], [["Iasi", "2.5"]])
+        self.assertEqual(result["files_scanned"], 2)
+        self.assertEqual(result["rows_scanned"], 2)
+
+    def test_multi_table_query_is_not_pruned(self):
+        sources = {**self.sources, "tara_pollution_daily_city_copy": self.tmp.name}
+        sql = """
+        SELECT a.city, SUM(b.pollution_total_visitor_pm25) AS total
+        FROM tara_pollution_daily_city a
+        JOIN tara_pollution_daily_city_copy b ON a.city = b.city
+        WHERE a."date" = '2022-05-02'
+        GROUP BY a.city
+        """
+
+        result = runner_mod.run_query(duckdb.connect(), "q", sql, sources)
+
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["pruned_to"], [])
+        self.assertEqual(result["files_scanned"], 4)
+        # b nema predikat datuma, pa sabira oba dana
+        self.assertEqual(result["rows"], [["Iasi", "4.0"]])
+
+    def test_missing_table_is_reported_per_query(self):
+        result = runner_mod.run_query(duckdb.connect(), "q", "SELECT * FROM nowhere", {})
+
+        self.assertEqual(result["status"], "error")
+        self.assertIn("nowhere", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
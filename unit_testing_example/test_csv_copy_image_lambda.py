@@ -0,0 +1,149 @@
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+def _ensure_boto3_stub():
+    module = sys.modules.get("boto3")
+    if module is None:
+        module = SimpleNamespace()
+        sys.modules["boto3"] = module
+
+    if not hasattr(module, "client"):
+        module.client = lambda *args, **kwargs: MagicMock(name="boto3.client")  # type: ignore
+
+    if not hasattr(module, "resource"):
+        module.resource = lambda *args, **kwargs: MagicMock(name="boto3.resource")  # type: ignore
+
+
+class _ClientError(Exception):
+    pass
+
+
+class _BotoCoreError(Exception):
+    pass
+
+
+def _ensure_botocore_stub():
+    botocore = sys.modules.setdefault("botocore", SimpleNamespace())
+    if "botocore.config" not in sys.modules:
+        sys.modules["botocore.config"] = SimpleNamespace(Config=lambda **kwargs: SimpleNamespace(**kwargs))
+        botocore.config = sys.modules["botocore.config"]
+    if "botocore.exceptions" not in sys.modules:
+        sys.modules["botocore.exceptions"] = SimpleNamespace(ClientError=_ClientError)
+        botocore.exceptions = sys.modules["botocore.exceptions"]
+    if not hasattr(sys.modules["botocore.exceptions"], "BotoCoreError"):
+        sys.modules["botocore.exceptions"].BotoCoreError = _BotoCoreError
+
+
+_ensure_boto3_stub()
+_ensure_botocore_stub()
+
+APP_PATH = Path(__file__).resolve().parent.parent / "lambda_image_task" / "lambda_image" / "app.py"
+_spec = importlib.util.spec_from_file_location("csv_copy_image_app", APP_PATH)
+app_mod = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(app_mod)
+
+
+class TestCsvCopyImageLambda(unittest.TestCase):
+
+    def setUp(self):
+        self.s3 = MagicMock()
+        patcher = patch.object(app_mod, "get_s3_client", return_value=self.s3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_copy_keeps_metadata_without_head(self):
+        response = app_mod.lambda_handler(
+            {"source_bucket": "src", "source_key": "in/a.csv", "dest_bucket": "dst", "dest_key": "out/a.csv"},
+            None,
+        )
+
+        self.assertEqual(response["statusCode"], 200)
+        self.s3.head_object.assert_not_called()
+        self.s3.copy_object.assert_called_once_with(
+            Bucket="dst", Key="out/a.csv", CopySource={"Bucket": "src", "Key": "in/a.csv"}
+        )
+
+    def test_jobs_are_copied_with_per_item_results(self):
+        def copy_object(Bucket, Key, CopySource):
+            if Key == "b.csv":
+                raise app_mod.ClientError("AccessDenied")
+
+        self.s3.copy_object.side_effect = copy_object
+
+        response = app_mod.lambda_handler(
+            {"source_bucket": "src", "dest_bucket": "dst",
+             "jobs": [{"source_key": "a.csv"}, {"source_key": "b.csv"}, {"source_key": "c.csv", "dest_key": "x/c.csv"}]},
+            None,
+        )
+
+        self.assertEqual(response["statusCode"], 500)
+        self.assertEqual((response["copied"], response["failed"]), (2, 1))
+        self.assertEqual(
+            [(r["dest"], r["status"]) for r in response["results"]],
+            [("s3://dst/a.csv", "copied"), ("s3://dst/b.csv", "failed"), ("s3://dst/x/c.csv", "copied")],
+        )
+
+    def test_prefix_copies_every_object_under_it(self):
+        paginator = MagicMock()
+        paginator.paginate.return_value = [
+            {"Contents": [{"Key": "in/"}, {"Key": "in/a.csv"}]},
+            {"Contents": [{"Key": "in/sub/b.csv"}]},
+        ]
+        self.s3.get_paginator.return_value = paginator
+
+        response = app_mod.lambda_handler(
+            {"source_bucket": "src", "dest_bucket": "dst", "source_prefix": "in/", "dest_prefix": "out/"},
+            None,
+        )
+
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(response["copied"], 2)
+        copied = sorted(c.kwargs["Key"] for c in self.s3.copy_object.call_args_list)
+        self.assertEqual(copied, ["out/a.csv", "out/sub/b.csv"])
+
+    def test_prefix_onto_itself_is_rejected_before_listing(self):
+        response = app_mod.lambda_handler({"source_bucket": "src", "source_prefix": "in/"}, None)
+
+        self.assertEqual(response["statusCode"], 400)
+        self.s3.get_paginator.assert_not_called()
+        self.s3.copy_object.assert_not_called()
+
+    def test_job_copying_onto_itself_is_rejected(self):
+        response = app_mod.lambda_handler({"source_bucket": "src", "jobs": [{"source_key": "a.csv"}]}, None)
+
+        self.assertEqual(response["statusCode"], 400)
+        self.s3.copy_object.assert_not_called()
+
+    def test_botocore_error_is_reported_per_item(self):
+        def copy_object(Bucket, Key, CopySource):
+            if Key == "b.csv":
+                raise app_mod.BotoCoreError("Read timeout")
+
+        self.s3.copy_object.side_effect = copy_object
+
+        response = app_mod.lambda_handler(
+            {"source_bucket": "src", "dest_bucket": "dst", "jobs": [{"source_key": "a.csv"}, {"source_key": "b.csv"}]},
+            None,
+        )
+
+        self.assertEqual(response["statusCode"], 500)
+        self.assertEqual((response["copied"], response["failed"]), (1, 1))
+        self.assertEqual(response["results"][1]["status"], "failed")
+        self.assertIn("Read timeout", response["results"][1]["error"])
+
+    def test_missing_source_returns_400(self):
+        with patch.object(app_mod, "DEFAULT_SOURCE_BUCKET", ""), \
+                patch.object(app_mod, "DEFAULT_SOURCE_KEY", ""):
+            response = app_mod.lambda_handler({}, None)
+
+        self.assertEqual(response["statusCode"], 400)
+        self.s3.copy_object.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,381 @@
+import importlib.util
+import io
+import sys
+import unittest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+def _ensure_boto3_stub():
+    module = sys.modules.get("boto3")
+    if module is None:
+        module = SimpleNamespace()
+        sys.modules["boto3"] = module
+
+    if not hasattr(module, "client"):
+        module.client = lambda *args, **kwargs: MagicMock(name="boto3.client")  # type: ignore
+
+    if not hasattr(module, "resource"):
+        module.resource = lambda *args, **kwargs: MagicMock(name="boto3.resource")  # type: ignore
+
+
+_ensure_boto3_stub()
+
+import enrich_tourist_partitioned as enrich_mod
+
+
+CSV_BODY = (
+    "name,time_nano,time_date,location_name,measurement_pm25Atmo\n"
+    '"1248 - Tătărași Sud, Iași, Romania",1652158800000000000,2022-05-10 07:00:00.0,'
+    '"Tătărași Sud, Iași, Romania",6.69\n'
+)
+EST_TABLE = {("2022-05-10", "iasi"): 233}
+
+
+def _fake_s3(failing_keys=()):
+    s3 = MagicMock()
+
+    def get_object(Bucket, Key):
+        if Key in failing_keys:
+            raise IOError(f"boom {Key}")
+        key_date = enrich_mod.extract_date_from_key(Key)
+        shift_days = (date.fromisoformat(key_date) - date(2022, 5, 10)).days
+        body = (
+            CSV_BODY.replace("2022-05-10", key_date)
+            .replace("1652158800000000000", str(1652158800000000000 + shift_days * 86400 * 10**9))
+        )
+        return {"Body": io.BytesIO(body.encode("utf-8"))}
+
+    s3.get_object.side_effect = get_object
+    return s3
+
+
+class TestEnrichFiles(unittest.TestCase):
+
+    def test_concurrent_run_writes_every_file(self):
+        s3 = _fake_s3()
+        jobs = [
+            (f"weather_partitioned/date=2022-05-10/part-{i}.csv", "weather_enriched/", "2022-05-10")
+            for i in range(8)
+        ]
+
+        failures = enrich_mod.enrich_files(s3, "bucket", jobs, EST_TABLE, workers=4)
+
+        self.assertEqual(failures, [])
+        self.assertEqual(s3.put_object.call_count, 8)
+        written = sorted(c.kwargs["Key"] for c in s3.put_object.call_args_list)
+        self.assertEqual(
+            written,
+            sorted(f"weather_enriched/date=2022-05-10/part-{i}.csv" for i in range(8)),
+        )
+        body = s3.put_object.call_args.kwargs["Body"].decode("utf-8")
+        self.assertIn("tourist_estimate", body.splitlines()[0])
+        self.assertTrue(body.splitlines()[1].endswith(",233"))
+
+    def test_metrics_split_each_file_into_stages(self):
+        from pipeline_metrics import StageMetrics
+
+        s3 = _fake_s3()
+        jobs = [(f"weather_partitioned/date=2022-05-10/part-{i}.csv", "out/", "2022-05-10") for i in range(3)]
+        metrics = StageMetrics()
+
+        enrich_mod.enrich_files(s3, "bucket", jobs, EST_TABLE, workers=2, metrics=metrics)
+
+        stats = metrics.summary()
+        self.assertEqual(
+            sorted(stats), ["file", "parse", "read", "serialize", "transform", "write"]
+        )
+        self.assertEqual(stats["file"]["count"], 3)
+        self.assertEqual(stats["read"]["bytes_read"], 3 * len(CSV_BODY.encode("utf-8")))
+        self.assertEqual(stats["transform"]["rows"], 3)
+        self.assertGreater(stats["write"]["bytes_written"], 0)
+
+    def test_failures_are_reported_in_job_order(self):
+        jobs = [
+            ("pollution_partitioned/date=2022-05-10/a.csv", "out/", "2022-05-10"),
+            ("pollution_partitioned/date=2022-05-10/b.csv", "out/", "2022-05-10"),
+            ("pollution_partitioned/date=2022-05-11/c.csv", "out/", "2022-05-11"),
+            ("pollution_partitioned/date=2022-05-10/d.csv", "out/", "2022-05-10"),
+        ]
+        s3 = _fake_s3(failing_keys={jobs[3][0], jobs[1][0]})
+
+        failures = enrich_mod.enrich_files(s3, "bucket", jobs, EST_TABLE, workers=3)
+
+        self.assertEqual([key for key, _ in failures], [jobs[1][0], jobs[2][0], jobs[3][0]])
+        self.assertIn("Missing estimate", failures[1][1])
+        self.assertEqual(s3.put_object.call_count, 1)
+
+        with self.assertRaises(RuntimeError):
+            enrich_mod.report_failures(failures)
+
+
+class TestStreamingEnrichment(unittest.TestCase):
+
+    def _streaming_s3(self, body):
+        s3 = MagicMock()
+        s3.get_object.return_value = {"Body": io.BytesIO(body.encode("utf-8"))}
+        s3.create_multipart_upload.return_value = {"UploadId": "up-1"}
+        s3.upload_part.side_effect = lambda **kw: {"ETag": f"etag-{kw['PartNumber']}"}
+        return s3
+
+    def test_large_file_is_uploaded_in_parts(self):
+        row = CSV_BODY.splitlines()[1]
+        body = CSV_BODY.splitlines()[0] + "\n" + "\n".join([row] * 500) + "\n"
+        s3 = self._streaming_s3(body)
+
+        enrich_mod.enrich_single_file_streaming(
+            s3, "bucket", "pollution_partitioned/date=2022-05-10/a.csv", "out/",
+            "2022-05-10", EST_TABLE, chunk_rows=64, part_size=4096,
+        )
+
+        s3.put_object.assert_not_called()
+        parts = s3.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+        self.assertGreater(len(parts), 1)
+        self.assertEqual([p["PartNumber"] for p in parts], list(range(1, len(parts) + 1)))
+
+        uploaded = b"".join(c.kwargs["Body"] for c in s3.upload_part.call_args_list)
+        lines = uploaded.decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 501)
+        self.assertEqual(sum(1 for line in lines if line.startswith("name,")), 1)
+        self.assertTrue(all(line.endswith(",233") for line in lines[1:]))
+
+    def test_small_file_uses_single_put(self):
+        s3 = self._streaming_s3(CSV_BODY)
+
+        enrich_mod.enrich_single_file_streaming(
+            s3, "bucket", "pollution_partitioned/date=2022-05-10/a.csv", "out/",
+            "2022-05-10", EST_TABLE,
+        )
+
+        s3.create_multipart_upload.assert_not_called()
+        self.assertEqual(s3.put_object.call_args.kwargs["Key"], "out/date=2022-05-10/a.csv")
+
+    def test_failed_stream_aborts_multipart_upload(self):
+        row = CSV_BODY.splitlines()[1]
+        s3 = self._streaming_s3(CSV_BODY + "\n".join([row] * 200) + "\n")
+        s3.upload_part.side_effect = [{"ETag": "etag-1"}, IOError("network")]
+
+        with self.assertRaises(IOError):
+            enrich_mod.enrich_single_file_streaming(
+                s3, "bucket", "pollution_partitioned/date=2022-05-10/a.csv", "out/",
+                "2022-05-10", EST_TABLE, chunk_rows=10, part_size=1024,
+            )
+
+        s3.abort_multipart_upload.assert_called_once_with(
+            Bucket="bucket", Key="out/date=2022-05-10/a.csv", UploadId="up-1"
+        )
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+class TestParquetOutput(unittest.TestCase):
+
+    def test_parquet_output_is_typed_and_renamed(self):
+        import pandas as pd
+
+        s3 = _fake_s3()
+        enrich_mod.enrich_single_file(
+            s3, "bucket", "pollution_partitioned/date=2022-05-10/part-0.csv", "out/",
+            "2022-05-10", EST_TABLE, output_format="parquet",
+        )
+
+        kwargs = s3.put_object.call_args.kwargs
+        self.assertEqual(kwargs["Key"], "out/date=2022-05-10/part-0.parquet")
+        df = pd.read_parquet(io.BytesIO(kwargs["Body"]))
+        self.assertEqual(str(df["time_nano"].dtype), "int64")
+        self.assertEqual(str(df["measurement_pm25Atmo"].dtype), "float64")
+        self.assertEqual(df["tourist_estimate"].tolist(), [233])
+
+    def test_streaming_parquet_writes_one_file(self):
+        import pandas as pd
+
+        row = CSV_BODY.splitlines()[1]
+        body = CSV_BODY.splitlines()[0] + "\n" + "\n".join([row] * 100) + "\n"
+        s3 = MagicMock()
+        s3.get_object.return_value = {"Body": io.BytesIO(body.encode("utf-8"))}
+
+        enrich_mod.enrich_single_file_streaming(
+            s3, "bucket", "pollution_partitioned/date=2022-05-10/a", "out/",
+            "2022-05-10", EST_TABLE, output_format="parquet", chunk_rows=30,
+        )
+
+        kwargs = s3.put_object.call_args.kwargs
+        self.assertEqual(kwargs["Key"], "out/date=2022-05-10/a.parquet")
+        df = pd.read_parquet(io.BytesIO(kwargs["Body"]))
+        self.assertEqual(len(df), 100)
+
+
+    def test_streaming_parquet_keeps_table_types_when_later_chunk_has_nan(self):
+        import pyarrow.parquet as pq
+
+        body = (
+            "name,time_nano,location_name,weather_humidity,weather_pressure\n"
+            + '"1248 - Iași, Romania",1652158800000000000,"Tătărași Sud, Iași, Romania",70,1012\n' * 3
+            + '"1248 - Iași, Romania",1652162400000000000,"Tătărași Sud, Iași, Romania",,None\n'
+        )
+        s3 = MagicMock()
+        s3.get_object.return_value = {"Body": io.BytesIO(body.encode("utf-8"))}
+
+        enrich_mod.enrich_single_file_streaming(
+            s3, "bucket", "weather_partitioned/date=2022-05-10/a.csv", "out/",
+            "2022-05-10", EST_TABLE, output_format="parquet", chunk_rows=3,
+        )
+
+        table = pq.read_table(io.BytesIO(s3.put_object.call_args.kwargs["Body"]))
+        self.assertEqual(str(table.schema.field("weather_humidity").type), "int64")
+        self.assertEqual(str(table.schema.field("tourist_estimate").type), "int64")
+        self.assertEqual(table.column("weather_pressure").to_pylist(), [1012, 1012, 1012, None])
+
+    def test_parquet_source_is_read_by_extension(self):
+        import pandas as pd
+
+        src = pd.read_csv(io.StringIO(CSV_BODY))
+        buffer = io.BytesIO()
+        src.to_parquet(buffer, index=False)
+        s3 = MagicMock()
+        s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+
+        enrich_mod.enrich_single_file(
+            s3, "bucket", "pollution_partitioned/date=2022-05-10/part-0.snappy.parquet", "out/",
+            "2022-05-10", EST_TABLE,
+        )
+
+        kwargs = s3.put_object.call_args.kwargs
+        self.assertEqual(kwargs["Key"], "out/date=2022-05-10/part-0.snappy.csv")
+        self.assertTrue(kwargs["Body"].decode("utf-8").splitlines()[1].endswith(",233"))
+
+    def test_streaming_reads_parquet_source_in_batches(self):
+        import pandas as pd
+
+        row = CSV_BODY.splitlines()[1]
+        src = pd.read_csv(io.StringIO(CSV_BODY.splitlines()[0] + "\n" + "\n".join([row] * 25) + "\n"))
+        buffer = io.BytesIO()
+        src.to_parquet(buffer, index=False)
+        s3 = MagicMock()
+        s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+
+        enrich_mod.enrich_single_file_streaming(
+            s3, "bucket", "pollution_partitioned/date=2022-05-10/a.parquet", "out/",
+            "2022-05-10", EST_TABLE, output_format="parquet", chunk_rows=10,
+        )
+
+        df = pd.read_parquet(io.BytesIO(s3.put_object.call_args.kwargs["Body"]))
+        self.assertEqual(len(df), 25)
+
+
+class TestMultiCityEstimates(unittest.TestCase):
+
+    def test_one_response_per_date_covers_every_city(self):
+        responses = {
+            "2022-05-10": {"info": [
+                {"name": "Iași", "estimated_no_people": 233},
+                {"name": "Cluj-Napoca", "estimated_no_people": 500},
+            ]},
+        }
+        with patch.object(enrich_mod, "fetch_estimates_many", return_value=responses) as mock_fetch:
+            table = enrich_mod.build_estimate_table(["2022-05-10", "2022-05-10"])
+
+        mock_fetch.assert_called_once()
+        self.assertEqual(table, {("2022-05-10", "iasi"): 233, ("2022-05-10", "cluj-napoca"): 500})
+
+    def test_rows_are_joined_on_their_own_city_and_date(self):
+        import pandas as pd
+
+        df = pd.DataFrame({
+            # 2022-05-10 07:00, 2022-05-10 08:00 i 2022-05-11 00:30 po lokalnom vremenu
+            "time_nano": [1652158800000000000, 1652162400000000000, 1652221800000000000],
+            "location_name": ["Tătărași Sud, Iași, Romania", "Mănăștur, Cluj-Napoca, Romania",
+                              "Tătărași Sud, Iași, Romania"],
+        })
+        table = {
+            ("2022-05-10", "iasi"): 233,
+            ("2022-05-10", "cluj-napoca"): 500,
+            ("2022-05-11", "iasi"): 240,
+        }
+
+        enriched = enrich_mod.add_tourist_estimates(df, "2022-05-10", table)
+
+        self.assertEqual(enriched["tourist_estimate"].tolist(), [233, 500, 240])
+
+    def test_unknown_city_is_reported(self):
+        import pandas as pd
+
+        df = pd.DataFrame({"location_name": ["Centru, Suceava, Romania"]})
+
+        with self.assertRaises(KeyError) as ctx:
+            enrich_mod.add_tourist_estimates(df, "2022-05-10", EST_TABLE)
+
+        self.assertIn("suceava", str(ctx.exception))
+
+
+class TestDeduplication(unittest.TestCase):
+
+    def _frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({
+            "name": ["1248", "1248", "1248"],
+            "time_nano": [2, 1, 2],
+            "weather_clouds": [20, 0, 40],
+            "_input_file": ["firehose-2022-04-28-02-50", "firehose-2022-04-28-02-20",
+                            "firehose-2022-04-28-02-20"],
+        })
+
+    def test_tie_break_by_input_file(self):
+        first = enrich_mod.deduplicate(self._frame(), "first")
+        last = enrich_mod.deduplicate(self._frame(), "last")
+
+        self.assertEqual(first["weather_clouds"].tolist(), [0, 40])
+        self.assertEqual(last["weather_clouds"].tolist(), [20, 0])
+        self.assertEqual(len(enrich_mod.deduplicate(self._frame(), "none")), 3)
+
+    def test_streaming_drops_duplicates_across_chunks(self):
+        row = CSV_BODY.splitlines()[1]
+        body = CSV_BODY + "\n".join([row] * 50) + "\n"
+        s3 = MagicMock()
+        s3.get_object.return_value = {"Body": io.BytesIO(body.encode("utf-8"))}
+
+        enrich_mod.enrich_single_file_streaming(
+            s3, "bucket", "pollution_partitioned/date=2022-05-10/a.csv", "out/",
+            "2022-05-10", EST_TABLE, dedup="first", chunk_rows=7,
+        )
+
+        lines = s3.put_object.call_args.kwargs["Body"].decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 2)
+
+
+    def test_streaming_dedup_state_is_bounded_by_window(self):
+        row = CSV_BODY.splitlines()[1]
+        other = row.replace("1652158800000000000", "1652162400000000000")
+        body = CSV_BODY + other + "\n" + row + "\n"
+        s3 = MagicMock()
+        s3.get_object.return_value = {"Body": io.BytesIO(body.encode("utf-8"))}
+
+        enrich_mod.enrich_single_file_streaming(
+            s3, "bucket", "pollution_partitioned/date=2022-05-10/a.csv", "out/",
+            "2022-05-10", EST_TABLE, dedup="first", chunk_rows=1, dedup_window=1,
+        )
+
+        # prvi red je izbačen iz prozora pre nego što se ponovio
+        lines = s3.put_object.call_args.kwargs["Body"].decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 4)
+
+
+class TestListing(unittest.TestCase):
+
+    def test_hidden_and_staging_objects_are_skipped(self):
+        s3 = MagicMock()
+        s3.list_objects_v2.return_value = {"Contents": [
+            {"Key": "pollution_partitioned/date=2022-05-10/part-0.csv", "ETag": "a"},
+            {"Key": "pollution_partitioned/date=2022-05-10/_SUCCESS", "ETag": "b"},
+            {"Key": "pollution_partitioned/date=2022-05-10/_compacting/run1/part-0.csv", "ETag": "c"},
+            {"Key": "pollution_partitioned/date=2022-05-10/_compaction.json", "ETag": "d"},
+        ]}
+
+        result = enrich_mod.list_csv_objects(s3, "bucket", "pollution_partitioned/")
+
+        self.assertEqual(result, [("pollution_partitioned/date=2022-05-10/part-0.csv", "2022-05-10", "a")])
+
+
+if __name__ == "__main__":
+    unittest.main()
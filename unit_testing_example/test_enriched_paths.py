@@ -0,0 +1,52 @@
+import unittest
+
+from enriched_paths import build_dst_key, enriched_keys
+
+
+class TestBuildDstKey(unittest.TestCase):
+
+    def test_extension_follows_output_format(self):
+        src = "pollution_partitioned/date=2022-05-10/part-00000.csv"
+
+        self.assertEqual(
+            build_dst_key(src, "pollution_enriched/"),
+            "pollution_enriched/date=2022-05-10/part-00000.csv",
+        )
+        self.assertEqual(
+            build_dst_key(src, "pollution_enriched", "parquet"),
+            "pollution_enriched/date=2022-05-10/part-00000.parquet",
+        )
+
+    def test_parquet_source_with_csv_output(self):
+        self.assertEqual(
+            build_dst_key("weather_partitioned/date=2022-05-10/part-00000.parquet", "weather_enriched/"),
+            "weather_enriched/date=2022-05-10/part-00000.csv",
+        )
+
+
+class TestEnrichedKeys(unittest.TestCase):
+
+    def test_both_output_formats(self):
+        self.assertEqual(
+            enriched_keys("pollution_partitioned/date=2022-05-10/part-00000.csv", "pollution_enriched/"),
+            [
+                "pollution_enriched/date=2022-05-10/part-00000.csv",
+                "pollution_enriched/date=2022-05-10/part-00000.parquet",
+            ],
+        )
+
+    def test_multi_segment_source_prefix_keeps_everything_after_first_segment(self):
+        # enrich skida samo prvi segment, pa i compaction mora tako
+        src = "raw/pollution_partitioned/date=2022-05-10/part-00000.csv"
+
+        keys = enriched_keys(src, "enriched/")
+
+        self.assertEqual(keys, [
+            "enriched/pollution_partitioned/date=2022-05-10/part-00000.csv",
+            "enriched/pollution_partitioned/date=2022-05-10/part-00000.parquet",
+        ])
+        self.assertEqual(keys, sorted({build_dst_key(src, "enriched/", f) for f in ("csv", "parquet")}))
+
+
+if __name__ == "__main__":
+    unittest.main()
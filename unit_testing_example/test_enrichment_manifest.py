@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+
+def _ensure_boto3_stub():
+    module = sys.modules.get("boto3")
+    if module is None:
+        module = SimpleNamespace()
+        sys.modules["boto3"] = module
+
+    if not hasattr(module, "client"):
+        module.client = lambda *args, **kwargs: MagicMock(name="boto3.client")  # type: ignore
+
+    if not hasattr(module, "resource"):
+        module.resource = lambda *args, **kwargs: MagicMock(name="boto3.resource")  # type: ignore
+
+
+_ensure_boto3_stub()
+
+from enrichment_manifest import EnrichmentManifest
+
+
+class TestEnrichmentManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state", "manifest.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_records_survive_interrupted_run(self):
+        manifest = EnrichmentManifest.load(self.path)
+        manifest.record("weather/date=2022-04-01/a.csv", '"e1"', "2022-04-01", 1069, "out/date=2022-04-01/a.csv")
+        # nema flush() - simulira prekinut run
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"key": "half-written')
+
+        reloaded = EnrichmentManifest.load(self.path)
+
+        self.assertTrue(reloaded.is_current("weather/date=2022-04-01/a.csv", '"e1"', "out/date=2022-04-01/a.csv"))
+        self.assertFalse(reloaded.is_current("weather/date=2022-04-01/a.csv", '"e2"', "out/date=2022-04-01/a.csv"))
+        self.assertFalse(reloaded.is_current("weather/date=2022-04-01/a.csv", '"e1"', "out/date=2022-04-01/a.parquet"))
+        self.assertEqual(reloaded.get("weather/date=2022-04-01/a.csv")["estimate"], 1069)
+
+    def test_flush_compacts_repeated_keys(self):
+        manifest = EnrichmentManifest.load(self.path)
+        manifest.record("k", '"e1"', "2022-04-01", 1, "out/k")
+        manifest.record("k", '"e2"', "2022-04-01", 1, "out/k")
+        manifest.flush()
+
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 1)
+        self.assertTrue(EnrichmentManifest.load(self.path).is_current("k", '"e2"', "out/k"))
+
+    def test_s3_manifest_is_rewritten_in_batches(self):
+        s3 = MagicMock()
+        manifest = EnrichmentManifest("s3://state-bucket/enrich/manifest.jsonl", s3_client=s3, flush_every=2)
+
+        manifest.record("a", '"e"', "2022-04-01", 1, "out/a")
+        s3.put_object.assert_not_called()
+        manifest.record("b", '"e"', "2022-04-01", 1, "out/b")
+
+        s3.put_object.assert_called_once()
+        kwargs = s3.put_object.call_args.kwargs
+        self.assertEqual((kwargs["Bucket"], kwargs["Key"]), ("state-bucket", "enrich/manifest.jsonl"))
+        self.assertEqual(len(kwargs["Body"].decode("utf-8").splitlines()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import importlib.util
+import io
+import os
+import sys
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+def _ensure_boto3_stub():
+    module = sys.modules.get("boto3")
+    if module is None:
+        module = SimpleNamespace()
+        sys.modules["boto3"] = module
+
+    if not hasattr(module, "client"):
+        module.client = lambda *args, **kwargs: MagicMock(name="boto3.client")  # type: ignore
+
+    if not hasattr(module, "resource"):
+        module.resource = lambda *args, **kwargs: MagicMock(name="boto3.resource")  # type: ignore
+
+
+class _ClientError(Exception):
+    pass
+
+
+class _BotoCoreError(Exception):
+    pass
+
+
+def _ensure_botocore_stub():
+    botocore = sys.modules.setdefault("botocore", SimpleNamespace())
+    if "botocore.config" not in sys.modules:
+        sys.modules["botocore.config"] = SimpleNamespace(Config=lambda **kwargs: SimpleNamespace(**kwargs))
+        botocore.config = sys.modules["botocore.config"]
+    if "botocore.exceptions" not in sys.modules:
+        sys.modules["botocore.exceptions"] = SimpleNamespace(ClientError=_ClientError)
+        botocore.exceptions = sys.modules["botocore.exceptions"]
+    if not hasattr(sys.modules["botocore.exceptions"], "BotoCoreError"):
+        sys.modules["botocore.exceptions"].BotoCoreError = _BotoCoreError
+
+
+_ensure_boto3_stub()
+_ensure_botocore_stub()
+os.environ.setdefault("DDB_TABLE_NAME", "unit-test-table")
+
+import enrich_tourist_partitioned as enrich_mod
+from fake_aws import FakeAWS, sqs_event
+from lambda_functions import sqs_to_dynamo
+from lambda_functions import transfer_to_s3
+
+APP_PATH = Path(__file__).resolve().parent.parent / "lambda_image_task" / "lambda_image" / "app.py"
+_spec = importlib.util.spec_from_file_location("csv_copy_image_app_fake", APP_PATH)
+app_mod = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(app_mod)
+
+CSV_BODY = (
+    "name,time_nano,time_date,location_name,measurement_pm25Atmo\n"
+    '"1248 - Tătărași Sud, Iași, Romania",1652158800000000000,2022-05-10 07:00:00.0,'
+    '"Tătărași Sud, Iași, Romania",6.69\n'
+)
+EST_TABLE = {("2022-05-10", "iasi"): 233}
+
+
+class TestFakeS3(unittest.TestCase):
+
+    def test_paginates_and_counts_calls(self):
+        fake = FakeAWS(s3_page_size=2)
+        for i in range(5):
+            fake.s3.add_object("b", f"weather/{i}.csv", b"x")
+
+        pages = list(fake.s3.get_paginator("list_objects_v2").paginate(Bucket="b", Prefix="weather/"))
+
+        self.assertEqual([len(p["Contents"]) for p in pages], [2, 2, 1])
+        self.assertEqual(fake.calls["list_objects_v2"], 3)
+
+    def test_throttled_call_raises_client_error_then_recovers(self):
+        fake = FakeAWS()
+        fake.s3.add_object("b", "k", b"data")
+        fake.s3.throttle("get_object")
+
+        with self.assertRaises(Exception) as ctx:
+            fake.s3.get_object(Bucket="b", Key="k")
+        self.assertIn("SlowDown", str(ctx.exception))
+        self.assertEqual(fake.s3.get_object(Bucket="b", Key="k")["Body"].read(), b"data")
+        self.assertEqual(fake.calls["get_object"], 2)
+
+    def test_batch_write_rejects_duplicate_keys(self):
+        fake = FakeAWS()
+        item = {"PutRequest": {"Item": {"file_name": {"S": "a.csv"}}}}
+
+        with self.assertRaises(Exception):
+            fake.dynamodb.batch_write_item(RequestItems={"t": [item, item]})
+
+
+class TestSqsToDynamoWithFake(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeAWS()
+        for patcher in (
+            patch.object(sqs_to_dynamo, "get_dynamodb_client", return_value=self.fake.dynamodb),
+            patch.object(sqs_to_dynamo.time, "sleep"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_batch_write_per_25_files(self):
+        keys = [f"pollution/file-{i}.csv" for i in range(60)]
+        event = sqs_event("bucket", keys, records_per_message=10)
+
+        sqs_to_dynamo.lambda_handler(event, None)
+
+        self.assertEqual(self.fake.calls["batch_write_item"], 3)
+        self.assertEqual(self.fake.calls["put_item"], 0)
+        self.assertEqual(len(self.fake.dynamodb.items("unit-test-table")), 60)
+
+    def test_throttled_batch_is_retried_until_written(self):
+        self.fake.dynamodb.throttle("batch_write_item", times=2)
+        event = sqs_event("bucket", [f"weather/{i}.csv" for i in range(25)])
+
+        sqs_to_dynamo.lambda_handler(event, None)
+
+        self.assertEqual(self.fake.calls["batch_write_item"], 3)
+        self.assertEqual(len(self.fake.dynamodb.items("unit-test-table")), 25)
+
+
+class TestTransferToS3WithFake(unittest.TestCase):
+
+    ENV = {
+        "SOURCE_BUCKET": "src", "DEST_BUCKET": "dst",
+        "SOURCE_PREFIX": "pollution/", "DEST_PREFIX": "archive/",
+    }
+
+    def test_copies_pages_concurrently(self):
+        fake = FakeAWS(latency_by_op={"copy_object": 0.02}, s3_page_size=50)
+        for i in range(100):
+            fake.s3.add_object("src", f"pollution/{i:03d}.csv", f"row {i}")
+
+        with patch.dict(os.environ, self.ENV), \
+                patch.object(transfer_to_s3.boto3, "client", side_effect=fake.client):
+            start = time.perf_counter()
+            response = transfer_to_s3.lambda_handler({}, None)
+            elapsed = time.perf_counter() - start
+
+        self.assertTrue(response["complete"])
+        self.assertEqual(fake.calls["copy_object"], 100)
+        self.assertEqual(fake.calls["list_objects_v2"], 2)
+        self.assertEqual(fake.s3.read("dst", "archive/042.csv"), b"row 42")
+        # 100 x 20 ms serijski bi bilo 2 s
+        self.assertLess(elapsed, 1.0)
+
+    def test_large_object_uses_ranged_part_copies(self):
+        fake = FakeAWS()
+        body = bytes(range(256)) * 40
+        fake.s3.add_object("src", "pollution/big.csv", body)
+
+        with patch.dict(os.environ, self.ENV), \
+                patch.object(transfer_to_s3, "MULTIPART_THRESHOLD", 1000), \
+                patch.object(transfer_to_s3.boto3, "client", side_effect=fake.client):
+            transfer_to_s3.lambda_handler({}, None)
+
+        self.assertEqual(fake.calls["copy_object"], 0)
+        self.assertEqual(fake.calls["upload_part_copy"], 1)
+        self.assertEqual(fake.s3.read("dst", "archive/big.csv"), body)
+        self.assertEqual(fake.s3.open_uploads, 0)
+
+
+class TestCsvCopyImageWithFake(unittest.TestCase):
+
+    def test_prefix_copy_keeps_metadata_and_reports_throttled_item(self):
+        fake = FakeAWS()
+        for i in range(5):
+            fake.s3.add_object("src", f"in/{i}.csv", "a,b\n", ContentType="text/csv", Metadata={"n": str(i)})
+        fake.s3.throttle("copy_object")
+
+        with patch.object(app_mod, "get_s3_client", return_value=fake.s3):
+            response = app_mod.lambda_handler(
+                {"source_bucket": "src", "dest_bucket": "dst", "source_prefix": "in/", "dest_prefix": "out/"},
+                None,
+            )
+
+        self.assertEqual(response["statusCode"], 500)
+        self.assertEqual((response["copied"], response["failed"]), (4, 1))
+        self.assertEqual(fake.calls["head_object"], 0)
+        copied = fake.s3.keys("dst", "out/")
+        self.assertEqual(len(copied), 4)
+        self.assertEqual(fake.s3.objects["dst"][copied[0]]["ContentType"], "text/csv")
+
+
+class TestEnrichWithFake(unittest.TestCase):
+
+    def test_one_get_and_put_per_file(self):
+        fake = FakeAWS()
+        jobs = []
+        for i in range(6):
+            key = f"pollution_partitioned/date=2022-05-10/part-{i}.csv"
+            fake.s3.add_object("bucket", key, CSV_BODY)
+            jobs.append((key, "pollution_enriched/", "2022-05-10"))
+
+        with patch("sys.stdout", new_callable=io.StringIO):
+            failures = enrich_mod.enrich_files(fake.s3, "bucket", jobs, EST_TABLE, workers=3)
+
+        self.assertEqual(failures, [])
+        self.assertEqual((fake.calls["get_object"], fake.calls["put_object"]), (6, 6))
+        body = fake.s3.read("bucket", "pollution_enriched/date=2022-05-10/part-0.csv").decode("utf-8")
+        self.assertTrue(body.splitlines()[1].endswith(",233"))
+
+
+if __name__ == "__main__":
+    unittest.main()
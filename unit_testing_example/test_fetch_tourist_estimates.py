@@ -0,0 +1,196 @@
+import io
+import sys
+import time
+import unittest
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+def _ensure_boto3_stub():
+    module = sys.modules.get("boto3")
+    if module is None:
+        module = SimpleNamespace()
+        sys.modules["boto3"] = module
+
+    if not hasattr(module, "client"):
+        module.client = lambda *args, **kwargs: MagicMock(name="boto3.client")  # type: ignore
+
+    if not hasattr(module, "resource"):
+        module.resource = lambda *args, **kwargs: MagicMock(name="boto3.resource")  # type: ignore
+
+
+_ensure_boto3_stub()
+
+import fetch_tourist_estimates as fetch_mod
+
+
+PAYLOAD = {"info": [{"name": "Iasi", "estimated_no_people": 233}]}
+
+
+class TestEstimateCache(unittest.TestCase):
+
+    def test_historical_dates_never_expire(self):
+        cache = fetch_mod.EstimateCache(":memory:", recent_ttl_seconds=0)
+        cache.put("2022-05-10", PAYLOAD)
+
+        self.assertEqual(cache.get("2022-05-10"), PAYLOAD)
+
+    def test_recent_dates_expire_after_ttl(self):
+        today = date.today().strftime("%Y-%m-%d")
+        cache = fetch_mod.EstimateCache(":memory:", recent_ttl_seconds=60)
+        cache.put(today, PAYLOAD)
+        self.assertEqual(cache.get(today), PAYLOAD)
+
+        with patch("fetch_tourist_estimates.time.time", return_value=time.time() + 120):
+            self.assertIsNone(cache.get(today))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = fetch_mod.EstimateCache(":memory:", max_entries=2)
+        start = date(2022, 4, 1)
+        days = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(3)]
+
+        with patch("fetch_tourist_estimates.time.time", side_effect=range(100, 200)):
+            cache.put(days[0], PAYLOAD)
+            cache.put(days[1], PAYLOAD)
+            cache.get(days[0])
+            cache.put(days[2], PAYLOAD)
+
+        self.assertIsNotNone(cache.get(days[0]))
+        self.assertIsNone(cache.get(days[1]))
+        self.assertIsNotNone(cache.get(days[2]))
+
+    def test_s3_backing_is_used_on_local_miss(self):
+        cache = fetch_mod.EstimateCache(":memory:", s3_uri="s3://cache-bucket/estimates/")
+        s3 = MagicMock()
+        s3.get_object.return_value = {
+            "Body": MagicMock(read=lambda: b'{"fetched_at": 0, "payload": {"info": []}}')
+        }
+        cache._s3_client = s3
+
+        self.assertEqual(cache.get("2022-05-10"), {"info": []})
+        s3.get_object.assert_called_once_with(Bucket="cache-bucket", Key="estimates/2022-05-10.json")
+        self.assertEqual(cache.get("2022-05-10"), {"info": []})
+        self.assertEqual(s3.get_object.call_count, 1)
+
+    def test_s3_errors_are_treated_as_a_miss(self):
+        cache = fetch_mod.EstimateCache(":memory:", s3_uri="s3://cache-bucket/estimates/")
+        s3 = MagicMock()
+        s3.exceptions.NoSuchKey = type("NoSuchKey", (Exception,), {})
+        s3.get_object.side_effect = RuntimeError("AccessDenied")
+        s3.put_object.side_effect = RuntimeError("SlowDown")
+        cache._s3_client = s3
+
+        with patch("sys.stderr", new_callable=io.StringIO) as err:
+            self.assertIsNone(cache.get("2022-05-10"))
+            cache.put("2022-05-10", PAYLOAD)
+
+        self.assertIn("AccessDenied", err.getvalue())
+        self.assertIn("SlowDown", err.getvalue())
+        self.assertEqual(cache.get("2022-05-10"), PAYLOAD)
+
+
+class TestFetchEstimatesCaching(unittest.TestCase):
+
+    def test_second_call_is_served_from_cache(self):
+        response = MagicMock(status_code=200)
+        response.json.return_value = PAYLOAD
+        session = MagicMock()
+        session.get.return_value = response
+
+        with patch.object(fetch_mod, "get_estimate_cache", return_value=fetch_mod.EstimateCache(":memory:")), \
+                patch.object(fetch_mod, "get_token", return_value="token"), \
+                patch.object(fetch_mod, "get_session", return_value=session):
+            first = fetch_mod.fetch_estimates("2022-05-10")
+            second = fetch_mod.fetch_estimates("2022-05-10")
+            fetch_mod.fetch_estimates("2022-05-10", use_cache=False)
+
+        self.assertEqual(first, PAYLOAD)
+        self.assertEqual(second, PAYLOAD)
+        self.assertEqual(session.get.call_count, 2)
+
+
+class TestFetchEstimatesMany(unittest.TestCase):
+
+    def _response(self, status_code, payload=None, headers=None):
+        response = MagicMock(status_code=status_code, headers=headers or {}, text="")
+        response.json.return_value = payload
+        return response
+
+    def test_returns_payload_per_unique_date(self):
+        def request(d):
+            return self._response(200, {"date": d})
+
+        with patch.object(fetch_mod, "get_token", return_value="token"), \
+                patch.object(fetch_mod, "_request_estimates", side_effect=request) as mock_request:
+            result = fetch_mod.fetch_estimates_many(
+                ["2022-05-02", "2022-05-01", "2022-05-02", "2022-05-03"],
+                max_concurrency=3, rate_per_second=1000, use_cache=False,
+            )
+
+        self.assertEqual(list(result), ["2022-05-01", "2022-05-02", "2022-05-03"])
+        self.assertEqual(result["2022-05-02"], {"date": "2022-05-02"})
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_429_throttles_and_retries(self):
+        responses = [self._response(429, headers={"Retry-After": "0"}), self._response(200, PAYLOAD)]
+        requests_seen = []
+
+        with patch.object(fetch_mod, "get_token", return_value="token"), \
+                patch.object(fetch_mod, "_request_estimates", side_effect=responses), \
+                patch.object(fetch_mod, "THROTTLE_BACKOFF_SECONDS", 0.01), \
+                patch.object(fetch_mod.TokenBucket, "throttle", autospec=True) as mock_throttle:
+            result = fetch_mod.fetch_estimates_many(
+                ["2022-05-10"], rate_per_second=1000, use_cache=False,
+                on_request=lambda d, seconds, status: requests_seen.append((d, status)),
+            )
+
+        self.assertEqual(result, {"2022-05-10": PAYLOAD})
+        mock_throttle.assert_called_once()
+        self.assertEqual(requests_seen, [("2022-05-10", 429), ("2022-05-10", 200)])
+
+    def test_retry_error_fails_without_throttling(self):
+        requests_seen = []
+
+        with patch.object(fetch_mod, "get_token", return_value="token"), \
+                patch.object(
+                    fetch_mod, "_request_estimates",
+                    side_effect=fetch_mod.requests.exceptions.RetryError("too many 503 error responses"),
+                ) as mock_request, \
+                patch.object(fetch_mod.TokenBucket, "throttle", autospec=True) as mock_throttle:
+            with self.assertRaises(RuntimeError):
+                fetch_mod.fetch_estimates_many(
+                    ["2022-05-10"], rate_per_second=1000, use_cache=False,
+                    on_request=lambda d, seconds, status: requests_seen.append((d, status)),
+                )
+
+        mock_request.assert_called_once()
+        mock_throttle.assert_not_called()
+        self.assertEqual(requests_seen, [("2022-05-10", 0)])
+
+    def test_cached_dates_skip_the_api(self):
+        cache = fetch_mod.EstimateCache(":memory:")
+        cache.put("2022-05-10", PAYLOAD)
+
+        with patch.object(fetch_mod, "get_estimate_cache", return_value=cache), \
+                patch.object(fetch_mod, "_request_estimates") as mock_request:
+            result = fetch_mod.fetch_estimates_many(["2022-05-10"])
+
+        self.assertEqual(result, {"2022-05-10": PAYLOAD})
+        mock_request.assert_not_called()
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_throttle_blocks_next_acquire(self):
+        bucket = fetch_mod.TokenBucket(rate_per_second=1000)
+        bucket.throttle(0.05)
+
+        start = time.monotonic()
+        bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import partition_dedup as dedup_mod
+from time_columns import add_spark_time_columns
+
+ROW_A = ("1248 - Tătărași Sud, Iași, Romania", 1651096800000000000, 6.69)
+ROW_B = ("1248 - Tătărași Sud, Iași, Romania", 1651100400000000000, 7.10)
+ROW_C = ("1248 - Tătărași Sud, Iași, Romania", 1651104000000000000, 5.02)
+
+
+class TestPartitionPaths(unittest.TestCase):
+
+    def test_one_path_per_date_when_date_is_first_key(self):
+        paths = dedup_mod.partition_paths(
+            "s3://bucket/pollution/", [date(2022, 4, 29), date(2022, 4, 28), date(2022, 4, 29)], ["date", "hour"]
+        )
+
+        self.assertEqual(paths, ["s3://bucket/pollution/date=2022-04-28", "s3://bucket/pollution/date=2022-04-29"])
+
+    def test_whole_target_when_date_is_not_first_key(self):
+        paths = dedup_mod.partition_paths("s3://bucket/sensor", [date(2022, 4, 28)], ["location", "date"])
+
+        self.assertEqual(paths, ["s3://bucket/sensor"])
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyspark"), "pyspark not installed")
+class TestDropAlreadyWritten(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from pyspark.sql import SparkSession
+
+        cls.spark = SparkSession.builder.master("local[1]").appName("partition_dedup").getOrCreate()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.spark.stop()
+
+    def _run(self, rows, target, output_format):
+        df = self.spark.createDataFrame(rows, ["name", "time_nano", "measurement_pm25Atmo"])
+        df = add_spark_time_columns(df, 2, ["date"])
+        df = dedup_mod.drop_already_written(df, self.spark, target, ["date"], output_format)
+        writer = df.write.mode("append").partitionBy("date")
+        if output_format == "parquet":
+            writer.parquet(target)
+        else:
+            writer.option("header", True).csv(target)
+
+    def test_duplicate_from_an_earlier_run_is_dropped(self):
+        for output_format in ("csv", "parquet"):
+            with self.subTest(output_format=output_format), tempfile.TemporaryDirectory() as tmp:
+                target = os.path.join(tmp, "pollution")
+
+                self._run([ROW_A, ROW_B], target, output_format)
+                self._run([ROW_B, ROW_C], target, output_format)
+
+                reader = self.spark.read
+                written = reader.parquet(target) if output_format == "parquet" else \
+                    reader.option("header", True).csv(target)
+                keys = sorted(int(r["time_nano"]) for r in written.select("time_nano").collect())
+                self.assertEqual(keys, [ROW_A[1], ROW_B[1], ROW_C[1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from pipeline_metrics import InstrumentedClient, StageMetrics, percentile, timer
+
+
+class TestStageMetrics(unittest.TestCase):
+
+    def test_summary_has_percentiles_and_counters(self):
+        metrics = StageMetrics()
+        for ms in range(1, 101):
+            metrics.record("read", ms / 1000, bytes_read=10, rows=2)
+
+        stats = metrics.summary()["read"]
+
+        self.assertEqual(stats["count"], 100)
+        self.assertEqual((stats["p50_ms"], stats["p90_ms"], stats["p99_ms"]), (50.0, 90.0, 99.0))
+        self.assertEqual(stats["max_ms"], 100.0)
+        self.assertEqual((stats["bytes_read"], stats["rows"]), (1000, 200))
+
+    def test_timer_counts_errors_and_reraises(self):
+        metrics = StageMetrics()
+
+        with self.assertRaises(ValueError):
+            with metrics.timer("parse"):
+                raise ValueError("bad csv")
+
+        self.assertEqual(metrics.summary()["parse"]["errors"], 1)
+
+    def test_timer_without_metrics_is_noop(self):
+        with timer(None, "read", rows=1) as m:
+            m["rows"] += 1
+        self.assertEqual(m["rows"], 2)
+
+    def test_emf_line_per_stage(self):
+        metrics = StageMetrics()
+        metrics.record("write", 0.01, bytes_written=5)
+        out = io.StringIO()
+
+        metrics.emit("emf", out, Bucket="b")
+
+        line = json.loads(out.getvalue())
+        self.assertEqual(line["Stage"], "write")
+        self.assertEqual(line["bytes_written"], 5)
+        definition = line["_aws"]["CloudWatchMetrics"][0]
+        self.assertEqual(definition["Dimensions"], [["Stage", "Bucket"]])
+        self.assertIn({"Name": "bytes_written", "Unit": "Bytes"}, definition["Metrics"])
+
+    def test_percentile_of_empty_list(self):
+        self.assertEqual(percentile([], 99), 0.0)
+
+
+class TestInstrumentedClient(unittest.TestCase):
+
+    def test_api_calls_are_timed_with_bytes(self):
+        s3 = MagicMock()
+        s3.get_object.return_value = {"ContentLength": 42}
+        metrics = StageMetrics()
+        client = InstrumentedClient(s3, metrics)
+
+        client.get_object(Bucket="b", Key="k")
+        client.put_object(Bucket="b", Key="k2", Body=b"abc")
+        client.get_paginator("list_objects_v2")
+
+        stats = metrics.summary()
+        self.assertEqual(stats["s3.get_object"]["bytes_read"], 42)
+        self.assertEqual(stats["s3.put_object"]["bytes_written"], 3)
+        self.assertNotIn("s3.get_paginator", stats)
+        s3.put_object.assert_called_once_with(Bucket="b", Key="k2", Body=b"abc")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+
+def _ensure_boto3_stub():
+    module = sys.modules.get("boto3")
+    if module is None:
+        module = SimpleNamespace()
+        sys.modules["boto3"] = module
+
+    if not hasattr(module, "client"):
+        module.client = lambda *args, **kwargs: MagicMock(name="boto3.client")  # type: ignore
+
+    if not hasattr(module, "resource"):
+        module.resource = lambda *args, **kwargs: MagicMock(name="boto3.resource")  # type: ignore
+
+
+_ensure_boto3_stub()
+
+import pollution_weather_correlation as corr_mod
+from fake_aws import FakeAWS
+
+CITY = "Tătărași Sud, Iași, Romania"
+# 2022-04-28 00:00 po lokalnom vremenu
+DAY_START_NANO = 1651096800000000000
+HOUR = 3_600_000_000_000
+
+
+def _day_nano(day_index, hour=0):
+    return DAY_START_NANO + day_index * 24 * HOUR + hour * HOUR
+
+
+class TestDailyWeather(unittest.TestCase):
+
+    def test_averages_hours_first_like_the_sql(self):
+        df = pd.DataFrame({
+            "location_name": [CITY, CITY, CITY],
+            "time_nano": [_day_nano(0, 1), _day_nano(0, 1), _day_nano(0, 2)],
+            "weather_windSpeed": [1.0, 3.0, 8.0],
+            "weather_precipitation": [0.5, 0.5, 1.0],
+        })
+
+        daily = corr_mod.daily_weather(df).set_index("city")
+
+        # satni proseci 2.0 i 8.0, a ne prosek sva tri reda
+        self.assertAlmostEqual(daily.loc[CITY, "wind"], 5.0)
+        self.assertAlmostEqual(daily.loc[CITY, "rain"], 1.5)
+
+    def test_missing_precipitation_column_leaves_rain_empty(self):
+        df = pd.DataFrame({"location_name": [CITY], "time_nano": [_day_nano(0)], "weather_windSpeed": [2.0]})
+
+        points = corr_mod.day_points(
+            pd.DataFrame({"city": [CITY], "pollution_total_visitor_pm25": [10.0]}),
+            corr_mod.daily_weather(df),
+        )
+
+        self.assertEqual(points, {CITY: {"exposure": 10.0, "wind": 2.0, "rain": None}})
+
+
+class TestCorrelationState(unittest.TestCase):
+
+    def _points(self, exposure, wind, rain):
+        return {CITY: {"exposure": exposure, "wind": wind, "rain": rain}}
+
+    def test_matches_full_recomputation_after_replacing_days(self):
+        rng = np.random.default_rng(1)
+        exposure, wind, rain = rng.normal(size=(3, 10))
+        state = corr_mod.CorrelationState()
+        for i in range(10):
+            state.update_day(f"2022-04-{i + 1:02d}", self._points(999.0, 0.0, 0.0))
+        # drugi prolaz zamenjuje svaki dan pravim vrednostima
+        for i in range(10):
+            state.update_day(f"2022-04-{i + 1:02d}", self._points(exposure[i], wind[i], rain[i]))
+
+        self.assertAlmostEqual(state.correlation(CITY, "exposure_wind"), np.corrcoef(exposure, wind)[0, 1])
+        self.assertAlmostEqual(state.correlation(CITY, "exposure_rain"), np.corrcoef(exposure, rain)[0, 1])
+        self.assertEqual(state.cities[CITY]["sums"]["exposure_wind"]["n"], 10)
+
+    def test_none_values_are_left_out_of_the_pair(self):
+        state = corr_mod.CorrelationState()
+        state.update_day("2022-04-01", self._points(1.0, 2.0, None))
+        state.update_day("2022-04-02", self._points(2.0, 3.0, None))
+
+        self.assertEqual(state.cities[CITY]["sums"]["exposure_rain"]["n"], 0)
+        self.assertIsNone(state.correlation(CITY, "exposure_rain"))
+        self.assertAlmostEqual(state.correlation(CITY, "exposure_wind"), 1.0)
+
+    def test_round_trips_through_local_file(self):
+        state = corr_mod.CorrelationState()
+        state.update_day("2022-04-01", self._points(1.0, 2.0, 3.0))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state", "corr.json")
+            state.save(path)
+            loaded = corr_mod.CorrelationState.load(path)
+
+        self.assertEqual(loaded.cities, state.cities)
+
+
+class TestUpdateCorrelations(unittest.TestCase):
+
+    def test_recomputes_days_from_enriched_partitions(self):
+        fake = FakeAWS()
+        exposure_pm25, winds = [1.0, 2.0, 4.0], [5.0, 3.0, 1.0]
+        for i, (pm25, wind) in enumerate(zip(exposure_pm25, winds)):
+            day = f"2022-04-{28 + i}"
+            pollution = pd.DataFrame({
+                "name": [f"1248 - {CITY}"],
+                "time_nano": [_day_nano(i, 10)],
+                "location_name": [CITY],
+                "measurement_pm10Atmo": ["None"],
+                "measurement_pm25Atmo": [pm25],
+                "measurement_pm100Atmo": [pm25],
+                "tourist_estimate": [100],
+            })
+            weather = pd.DataFrame({
+                "location_name": [CITY, CITY],
+                "time_nano": [_day_nano(i, 10), _day_nano(i, 11)],
+                "weather_windSpeed": [wind, wind],
+            })
+            fake.s3.add_object("b", f"pollution_enriched/date={day}/part-0.csv", pollution.to_csv(index=False))
+            fake.s3.add_object("b", f"weather_enriched/date={day}/part-0.csv", weather.to_csv(index=False))
+
+        with tempfile.TemporaryDirectory() as tmp, patch("sys.stdout", new_callable=io.StringIO):
+            state_path = os.path.join(tmp, "corr.json")
+            corr_mod.update_correlations(
+                fake.s3, "b", "pollution_enriched/", "weather_enriched/", state_path,
+                ["2022-04-28", "2022-04-29"],
+            )
+            state = corr_mod.update_correlations(
+                fake.s3, "b", "pollution_enriched/", "weather_enriched/", state_path,
+                ["2022-04-29", "2022-04-30"],
+            )
+
+        expected = np.corrcoef([p * 100 for p in exposure_pm25], winds)[0, 1]
+        self.assertAlmostEqual(state.correlation(CITY, "exposure_wind"), expected)
+        self.assertEqual(state.cities[CITY]["sums"]["exposure_wind"]["n"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
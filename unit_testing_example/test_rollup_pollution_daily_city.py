@@ -0,0 +1,105 @@
+import io
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+
+def _ensure_boto3_stub():
+    module = sys.modules.get("boto3")
+    if module is None:
+        module = SimpleNamespace()
+        sys.modules["boto3"] = module
+
+    if not hasattr(module, "client"):
+        module.client = lambda *args, **kwargs: MagicMock(name="boto3.client")  # type: ignore
+
+    if not hasattr(module, "resource"):
+        module.resource = lambda *args, **kwargs: MagicMock(name="boto3.resource")  # type: ignore
+
+
+_ensure_boto3_stub()
+
+import rollup_pollution_daily_city as rollup_mod
+
+
+ENRICHED_CSV = (
+    "name,time_nano,time_date,location_name,measurement_pm10Atmo,"
+    "measurement_pm25Atmo,measurement_pm100Atmo,tourist_estimate\n"
+    '1248,1651467600000000000,2022-05-02 07:00:00.0,"Tătărași Sud, Iași, Romania",,2.0,3.0,10\n'
+    '1248,1651471200000000000,2022-05-02 08:00:00.0,"Tătărași Sud, Iași, Romania",1.0,4.0,5.0,10\n'
+)
+
+
+class TestDailyCityRollup(unittest.TestCase):
+
+    def test_sums_exposure_per_day_and_city(self):
+        df = pd.read_csv(io.StringIO(ENRICHED_CSV))
+
+        rollup = rollup_mod.build_daily_city_rollup(df)
+
+        self.assertEqual(len(rollup), 1)
+        row = rollup.iloc[0]
+        self.assertEqual(row["day"], "2022-05-02")
+        self.assertEqual(row["pollution_total_visitor_pm10"], 10.0)
+        self.assertEqual(row["pollution_total_visitor_pm25"], 60.0)
+        self.assertEqual(row["pollution_total_visitor_pm100"], 80.0)
+        self.assertEqual(row["row_count"], 2)
+
+    def test_update_rewrites_only_requested_days_from_all_files(self):
+        s3 = MagicMock()
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{"Contents": [
+            {"Key": "enriched/date=2022-05-02/part-0.csv"},
+            {"Key": "enriched/date=2022-05-02/part-1.csv"},
+            {"Key": "enriched/date=2022-05-02/_SUCCESS"},
+        ]}]
+        s3.get_paginator.return_value = paginator
+        bodies = {
+            "enriched/date=2022-05-02/part-0.csv": ENRICHED_CSV,
+            "enriched/date=2022-05-02/part-1.csv": ENRICHED_CSV.replace("1248,", "1249,"),
+        }
+        s3.get_object.side_effect = lambda Bucket, Key: {
+            "Body": io.BytesIO(bodies[Key].encode("utf-8"))
+        }
+
+        rollup_mod.update_rollups(s3, "bucket", "enriched/", "rollup/", ["2022-05-02"])
+
+        paginator.paginate.assert_called_once_with(Bucket="bucket", Prefix="enriched/date=2022-05-02/")
+        self.assertEqual(s3.get_object.call_count, 2)
+        kwargs = s3.put_object.call_args.kwargs
+        self.assertEqual(kwargs["Key"], "rollup/date=2022-05-02/part-00000.csv")
+        written = pd.read_csv(io.BytesIO(kwargs["Body"]))
+        self.assertNotIn("day", written.columns)
+        self.assertEqual(written["pollution_total_visitor_pm25"].tolist(), [120.0])
+        self.assertEqual(written["row_count"].tolist(), [4])
+
+    def test_duplicate_readings_across_files_are_counted_once(self):
+        s3 = MagicMock()
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{"Contents": [
+            {"Key": "enriched/date=2022-05-02/part-0.csv"},
+            {"Key": "enriched/date=2022-05-02/part-1.csv"},
+        ]}]
+        s3.get_paginator.return_value = paginator
+        s3.get_object.side_effect = lambda Bucket, Key: {
+            "Body": io.BytesIO(ENRICHED_CSV.encode("utf-8"))
+        }
+
+        rollup = rollup_mod.rollup_day(s3, "bucket", "enriched/", "2022-05-02")
+
+        self.assertEqual(rollup["pollution_total_visitor_pm25"].tolist(), [60.0])
+        self.assertEqual(rollup["row_count"].tolist(), [2])
+
+    def test_missing_pm_column_counts_as_zero(self):
+        df = pd.read_csv(io.StringIO(ENRICHED_CSV)).drop(columns=["measurement_pm10Atmo"])
+
+        rollup = rollup_mod.build_daily_city_rollup(df)
+
+        self.assertEqual(rollup["pollution_total_visitor_pm10"].tolist(), [0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,7 +18,16 @@ def _ensure_boto3_stub():
         module.resource = lambda *args, **kwargs: MagicMock(name="boto3.resource")  # type: ignore
 
 
+def _ensure_botocore_stub():
+    if "botocore" in sys.modules:
+        return
+    config_module = SimpleNamespace(Config=lambda **kwargs: SimpleNamespace(**kwargs))
+    sys.modules["botocore"] = SimpleNamespace(config=config_module)
+    sys.modules["botocore.config"] = config_module
+
+
 _ensure_boto3_stub()
+_ensure_botocore_stub()
 
 from lambda_functions import transfer_to_s3 as lambda_mod
 
@@ -58,6 +67,103 @@ class TestS3CopyLambda(unittest.TestCase):
             CopySource={"Bucket": "src-bucket", "Key": "pollution/file1.csv"}
         )
 
+    @patch.dict(os.environ, {
+        "SOURCE_BUCKET": "src-bucket",
+        "DEST_BUCKET": "dst-bucket",
+        "SOURCE_PREFIX": "pollution/",
+        "DEST_PREFIX": "archive/"
+    }, clear=True)
+    @patch("lambda_functions.transfer_to_s3.boto3.client")
+    def test_large_objects_use_multipart_copy(self, mock_boto_client):
+        mock_s3 = MagicMock()
+        mock_boto_client.return_value = mock_s3
+        mock_s3.head_object.return_value = {
+            "ContentLength": 1, "ContentType": "text/csv", "Metadata": {"source": "firehose"},
+        }
+        mock_s3.create_multipart_upload.return_value = {"UploadId": "up-1"}
+        mock_s3.upload_part_copy.side_effect = lambda **kw: {
+            "CopyPartResult": {"ETag": f"etag-{kw['PartNumber']}"}
+        }
+
+        size = lambda_mod.MULTIPART_THRESHOLD + 1
+        paginator_mock = MagicMock()
+        paginator_mock.paginate.return_value = [
+            {"Contents": [{"Key": "pollution/big.csv", "Size": size}]}
+        ]
+        mock_s3.get_paginator.return_value = paginator_mock
+
+        response = lambda_mod.lambda_handler({}, None)
+
+        self.assertTrue(response["complete"])
+        mock_s3.copy_object.assert_not_called()
+        ranges = sorted(
+            c.kwargs["CopySourceRange"] for c in mock_s3.upload_part_copy.call_args_list
+        )
+        self.assertEqual(ranges[0], f"bytes=0-{lambda_mod.PART_SIZE - 1}")
+        self.assertTrue(ranges[-1].endswith(f"-{size - 1}"))
+        parts = mock_s3.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+        self.assertEqual([p["PartNumber"] for p in parts], list(range(1, len(parts) + 1)))
+        mock_s3.create_multipart_upload.assert_called_once_with(
+            Bucket="dst-bucket", Key="archive/big.csv", ContentType="text/csv", Metadata={"source": "firehose"}
+        )
+
+    @patch.dict(os.environ, {
+        "SOURCE_BUCKET": "src-bucket",
+        "DEST_BUCKET": "dst-bucket",
+        "SOURCE_PREFIX": "pollution/",
+        "DEST_PREFIX": "archive/"
+    }, clear=True)
+    @patch("lambda_functions.transfer_to_s3.boto3.client")
+    def test_stops_before_timeout_and_resumes_after_last_copied_key(self, mock_boto_client):
+        mock_s3 = MagicMock()
+        mock_boto_client.return_value = mock_s3
+        paginator_mock = MagicMock()
+        paginator_mock.paginate.return_value = iter([
+            {"Contents": [{"Key": "pollution/file1.csv"}], "NextContinuationToken": "tok-2"},
+            {"Contents": [{"Key": "pollution/file2.csv"}]},
+        ])
+        mock_s3.get_paginator.return_value = paginator_mock
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 1000
+
+        response = lambda_mod.lambda_handler({}, context)
+
+        self.assertFalse(response["complete"])
+        self.assertEqual(response["start_after"], "pollution/file1.csv")
+        self.assertEqual(mock_s3.copy_object.call_count, 1)
+
+        paginator_mock.paginate.return_value = [{"Contents": [{"Key": "pollution/file2.csv"}]}]
+        response = lambda_mod.lambda_handler({"start_after": "pollution/file1.csv"}, context)
+
+        self.assertTrue(response["complete"])
+        self.assertEqual(paginator_mock.paginate.call_args.kwargs["StartAfter"], "pollution/file1.csv")
+        self.assertEqual(mock_s3.copy_object.call_count, 2)
+
+    @patch.dict(os.environ, {
+        "SOURCE_BUCKET": "src-bucket",
+        "DEST_BUCKET": "dst-bucket",
+        "SOURCE_PREFIX": "pollution/",
+        "DEST_PREFIX": "archive/"
+    }, clear=True)
+    @patch.object(lambda_mod, "MAX_WORKERS", 1)
+    @patch("lambda_functions.transfer_to_s3.boto3.client")
+    def test_time_is_checked_before_each_object_within_a_page(self, mock_boto_client):
+        mock_s3 = MagicMock()
+        mock_boto_client.return_value = mock_s3
+        paginator_mock = MagicMock()
+        paginator_mock.paginate.return_value = [
+            {"Contents": [{"Key": f"pollution/file{i}.csv"} for i in range(1, 6)]},
+        ]
+        mock_s3.get_paginator.return_value = paginator_mock
+        context = MagicMock()
+        context.get_remaining_time_in_millis.side_effect = [120000, 120000, 1000, 1000]
+
+        response = lambda_mod.lambda_handler({}, context)
+
+        self.assertFalse(response["complete"])
+        self.assertEqual(response["start_after"], "pollution/file3.csv")
+        self.assertEqual(mock_s3.copy_object.call_count, 3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -27,8 +27,10 @@ from lambda_functions import sqs_to_dynamo as lambda_mod
 
 class TestSqsToDynamoLambda(unittest.TestCase):
 
-    @patch("lambda_functions.sqs_to_dynamo.table")
-    def test_happy_path_puts_item(self, mock_table):
+    @patch("lambda_functions.sqs_to_dynamo.get_dynamodb_client")
+    def test_happy_path_writes_item_in_batch(self, mock_get_client):
+        mock_dynamodb = mock_get_client.return_value
+        mock_dynamodb.batch_write_item.return_value = {"UnprocessedItems": {}}
         event = {
             "Records": [
                 {
@@ -50,13 +52,15 @@ class TestSqsToDynamoLambda(unittest.TestCase):
         response = lambda_mod.lambda_handler(event, None)
 
         self.assertEqual(response["statusCode"], 200)
-        mock_table.put_item.assert_called_once()
-        args, kwargs = mock_table.put_item.call_args
-        self.assertEqual(kwargs["Item"]["file_name"], "data.csv")
-        self.assertEqual(kwargs["Item"]["status"], 0)
-
-    @patch("lambda_functions.sqs_to_dynamo.table")
-    def test_ignores_invalid_prefix(self, mock_table):
+        mock_dynamodb.batch_write_item.assert_called_once()
+        args, kwargs = mock_dynamodb.batch_write_item.call_args
+        requests = kwargs["RequestItems"]["unit-test-table"]
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]["PutRequest"]["Item"]["file_name"], {"S": "data.csv"})
+        self.assertEqual(requests[0]["PutRequest"]["Item"]["status"], {"N": "0"})
+
+    @patch("lambda_functions.sqs_to_dynamo.get_dynamodb_client")
+    def test_ignores_invalid_prefix(self, mock_get_client):
         event = {
             "Records": [
                 {
@@ -77,7 +81,117 @@ class TestSqsToDynamoLambda(unittest.TestCase):
         response = lambda_mod.lambda_handler(event, None)
 
         self.assertEqual(response["statusCode"], 200)
-        mock_table.put_item.assert_not_called()
+        # bez item-a se client ni ne pravi
+        mock_get_client.assert_not_called()
+
+    @patch("lambda_functions.sqs_to_dynamo.time.sleep")
+    @patch("lambda_functions.sqs_to_dynamo.get_dynamodb_client")
+    def test_batches_whole_sqs_batch_and_retries_unprocessed(self, mock_get_client, mock_sleep):
+        mock_dynamodb = mock_get_client.return_value
+        def s3_records(prefix, count):
+            return [
+                {
+                    "s3": {
+                        "bucket": {"name": "my-bucket"},
+                        "object": {"key": f"{prefix}/{prefix}-{i}.csv"}
+                    },
+                    "eventTime": "2025-11-19T10:00:00Z"
+                }
+                for i in range(count)
+            ]
+
+        event = {
+            "Records": [
+                {"body": json.dumps({"Records": s3_records("pollution", 20)})},
+                {"body": json.dumps({"Records": s3_records("weather", 10) + s3_records("pollution", 1)})},
+            ]
+        }
+        throttled = {"PutRequest": {"Item": {"file_name": "pollution-0.csv"}}}
+        mock_dynamodb.batch_write_item.side_effect = [
+            {"UnprocessedItems": {"unit-test-table": [throttled]}},
+            {"UnprocessedItems": {}},
+            {},
+        ]
+
+        response = lambda_mod.lambda_handler(event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        calls = mock_dynamodb.batch_write_item.call_args_list
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(calls[0].kwargs["RequestItems"]["unit-test-table"]), 25)
+        self.assertEqual(calls[1].kwargs["RequestItems"]["unit-test-table"], [throttled])
+        # pollution-0.csv stiže dva puta u batch-u, upisuje se jednom
+        self.assertEqual(len(calls[2].kwargs["RequestItems"]["unit-test-table"]), 5)
+        mock_sleep.assert_called_once()
+
+    @staticmethod
+    def _same_file_name_event():
+        records = [
+            {
+                "s3": {"bucket": {"name": "my-bucket"}, "object": {"key": key}},
+                "eventTime": event_time,
+            }
+            for key, event_time in [
+                ("pollution/1248/data.csv", "2025-11-19T10:00:00Z"),
+                ("weather/iasi/data.csv", "2025-11-19T10:05:00Z"),
+            ]
+        ]
+        return {"Records": [{"body": json.dumps({"Records": records})}]}
+
+    @patch("lambda_functions.sqs_to_dynamo.get_dynamodb_client")
+    def test_same_file_name_under_different_prefixes_is_one_item_with_file_name_key(self, mock_get_client):
+        mock_dynamodb = mock_get_client.return_value
+        mock_dynamodb.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        lambda_mod.lambda_handler(self._same_file_name_event(), None)
+
+        requests = mock_dynamodb.batch_write_item.call_args.kwargs["RequestItems"]["unit-test-table"]
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]["PutRequest"]["Item"]["timestamp"], {"S": "2025-11-19T10:05:00Z"})
+
+    @patch.object(lambda_mod, "table_key_attributes", ("file_name", "timestamp"))
+    @patch("lambda_functions.sqs_to_dynamo.get_dynamodb_client")
+    def test_same_file_name_under_different_prefixes_with_composite_key(self, mock_get_client):
+        mock_dynamodb = mock_get_client.return_value
+        mock_dynamodb.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        lambda_mod.lambda_handler(self._same_file_name_event(), None)
+
+        requests = mock_dynamodb.batch_write_item.call_args.kwargs["RequestItems"]["unit-test-table"]
+        self.assertEqual(
+            [r["PutRequest"]["Item"]["timestamp"]["S"] for r in requests],
+            ["2025-11-19T10:00:00Z", "2025-11-19T10:05:00Z"],
+        )
+
+    @patch("lambda_functions.sqs_to_dynamo.time.sleep")
+    @patch("lambda_functions.sqs_to_dynamo.get_dynamodb_client")
+    def test_raises_when_items_stay_unprocessed(self, mock_get_client, mock_sleep):
+        mock_dynamodb = mock_get_client.return_value
+        event = {
+            "Records": [
+                {
+                    "body": json.dumps({
+                        "Records": [
+                            {
+                                "s3": {
+                                    "bucket": {"name": "my-bucket"},
+                                    "object": {"key": "sensor/data.csv"}
+                                }
+                            }
+                        ]
+                    })
+                }
+            ]
+        }
+        unprocessed = {"PutRequest": {"Item": {"file_name": "data.csv"}}}
+        mock_dynamodb.batch_write_item.return_value = {
+            "UnprocessedItems": {"unit-test-table": [unprocessed]}
+        }
+
+        with self.assertRaises(Exception):
+            lambda_mod.lambda_handler(event, None)
+
+        self.assertEqual(mock_dynamodb.batch_write_item.call_count, lambda_mod.MAX_BATCH_ATTEMPTS)
 
     def test_raises_for_dlq_test_file(self):
         event = {
@@ -102,6 +216,15 @@ class TestSqsToDynamoLambda(unittest.TestCase):
 
         self.assertIn("DLQ", str(ctx.exception))
 
+    def test_client_is_created_once_and_cached(self):
+        with patch.object(lambda_mod, "_dynamodb_client", None), \
+                patch.object(lambda_mod.boto3, "client") as mock_client:
+            first = lambda_mod.get_dynamodb_client()
+            second = lambda_mod.get_dynamodb_client()
+
+        mock_client.assert_called_once_with("dynamodb")
+        self.assertIs(first, second)
+
 
 if __name__ == "__main__":
     unittest.main()
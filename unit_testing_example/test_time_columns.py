@@ -0,0 +1,38 @@
+import unittest
+
+import pandas as pd
+
+import time_columns as time_mod
+
+
+class TestTimeColumns(unittest.TestCase):
+
+    def test_matches_time_date_with_local_offset(self):
+        df = pd.DataFrame({
+            # time_date: 2022-05-10 07:00:00 i 2022-05-11 00:30:15 (UTC+2)
+            "time_nano": [1652158800000000000, 1652221815000000000],
+        })
+
+        out = time_mod.add_time_columns(df)
+
+        self.assertEqual(out["date"].tolist(), ["2022-05-10", "2022-05-11"])
+        self.assertEqual(out["hour"].tolist(), [7, 0])
+        self.assertEqual(out["time_iso"].tolist(), ["2022-05-10T07:00:00", "2022-05-11T00:30:15"])
+
+    def test_missing_time_nano_gives_null(self):
+        dates = time_mod.date_from_nano(pd.Series([1652158800000000000, None]))
+
+        self.assertEqual(dates[0], "2022-05-10")
+        self.assertTrue(pd.isna(dates[1]))
+
+    def test_only_requested_columns_are_added(self):
+        df = pd.DataFrame({"time_nano": [1652158800000000000]})
+
+        out = time_mod.add_time_columns(df, utc_offset_hours=0, columns=["hour"])
+
+        self.assertEqual(list(out.columns), ["time_nano", "hour"])
+        self.assertEqual(out["hour"].tolist(), [5])
+
+
+if __name__ == "__main__":
+    unittest.main()
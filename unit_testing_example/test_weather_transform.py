@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import weather_transform as weather_mod
+
+
+WEATHER_CSV = (
+    "name,time_nano,time_date,location_name,weather_temperature,weather_windSpeed,weather_windDeg\n"
+    '"1248 - Tătărași Sud, Iași, Romania",1648771200000000000,2022-04-01 02:00:00,'
+    '"Tătărași Sud, Iași, Romania",16.54,3.13,120\n'
+    '"1248 - Tătărași Sud, Iași, Romania",1648774800000000000,2022-04-01 03:00:00,'
+    '"Tătărași Sud, Iași, Romania",None,None,120\n'
+)
+
+
+class TestWeatherTransform(unittest.TestCase):
+
+    def test_matches_notebook_output(self):
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "weather.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(WEATHER_CSV)
+
+            stats = weather_mod.transform_stream([path], out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(stats, {"files": 1, "rows": 2})
+        self.assertEqual(lines[0], "name;datetime_iso;temperature_c;wind_speed_kmh")
+        self.assertEqual(lines[1], "1248 - Tătărași Sud, Iași, Romania;2022-04-01T02:00:00;16.54;11.268")
+        self.assertEqual(lines[2], "1248 - Tătărași Sud, Iași, Romania;2022-04-01T03:00:00;;")
+
+    def test_directory_is_streamed_in_chunks_with_one_header(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a", "b", "_SUCCESS"):
+                with open(os.path.join(tmp, name), "w", encoding="utf-8") as f:
+                    f.write(WEATHER_CSV)
+            output = os.path.join(tmp, "out", "weather.csv")
+
+            stats = weather_mod.run([tmp], output, chunk_rows=1)
+
+            with open(output, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(stats, {"files": 2, "rows": 4})
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(sum(line.startswith("name;") for line in lines), 1)
+
+    def test_s3_prefix_input(self):
+        s3 = MagicMock()
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{"Contents": [
+            {"Key": "weather/1248/01-04-2022/firehose-1"},
+            {"Key": "weather/1248/01-04-2022/"},
+        ]}]
+        s3.get_paginator.return_value = paginator
+        s3.get_object.return_value = {"Body": io.BytesIO(WEATHER_CSV.encode("utf-8"))}
+        out = io.StringIO()
+
+        stats = weather_mod.transform_stream(["s3://bucket/weather/1248/"], out, s3_client=s3)
+
+        paginator.paginate.assert_called_once_with(Bucket="bucket", Prefix="weather/1248/")
+        s3.get_object.assert_called_once_with(Bucket="bucket", Key="weather/1248/01-04-2022/firehose-1")
+        self.assertEqual(stats["rows"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()